@@ -0,0 +1,118 @@
+"""
+Historia cien sluzieb a balikov s vyhladanim ceny k datumu (opatovne vystavenie starych dokladov).
+
+Zmeny sa len pridavaju (`data/price_history.jsonl`); pre kazdy (ciel, kod) sa drzi zoradeny
+zoznam casov zmien, takze "cena k datumu" je jeden `bisect`. Pred prvou zaznamenanou zmenou
+plati jej `previous`; kody bez historie (alebo nove sluzby bez `previous`) si nechaju aktualnu cenu.
+Historizovane su len ceny (`price/price2`, `base_price/promo_price/intra_price`), nie pasma.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+from web_calculator.core.models.package import Package
+from web_calculator.core.models.price_change import PriceChange
+from web_calculator.core.models.service import Service
+
+SERVICE_FIELDS = ("price", "price2")
+PACKAGE_FIELDS = ("base_price", "promo_price", "intra_price")
+
+
+def parse_moment(value: date | datetime | str) -> datetime:
+    """Cas zmeny alebo datum dotazu ako naivny `datetime`; neplatny retazec = `ValueError`."""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(str(value).strip()).replace(tzinfo=None)
+
+
+class PriceHistory:
+    """Index zmien cien podla (ciel, kod) so zoradenymi casmi zmien."""
+
+    def __init__(self, changes: Iterable[PriceChange] = ()):
+        self._times: dict[tuple[str, str], list[datetime]] = {}
+        self._changes: dict[tuple[str, str], list[PriceChange]] = {}
+        for change in sorted(changes, key=lambda ch: parse_moment(ch.changed_at)):
+            self.add(change)
+
+    def __bool__(self) -> bool:
+        return bool(self._times)
+
+    def add(self, change: PriceChange) -> None:
+        """Zaradi zmenu; nove zmeny idu na koniec, starsie (import) sa vlozia na miesto."""
+        key = (change.target, change.code)
+        times = self._times.setdefault(key, [])
+        changes = self._changes.setdefault(key, [])
+        moment = parse_moment(change.changed_at)
+        if not times or times[-1] <= moment:
+            times.append(moment)
+            changes.append(change)
+            return
+        idx = bisect_right(times, moment)
+        insort(times, moment)
+        changes.insert(idx, change)
+
+    def changes(self, target: str, code: str) -> list[PriceChange]:
+        return list(self._changes.get((target, code), ()))
+
+    def prices_as_of(self, target: str, code: str, as_of: date | datetime | str) -> dict[str, float | None] | None:
+        """
+        Ceny platne k `as_of`; samotny datum znamena koniec dna (zapocitaju sa vsetky zmeny v ten den).
+        None = bez historie, plati aktualna cena.
+        """
+        times = self._times.get((target, code))
+        if not times:
+            return None
+        if isinstance(as_of, date) and not isinstance(as_of, datetime):
+            idx = bisect_left(times, parse_moment(as_of) + timedelta(days=1)) - 1
+        else:
+            idx = bisect_right(times, parse_moment(as_of)) - 1
+        changes = self._changes[(target, code)]
+        if idx < 0:
+            return changes[0].previous or None
+        return changes[idx].prices
+
+    def service_as_of(self, service: Service, as_of: date | datetime | str | None) -> Service:
+        if as_of is None:
+            return service
+        prices = self.prices_as_of("service", service.code, as_of)
+        if not prices:
+            return service
+        values = {name: prices[name] for name in SERVICE_FIELDS if prices.get(name) is not None}
+        return replace(service, **values) if values else service
+
+    def package_as_of(self, package: Package | None, as_of: date | datetime | str | None) -> Package | None:
+        if package is None or as_of is None:
+            return package
+        prices = self.prices_as_of("package", package.code, as_of)
+        if not prices:
+            return package
+        values = {name: prices[name] for name in PACKAGE_FIELDS if name in prices}
+        if values.get("base_price") is None:
+            values.pop("base_price", None)
+        return replace(package, **values) if values else package
+
+
+def price_change(
+    target: str,
+    code: str,
+    before: dict[str, float | None],
+    after: dict[str, float | None],
+    when: datetime | None = None,
+) -> PriceChange | None:
+    """Zaznam zmeny; None ak sa ceny nezmenili."""
+    if before == after:
+        return None
+    moment = when or datetime.now()
+    return PriceChange(
+        code=code,
+        changed_at=moment.isoformat(timespec="seconds"),
+        prices=dict(after),
+        previous=dict(before),
+        target=target,
+    )
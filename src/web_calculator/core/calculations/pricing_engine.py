@@ -1,9 +1,18 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Iterable
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Iterable, Sequence
 
+from web_calculator.core.calculations.tiers import TierTable, compile_tier_map, compile_tiers, quota_cost
 from web_calculator.core.models.package import Package
 from web_calculator.core.models.service import Service
+from web_calculator.utils.money import Money, format_cents, from_cents, to_cents
+
+if TYPE_CHECKING:
+    from web_calculator.core.calculations.price_history import PriceHistory
+    from web_calculator.core.calculations.promotions import PromotionIndex
+    from web_calculator.core.calculations.scenarios import Scenario, ScenarioResult
+    from web_calculator.core.calculations.totals import TotalsSnapshot
 
 
 @dataclass
@@ -28,21 +37,165 @@ class PricingEngine:
     def summarize(self, services: Iterable[tuple | Service]) -> PricingBreakdown:
         """
         Ak je zaznam tuple (service, qty [, original_price]), pouzije mnozstvo; inak qty=1.
+        Sucet sa robi v centoch (suma riadku sa zaokruhli raz), vysledok su floaty na centy.
         """
         base = self.package.base_price if self.package else 0.0
-        extras = 0.0
+        extras = 0
         for item in services:
             if isinstance(item, tuple):
                 if len(item) >= 2:
                     service, qty = item[0], item[1]
                 else:
                     service, qty = item[0], 1
-                extras += float(service.price) * float(qty)
+                extras += to_cents(float(service.price) * float(qty))
             else:
-                extras += float(item.price)
-        return PricingBreakdown(base=base, extras=extras)
+                extras += to_cents(float(item.price))
+        return PricingBreakdown(base=base, extras=from_cents(extras))
+
+    def totals(
+        self,
+        services: Iterable[tuple | Service],
+        discount_pct: float = 0.0,
+        vat_rate: float = 0.23,
+        vat_mode: str = "add",
+        original_package_price: float | None = None,
+    ) -> "TotalsSnapshot":
+        """Kompletne sumy (zlava, DPH, riadky) nad aktualnym balikom; vid `totals.compute_totals`."""
+        from web_calculator.core.calculations.totals import compute_totals
+
+        return compute_totals(
+            services,
+            base_price=self.package.base_price if self.package else 0.0,
+            discount_pct=discount_pct,
+            vat_rate=vat_rate,
+            vat_mode=vat_mode,
+            original_base_price=original_package_price,
+        )
+
+    def scenarios(
+        self,
+        services: Iterable[tuple | Service],
+        scenarios: "Sequence[Scenario]",
+        package: Package | None = None,
+        promotions: PromotionIndex | None = None,
+        on: date | None = None,
+    ) -> "list[ScenarioResult]":
+        """
+        Ten isty vyber pri viacerych nastaveniach zlavy/DPH/cenovej urovne; sluzby sa scitaju raz.
+        `package` je balik s povodnymi cenami (inak aktualny balik); akcie sa vyhodnotia k datumu `on`.
+        """
+        from web_calculator.core.calculations.scenarios import sweep
+
+        extras = to_cents(self.summarize(services).extras)
+        return sweep(extras, package if package is not None else self.package, scenarios, promotions, on)
 
     @staticmethod
-    def format_currency(value: float) -> str:
+    def format_currency(value: float | Money) -> str:
         # ASCII-friendly currency suffix to avoid encoding issues across UI/PDF.
-        return f"{value:,.2f} EUR"
+        return format_cents(Money.of(value).cents)
+
+
+def package_with_price(
+    package: Package | None,
+    price_mode: str,
+    promotions: PromotionIndex | None = None,
+    on: date | None = None,
+    history: PriceHistory | None = None,
+    as_of: date | datetime | None = None,
+) -> Package | None:
+    """
+    Return copy of package with `base_price` switched to the chosen price mode (base/promo/intra).
+    Akcia z `promotions` platna k datumu `on` nahradza zakladnu (cennikovu) cenu.
+    S `history` a `as_of` sa vychadza z cien balika platnych k tomu datumu.
+    """
+    if not package:
+        return None
+    if history and as_of is not None:
+        package = history.package_as_of(package, as_of)
+    price = package.base_price
+    if promotions:
+        promo_price = promotions.package_price(package.code, on)
+        if promo_price is not None:
+            price = promo_price
+    if price_mode == "promo" and package.promo_price is not None:
+        price = package.promo_price
+    elif price_mode == "intra" and package.intra_price is not None:
+        price = package.intra_price
+    return replace(package, base_price=price)
+
+
+def service_tier_table(service: Service) -> TierTable | None:
+    """Kompilovane objemove pasma sluzby (pri rucne vytvorenej sluzbe sa skompiluju pri prvom pouziti)."""
+    if service.price_tiers is None and service.tiers:
+        service.price_tiers = compile_tiers(service.tiers)
+    return service.price_tiers
+
+
+def package_tier_table(package: Package, code: str) -> TierTable | None:
+    """Pasma, ktore balik urcuje pre konkretnu sluzbu (`Package.service_tiers`)."""
+    if not package.service_tiers:
+        return None
+    if not package.compiled_tiers:
+        package.compiled_tiers = compile_tier_map(package.service_tiers)
+    return package.compiled_tiers.get(code)
+
+
+def effective_service_price(
+    service: Service,
+    package: Package | None,
+    qty: int,
+    base_price: float | None = None,
+    alt_price: float | None = None,
+    history: PriceHistory | None = None,
+    as_of: date | datetime | None = None,
+) -> float:
+    """
+    Jednotkova cena sluzby v kontexte zvoleneho balika.
+
+    - pasma balika pre danu sluzbu (`service_tiers`) maju prednost pred vsetkym ostatnym,
+    - sluzby zahrnute v baliku pouziju `price2`; ak `included_quantities` definuje volnu kvotu,
+      iba platena cast nad kvotou ide za zakladnu cenu (vysledok je zmiesana jednotkova cena),
+    - sluzby s `bundle` zhodnym s prefixom kodu balika pouziju `price2`,
+    - inak zakladna cena, pripadne objemove pasma sluzby (`tiers`).
+
+    Vlastne pasma sluzby plati len pri cennikovej zakladnej cene; rucne prepisana cena ich vypne.
+    Pri pasmach je vysledok zmiesana jednotkova cena (cena mnozstva / mnozstvo).
+    S `history` a `as_of` sa (bez explicitnych cien) pouziju ceny platne k tomu datumu; cennikova
+    cena je potom ta historicka, takze historicka cena pasma nevypne (pasma sa nehistorizuju).
+    """
+    list_price = service.price
+    if history and as_of is not None:
+        past = history.service_as_of(service, as_of)
+        if past is not service:
+            list_price = past.price
+            base_price = past.price if base_price is None else base_price
+            alt_price = past.price2 if alt_price is None else alt_price
+    tiers = service_tier_table(service)
+    if tiers is not None and base_price is not None and to_cents(float(base_price)) != to_cents(list_price):
+        tiers = None
+    base_price = float(service.price if base_price is None else base_price)
+    alt_price = float(service.price2 if alt_price is None else alt_price)
+    if not package:
+        return tiers.unit_price(qty) if tiers is not None else base_price
+
+    package_tiers = package_tier_table(package, service.code)
+    if package_tiers is not None:
+        return package_tiers.unit_price(qty)
+
+    pkg_code = (package.code or "").upper()
+    if service.code in (package.included_services or []):
+        if qty <= 0:
+            return base_price
+        included_qty = (package.included_quantities or {}).get(service.code, 0)
+        bundle_qty = included_qty if included_qty > 0 else 1
+        if qty <= bundle_qty:
+            return alt_price
+        if tiers is not None:
+            return quota_cost(qty, bundle_qty, to_cents(alt_price), tiers) / qty / 100
+        total_cost = (bundle_qty * alt_price) + ((qty - bundle_qty) * base_price)
+        return total_cost / qty if qty > 0 else base_price
+
+    bundle_key = service.bundle_key
+    if bundle_key and pkg_code.startswith(bundle_key):
+        return alt_price
+    return tiers.unit_price(qty) if tiers is not None else base_price
@@ -0,0 +1,115 @@
+"""
+Casovo obmedzene akcie (promo ceny balikov a sluzieb) platne k datumu vystavenia dokladu.
+
+Akcie sa mozu prekryvat. Pri zostaveni indexu sa pre kazdy kod casova os rozdeli na
+disjunktne useky (hranice = zaciatky a dni po konci akcii) a ku kazdemu useku sa raz urci
+vitazna akcia - najnizsia cena, pri zhode neskor zacata (konkretnejsia). Vyhladanie k datumu
+je potom jeden `bisect` nad hranicami: O(log n), skoncene akcie sa nikdy neprechadzaju.
+"""
+
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_right
+from datetime import date
+from itertools import count
+from typing import Iterable
+
+from web_calculator.core.models.promotion import Promotion
+from web_calculator.utils.money import to_cents
+
+_OPEN_START = date.min.toordinal()
+_OPEN_END = date.max.toordinal()
+
+
+def _ordinal(value: str | date | None, default: int) -> int:
+    if not value:
+        return default
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value).strip()[:10]).toordinal()
+
+
+def promotion_problem(promo: Promotion) -> str | None:
+    """Preco akciu nemozno indexovat (zla cena, datum, obrateny interval), inak None."""
+    try:
+        to_cents(float(promo.price))
+    except (TypeError, ValueError):
+        return f"neplatna cena {promo.price!r}"
+    try:
+        start = _ordinal(promo.valid_from, _OPEN_START)
+        end = _ordinal(promo.valid_to, _OPEN_END - 1)
+    except (TypeError, ValueError) as exc:
+        return f"neplatny datum ({exc})"
+    if start > end:
+        return f"valid_from {promo.valid_from} je po valid_to {promo.valid_to}"
+    return None
+
+
+class _Timeline:
+    """Disjunktne useky jednej ciele (kod): `bounds[i]` je prvy den useku s vitazom `winners[i]`."""
+
+    __slots__ = ("bounds", "winners")
+
+    def __init__(self, promotions: list[Promotion]):
+        intervals = []
+        for promo in promotions:
+            start = _ordinal(promo.valid_from, _OPEN_START)
+            end = _ordinal(promo.valid_to, _OPEN_END - 1) + 1  # exkluzivny koniec
+            if end > start:
+                intervals.append((start, end, promo))
+        intervals.sort(key=lambda item: item[0])
+
+        edges = sorted({edge for start, end, _promo in intervals for edge in (start, end)})
+        bounds: list[int] = []
+        winners: list[Promotion | None] = []
+        heap: list[tuple[int, int, int, int, Promotion]] = []
+        seq = count()
+        pos = 0
+        for edge in edges:
+            while pos < len(intervals) and intervals[pos][0] <= edge:
+                start, end, promo = intervals[pos]
+                heapq.heappush(heap, (to_cents(promo.price), -start, next(seq), end, promo))
+                pos += 1
+            # skoncene akcie sa odstrania az ked su navrchu (lazy delete)
+            while heap and heap[0][3] <= edge:
+                heapq.heappop(heap)
+            winner = heap[0][4] if heap else None
+            if winners and winners[-1] is winner:
+                continue
+            bounds.append(edge)
+            winners.append(winner)
+        self.bounds = bounds
+        self.winners = winners
+
+    def active(self, day: int) -> Promotion | None:
+        idx = bisect_right(self.bounds, day) - 1
+        return self.winners[idx] if idx >= 0 else None
+
+
+class PromotionIndex:
+    """Index akcii podla (ciel, kod); zostavi sa raz pri nacitani katalogu."""
+
+    def __init__(self, promotions: Iterable[Promotion] = ()):
+        grouped: dict[tuple[str, str], list[Promotion]] = {}
+        for promo in promotions:
+            grouped.setdefault(((promo.target or "package").lower(), promo.code), []).append(promo)
+        self._timelines = {key: _Timeline(items) for key, items in grouped.items()}
+
+    def __bool__(self) -> bool:
+        return bool(self._timelines)
+
+    def active(self, target: str, code: str, on: date | None = None) -> Promotion | None:
+        """Akcia platna v den `on` (predvolene dnes), inak None."""
+        timeline = self._timelines.get((target, code))
+        if timeline is None:
+            return None
+        return timeline.active((on or date.today()).toordinal())
+
+    def package_price(self, code: str, on: date | None = None) -> float | None:
+        promo = self.active("package", code, on)
+        return promo.price if promo else None
+
+    def service_price(self, code: str, on: date | None = None) -> float | None:
+        promo = self.active("service", code, on)
+        return promo.price if promo else None
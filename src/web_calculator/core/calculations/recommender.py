@@ -0,0 +1,205 @@
+"""
+Odporucanie balika pre zvoleny vyber sluzieb.
+
+Pre kazdy balik a kazdu cenovu uroven (base/promo/intra) spocita, kolko by stala ponuka,
+keby sa balik zvolil v hlavnom okne: cena balika + sluzby za ceny podla balika
+(pasma balika `service_tiers`, zahrnute sluzby s kvotou `included_quantities`, `bundle` prefix,
+inak zakladna cena alebo objemove pasma sluzby)
++ zahrnute sluzby, ktore balik do ponuky prida automaticky.
+
+Vyber sa predpocita raz (sucet zakladnych cien a rozdiely pre kazdy `bundle` kluc), takze
+jeden balik stoji len O(pocet jeho zahrnutych sluzieb a pasiem + pocet roznych bundle klucov);
+stovky balikov sa vyhodnotia bez opakovaneho prechodu celym vyberom.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Iterable, Mapping
+
+from web_calculator.core.calculations.pricing_engine import package_tier_table, service_tier_table
+from web_calculator.core.calculations.tiers import TierTable, quota_cost
+from web_calculator.core.models.package import Package
+from web_calculator.core.models.service import Service
+from web_calculator.utils.money import HALF_UP, Money, apply_rate, percent_units, rate_units, split_vat_cents, to_cents
+
+if TYPE_CHECKING:
+    from web_calculator.core.calculations.promotions import PromotionIndex
+
+PRICE_MODES = ("base", "promo", "intra")
+
+
+@dataclass(frozen=True)
+class PackageQuote:
+    package: Package | None  # None = bez balika
+    price_mode: str
+    package_price: Money
+    services_total: Money
+    total: Money  # pred zlavou a DPH
+    total_no_vat: Money
+    total_with_vat: Money
+    added_services: tuple[str, ...] = ()  # zahrnute sluzby, ktore balik prida navyse
+
+    @property
+    def label(self) -> str:
+        if self.package is None:
+            return "Bez balika"
+        return f"{self.package.code} ({self.price_mode})"
+
+
+def _mode_price(package: Package, mode: str, promotions: PromotionIndex | None, on: date | None) -> float | None:
+    if mode == "promo":
+        return package.promo_price
+    if mode == "intra":
+        return package.intra_price
+    promo_price = promotions.package_price(package.code, on) if promotions else None
+    return package.base_price if promo_price is None else promo_price
+
+
+@dataclass(frozen=True)
+class _Line:
+    code: str
+    qty: int
+    alt: int  # jednotkova alternativna cena v centoch
+    bundle: str  # `Service.bundle_key` ("" = bez bundlu)
+    paid: TierTable  # zakladna cena (pripadne objemove pasma sluzby)
+    cost: int  # cena mnozstva bez balika v centoch
+
+    def current(self, matched_keys: set[str]) -> int:
+        """Cena riadku pri zhode bundle prefixu alebo bez nej."""
+        return self.alt * self.qty if self.bundle in matched_keys else self.cost
+
+
+def _paid_table(service: Service, base: int) -> TierTable:
+    # vlastne pasma sluzby plati len pri katalogovej cene (rovnako ako `effective_service_price`)
+    tiers = service_tier_table(service)
+    if tiers is not None and base == to_cents(service.price):
+        return tiers
+    return TierTable.flat(base)
+
+
+def recommend_packages(
+    packages: Iterable[Package],
+    services: Iterable[Service],
+    quantities: Mapping[str, int],
+    selected: Iterable[str],
+    prices: Mapping[str, tuple[float, float]] | None = None,
+    discount_pct: float = 0.0,
+    vat_rate: float = 0.23,
+    vat_mode: str = "add",
+    include_no_package: bool = True,
+    limit: int | None = None,
+    promotions: PromotionIndex | None = None,
+    on: date | None = None,
+) -> list[PackageQuote]:
+    """
+    Zoradeny zoznam (najlacnejsie prve) cien ponuky pre kazdy balik a cenovu uroven.
+    - `selected`: kody sluzieb, ktore zakaznik chce (bez automaticky pridanych z balika),
+    - `prices`: volitelne (zakladna, alternativna) cena podla kodu, ako `SelectionState.price_overrides`.
+    - `promotions`/`on`: akcie platne k datumu vystavenia nahradia zakladne ceny balikov a sluzieb.
+    Urovne promo/intra sa vynechaju, ak ich balik nema. Pravidla cien su zhodne s
+    `effective_service_price` a `ServiceController.apply_included_services`.
+    """
+    prices = prices or {}
+    wanted = set(selected)
+
+    def list_prices(svc: Service) -> tuple[float, float]:
+        base, alt = prices.get(svc.code, (svc.price, svc.price2))
+        promo_price = promotions.service_price(svc.code, on) if promotions else None
+        return (base if promo_price is None else promo_price), alt
+
+    catalog: dict[str, Service] = {}
+    lines: dict[str, _Line] = {}
+    for svc in services:
+        catalog[svc.code] = svc
+        if svc.code in wanted:
+            base, alt = list_prices(svc)
+            qty = int(quantities.get(svc.code, 1) or 1)
+            paid = _paid_table(svc, to_cents(float(base)))
+            lines[svc.code] = _Line(
+                svc.code, qty, to_cents(float(alt)), svc.bundle_key, paid, paid.cost(qty)
+            )
+
+    # Sucet za zakladne ceny a uspora pri zhode bundle prefixu (podla bundle kluca)
+    all_base = 0
+    bundle_delta: dict[str, int] = {}
+    for line in lines.values():
+        all_base += line.cost
+        if line.bundle:
+            bundle_delta[line.bundle] = bundle_delta.get(line.bundle, 0) + line.alt * line.qty - line.cost
+
+    vat_units = rate_units(vat_rate)
+    discount_units = percent_units(discount_pct)
+
+    def quote(package: Package | None, mode: str, package_price: int, services_total: int, added: tuple[str, ...]) -> PackageQuote:
+        total = package_price + services_total
+        discount = apply_rate(total, discount_units, HALF_UP)
+        no_vat, _vat, with_vat = split_vat_cents(total - discount, vat_units, vat_mode)
+        return PackageQuote(
+            package=package,
+            price_mode=mode,
+            package_price=Money(package_price),
+            services_total=Money(services_total),
+            total=Money(total),
+            total_no_vat=Money(no_vat),
+            total_with_vat=Money(with_vat),
+            added_services=added,
+        )
+
+    results: list[PackageQuote] = []
+    if include_no_package:
+        results.append(quote(None, "base", 0, all_base, ()))
+
+    for package in packages:
+        code = (package.code or "").upper()
+        matched = [key for key in bundle_delta if code.startswith(key)]
+        services_total = all_base + sum(bundle_delta[key] for key in matched)
+        matched_keys = set(matched)
+        quotas = package.included_quantities or {}
+        included = dict.fromkeys(package.included_services or [])
+        tier_map: dict[str, TierTable] = {}
+        for tier_code in package.service_tiers or {}:
+            table = package_tier_table(package, tier_code)
+            if table is not None:
+                tier_map[tier_code] = table
+        # pasma balika maju prednost pred bundle aj zakladnou cenou (zahrnute sluzby nizsie)
+        for tier_code, table in tier_map.items():
+            line = lines.get(tier_code)
+            if line is not None and tier_code not in included:
+                services_total += table.cost(line.qty) - line.current(matched_keys)
+        added: list[str] = []
+        for inc_code in included:
+            included_qty = quotas.get(inc_code, 0)
+            bundle_qty = included_qty if included_qty > 0 else 1
+            min_qty = quotas.get(inc_code, 1)
+            table = tier_map.get(inc_code)
+            line = lines.get(inc_code)
+            if line is None:
+                svc = catalog.get(inc_code)
+                if svc is None:
+                    continue
+                # balik sluzbu prida sam (mnozstvo aspon kvota), plati sa alternativna cena
+                base, alt = list_prices(svc)
+                qty = max(int(quantities.get(inc_code, 1) or 1), min_qty)
+                if table is None:
+                    table_cost = quota_cost(qty, bundle_qty, to_cents(float(alt)), _paid_table(svc, to_cents(float(base))))
+                else:
+                    table_cost = table.cost(qty)
+                services_total += table_cost
+                added.append(inc_code)
+                continue
+            # zahrnuta sluzba z vyberu: mnozstvo sa zdvihne na kvotu, pravidlo kvoty ma prednost pred bundle
+            qty = max(line.qty, min_qty)
+            new_cost = table.cost(qty) if table is not None else quota_cost(qty, bundle_qty, line.alt, line.paid)
+            services_total += new_cost - line.current(matched_keys)
+
+        for mode in PRICE_MODES:
+            price = _mode_price(package, mode, promotions, on)
+            if price is None:
+                continue
+            results.append(quote(package, mode, to_cents(float(price)), services_total, tuple(added)))
+
+    order = {mode: idx for idx, mode in enumerate(PRICE_MODES)}
+    results.sort(key=lambda q: (q.total.cents, q.package.code if q.package else "", order[q.price_mode]))
+    return results[:limit] if limit is not None else results
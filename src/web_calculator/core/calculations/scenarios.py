@@ -0,0 +1,96 @@
+"""
+Porovnanie tej istej ponuky pri roznych nastaveniach (zlava, sadzba a rezim DPH, cenova uroven).
+
+Efektivne ceny riadkov nezavisia od zlavy, DPH ani cenovej urovne balika (tie menia len cenu
+balika), takze sucet sluzieb sa zoberie raz (zo `TotalsSnapshot` alebo jednym prechodom vyberom)
+a kazdy scenar je uz len par celociselnych operacii v centoch. Vysledky pre scenar zhodny
+s aktualnym stavom su rovnake ako `compute_totals`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from itertools import product
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+from web_calculator.core.calculations.pricing_engine import package_with_price
+from web_calculator.core.models.package import Package
+from web_calculator.utils.money import Money, apply_rate, percent_units, rate_units, split_vat_cents, to_cents
+
+if TYPE_CHECKING:
+    from web_calculator.core.calculations.promotions import PromotionIndex
+
+
+@dataclass(frozen=True)
+class Scenario:
+    discount_pct: float = 0.0
+    vat_rate: float = 0.23
+    vat_mode: str = "add"
+    price_mode: str = "base"
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    scenario: Scenario
+    package_price: Money
+    total_before_discount: Money
+    discount_amount: Money
+    total_no_vat: Money
+    vat: Money
+    total_with_vat: Money
+
+
+def scenario_grid(
+    discounts: Iterable[float] = (0.0,),
+    vat_rates: Iterable[float] = (0.23,),
+    vat_modes: Iterable[str] = ("add", "included"),
+    price_modes: Iterable[str] = ("base",),
+) -> list[Scenario]:
+    """Kartezsky sucin hodnot (poradie: cenova uroven, rezim DPH, sadzba, zlava)."""
+    return [
+        Scenario(discount_pct=float(discount), vat_rate=float(rate), vat_mode=vat_mode, price_mode=price_mode)
+        for price_mode, vat_mode, rate, discount in product(price_modes, vat_modes, vat_rates, discounts)
+    ]
+
+
+def sweep(
+    extras: Money | int,
+    package: Package | None,
+    scenarios: Sequence[Scenario],
+    promotions: PromotionIndex | None = None,
+    on: date | None = None,
+) -> list[ScenarioResult]:
+    """
+    Vysledky vsetkych scenarov pre dany sucet sluzieb (`extras`, efektivne ceny * mnozstva).
+    `package` je balik s povodnymi cenami; cena podla urovne (vratane akcie k datumu `on`)
+    sa pocita raz pre kazdu uroven.
+    """
+    extras_cents = extras.cents if isinstance(extras, Money) else int(extras)
+    base_by_mode: dict[str, int] = {}
+    units_cache: dict[float, int] = {}
+    results: list[ScenarioResult] = []
+    for scenario in scenarios:
+        base = base_by_mode.get(scenario.price_mode)
+        if base is None:
+            priced = package_with_price(package, scenario.price_mode, promotions, on)
+            base = to_cents(priced.base_price) if priced else 0
+            base_by_mode[scenario.price_mode] = base
+        discount_units = units_cache.get(scenario.discount_pct)
+        if discount_units is None:
+            discount_units = units_cache[scenario.discount_pct] = percent_units(scenario.discount_pct)
+        total = base + extras_cents
+        discount = apply_rate(total, discount_units)
+        no_vat, vat, with_vat = split_vat_cents(total - discount, rate_units(scenario.vat_rate), scenario.vat_mode)
+        results.append(
+            ScenarioResult(
+                scenario=scenario,
+                package_price=Money(base),
+                total_before_discount=Money(total),
+                discount_amount=Money(discount),
+                total_no_vat=Money(no_vat),
+                vat=Money(vat),
+                total_with_vat=Money(with_vat),
+            )
+        )
+    return results
@@ -0,0 +1,104 @@
+"""
+Objemove (stupnovite) ceny: kazdy kus sa plati cenou pasma, do ktoreho patri.
+
+JSON zapis je zoznam pasiem `[{"from": 1, "price": 10}, {"from": 6, "price": 8}, {"from": 21, "price": 6}]`
+(1-5 ks po 10, 6-20 po 8, od 21 po 6). Pri nacitani katalogu sa zkompiluje do `TierTable`:
+zoradene zaciatky pasiem, ceny v centoch a prefixove sucty ceny vsetkych kusov pred pasmom,
+takze cena riadku je jeden `bisect` + nasobenie, O(log pocet pasiem) pre lubovolne mnozstvo.
+
+Volna kvota balika (`included_quantities`) je specialny pripad: pasmo 1..kvota za `price2`,
+potom zakladna cena (alebo vlastne pasma sluzby), vid `quota_cost`.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+from web_calculator.utils.money import to_cents
+
+
+@dataclass(frozen=True)
+class TierTable:
+    starts: tuple[int, ...]  # prvy kus pasma (1-based), rastuco; starts[0] == 1
+    prices: tuple[int, ...]  # cena za kus v centoch
+    prefix: tuple[int, ...]  # cena vsetkych kusov pred zaciatkom pasma
+
+    @classmethod
+    def build(cls, bands: Iterable[tuple[int, int]]) -> "TierTable":
+        """Z dvojic (od kusu, cena v centoch); duplicitny zaciatok prepise predchadzajuci."""
+        by_start: dict[int, int] = {}
+        for start, price in bands:
+            by_start[max(1, int(start))] = int(price)
+        if not by_start:
+            raise ValueError("tier table needs at least one band")
+        starts = sorted(by_start)
+        if starts[0] != 1:
+            # pred prvym pasmom plati jeho cena (napr. zapis od 5 ks)
+            by_start[1] = by_start[starts[0]]
+            starts.insert(0, 1)
+        prices = [by_start[s] for s in starts]
+        prefix = [0]
+        for idx in range(1, len(starts)):
+            prefix.append(prefix[-1] + (starts[idx] - starts[idx - 1]) * prices[idx - 1])
+        return cls(tuple(starts), tuple(prices), tuple(prefix))
+
+    @classmethod
+    def flat(cls, price_cents: int) -> "TierTable":
+        return cls((1,), (int(price_cents),), (0,))
+
+    def cost(self, qty: int) -> int:
+        """Cena `qty` kusov v centoch."""
+        if qty <= 0:
+            return 0
+        idx = bisect_right(self.starts, qty) - 1
+        return self.prefix[idx] + (qty - self.starts[idx] + 1) * self.prices[idx]
+
+    def unit_price(self, qty: int) -> float:
+        """Zmiesana jednotkova cena (na zobrazenie a pre `Service.price` v snapshotoch)."""
+        if qty <= 0:
+            return self.prices[0] / 100
+        return self.cost(qty) / qty / 100
+
+    def to_json(self) -> list[dict]:
+        return [{"from": start, "price": price / 100} for start, price in zip(self.starts, self.prices)]
+
+
+def compile_tiers(raw) -> TierTable | None:
+    """
+    JSON pasma -> `TierTable`; prazdny zoznam alebo None -> None.
+    Prijima zoznam objektov `{"from", "price"}` aj dvojic `[od, cena]`.
+    """
+    if not raw:
+        return None
+    if isinstance(raw, TierTable):
+        return raw
+    bands = []
+    for band in raw:
+        if isinstance(band, Mapping):
+            start, price = band.get("from", 1), band.get("price", 0.0)
+        else:
+            start, price = band
+        bands.append((int(start), to_cents(price)))
+    return TierTable.build(bands)
+
+
+def compile_tier_map(raw: Mapping[str, object] | None) -> dict[str, TierTable]:
+    """`Package.service_tiers` (kod sluzby -> pasma) -> kompilovane tabulky."""
+    compiled: dict[str, TierTable] = {}
+    for code, bands in (raw or {}).items():
+        table = compile_tiers(bands)
+        if table is not None:
+            compiled[code] = table
+    return compiled
+
+
+def quota_cost(qty: int, quota: int, alt_cents: int, paid: TierTable) -> int:
+    """
+    Volna kvota balika: prvych `quota` kusov za alternativnu cenu, dalsie kusy pokracuju
+    v pasmach `paid` (bez vlastnych pasiem je to zakladna cena, teda povodne spravanie).
+    """
+    if qty <= quota:
+        return qty * alt_cents
+    return quota * alt_cents + paid.cost(qty) - paid.cost(quota)
@@ -0,0 +1,255 @@
+"""
+Jednotne jadro sum: zlava, DPH (`add` / `included`) a riadky dokladu v jednom prechode vyberom.
+Pocita sa v celych centoch (`utils/money.py`), sumy v snapshote su `Money`.
+
+Vysledok je nemenny `TotalsSnapshot`; suhrn v UI, nahlad, editor obsahu PDF aj payload pre PDF
+citaju ten isty snapshot. `TotalsCache` ho drzi pre aktualnu reviziu stavu okna, takze sa
+prepocita len po zmene vyberu, mnozstiev, balika, zlavy alebo DPH.
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable, Iterable
+
+from web_calculator.core.calculations.pricing_engine import PricingBreakdown
+from web_calculator.core.models.service import Service
+from web_calculator.utils.money import (
+    CENT,
+    HALF_UP,
+    Money,
+    apply_rate,
+    cents_array,
+    from_cents,
+    percent_units,
+    rate_units,
+    remove_rate,
+    remove_rate_array,
+    split_vat_cents,
+    to_cents,
+)
+
+
+def split_vat(amount: float, vat_rate: float, vat_mode: str) -> tuple[float, float, float]:
+    """
+    Rozdeli sumu po zlave na (bez DPH, DPH, s DPH), zaokruhlene na centy.
+    - `included`: suma uz obsahuje DPH, zaklad sa z nej vypocita,
+    - `add`: suma je bez DPH, DPH sa pripocita.
+    """
+    parts = split_vat_cents(to_cents(amount), rate_units(vat_rate), vat_mode)
+    return tuple(from_cents(c) for c in parts)  # type: ignore[return-value]
+
+
+@dataclass(frozen=True)
+class TotalsLine:
+    service: Service
+    qty: int
+    unit_price: Money  # efektivna jednotkova cena tak, ako je v cenniku (pri `included` s DPH)
+    total: Money
+    unit_no_vat: Money
+    total_no_vat: Money
+    original_unit_no_vat: Money
+    original_total_no_vat: Money
+
+
+@dataclass(frozen=True)
+class TotalsSnapshot:
+    # Riadky su stlpce v centoch (array('q')); `lines` z nich sklada objekty az na poziadanie.
+    services: tuple[Service, ...]
+    quantities: tuple[int, ...]
+    unit_cents: array
+    line_cents: array
+    unit_no_vat_cents: array
+    line_no_vat_cents: array
+    original_unit_no_vat_cents: array
+    original_line_no_vat_cents: array
+    base: Money  # cena balika tak, ako je v cenniku
+    extras: Money
+    discount_pct: float
+    discount_amount: Money
+    total_no_vat: Money
+    vat: Money
+    total_with_vat: Money
+    vat_rate: float
+    vat_mode: str
+    base_no_vat: Money
+    original_base_no_vat: Money
+    extras_no_vat: Money
+    original_extras_no_vat: Money
+
+    @cached_property
+    def lines(self) -> tuple[TotalsLine, ...]:
+        return tuple(
+            TotalsLine(svc, qty, Money(unit), Money(line), Money(unit_nv), Money(line_nv), Money(orig_nv), Money(orig_line_nv))
+            for svc, qty, unit, line, unit_nv, line_nv, orig_nv, orig_line_nv in zip(
+                self.services,
+                self.quantities,
+                self.unit_cents,
+                self.line_cents,
+                self.unit_no_vat_cents,
+                self.line_no_vat_cents,
+                self.original_unit_no_vat_cents,
+                self.original_line_no_vat_cents,
+            )
+        )
+
+    @property
+    def total_before_discount(self) -> Money:
+        return self.base + self.extras
+
+    @property
+    def breakdown(self) -> PricingBreakdown:
+        return PricingBreakdown(base=float(self.base), extras=float(self.extras))
+
+    def items(self) -> list[dict]:
+        return [
+            {
+                "name": svc.label,
+                "unit": svc.unit,
+                "qty": qty,
+                "unit_price": unit_nv / CENT,
+                "total": line_nv / CENT,
+                "original_unit_price": orig_nv / CENT,
+                "original_total": orig_line_nv / CENT,
+            }
+            for svc, qty, unit_nv, line_nv, orig_nv, orig_line_nv in zip(
+                self.services,
+                self.quantities,
+                self.unit_no_vat_cents,
+                self.line_no_vat_cents,
+                self.original_unit_no_vat_cents,
+                self.original_line_no_vat_cents,
+            )
+        ]
+
+    def as_totals(self) -> dict:
+        """Slovnik `payload["totals"]` (kluce ocakavane PDF rendererom, sumy ako float na centy)."""
+        included = self.vat_mode == "included"
+        return {
+            "base": float(self.base_no_vat if included else self.base),
+            "extras": float(self.extras_no_vat if included else self.extras),
+            "original_base": float(self.original_base_no_vat),
+            "original_extras": float(self.original_extras_no_vat),
+            # Povodna cena sluzieb sa pocita "bez balika" (sucet zakladnych cien sluzieb);
+            # v PDF sa pouziva pre porovnanie "povodna cena sluzieb".
+            "original_services_total": float(self.original_extras_no_vat),
+            "discount_pct": self.discount_pct,
+            "discount_amount": float(self.discount_amount),
+            "total_before_discount": float(self.total_before_discount),
+            "total_no_vat": float(self.total_no_vat),
+            "vat": float(self.vat),
+            "total_with_vat": float(self.total_with_vat),
+            "vat_rate": self.vat_rate,
+            "vat_mode": self.vat_mode,
+            "original_total_before_discount": float(self.original_base_no_vat + self.original_extras_no_vat),
+        }
+
+
+def compute_totals(
+    selections: Iterable[tuple | Service],
+    base_price: float = 0.0,
+    discount_pct: float = 0.0,
+    vat_rate: float = 0.23,
+    vat_mode: str = "add",
+    original_base_price: float | None = None,
+    rounding: str = HALF_UP,
+) -> TotalsSnapshot:
+    """
+    Sumy dokladu v jednom prechode vyberom, presne v centoch.
+    Zaznam vyberu je `(service, qty [, original_price])` alebo samotna `Service` (qty=1);
+    `service.price` je uz efektivna cena (balik/bundle), `original_price` cena pred nou.
+    Zlava sa uplatnuje na sumu pred DPH-rozdelenim (pri `included` teda na sumu s DPH).
+    """
+    vat_units = rate_units(vat_rate)
+    net = vat_mode == "included" and vat_units > 0
+    services: list[Service] = []
+    quantities: list[int] = []
+    prices: list[float] = []
+    line_prices: list[float] = []
+    originals: list[float] = []
+    original_lines: list[float] = []
+    for item in selections:
+        if isinstance(item, tuple):
+            svc = item[0]
+            qty = item[1] if len(item) >= 2 else 1
+            orig_price = item[2] if len(item) >= 3 else svc.price
+        else:
+            svc, qty, orig_price = item, 1, item.price
+        price = float(svc.price)
+        orig = float(orig_price)
+        services.append(svc)
+        quantities.append(qty)
+        prices.append(price)
+        line_prices.append(price * qty)
+        originals.append(orig)
+        original_lines.append(orig * qty)
+
+    # Hromadny prevod na centy; suma riadku sa zaokruhli raz aj pri zmiesanej cene z kvoty.
+    unit = cents_array(prices, rounding)
+    line = cents_array(line_prices, rounding)
+    original_unit = cents_array(originals, rounding)
+    original_line = cents_array(original_lines, rounding)
+    if net:
+        # zaklad riadku z jeho celkovej sumy, nie z jednotkovej ceny * qty
+        unit_nv = remove_rate_array(unit, vat_units, rounding)
+        line_nv = remove_rate_array(line, vat_units, rounding)
+        original_unit_nv = remove_rate_array(original_unit, vat_units, rounding)
+        original_line_nv = remove_rate_array(original_line, vat_units, rounding)
+    else:
+        unit_nv, line_nv, original_unit_nv, original_line_nv = unit, line, original_unit, original_line
+
+    def no_vat(cents: int) -> int:
+        return remove_rate(cents, vat_units, rounding) if net else cents
+
+    extras = sum(line)
+    base = to_cents(base_price or 0.0, rounding)
+    original_base = base if original_base_price is None else to_cents(original_base_price, rounding)
+    discount_amount = apply_rate(base + extras, percent_units(discount_pct), rounding)
+    total_no_vat, vat, total_with_vat = split_vat_cents(base + extras - discount_amount, vat_units, vat_mode, rounding)
+    return TotalsSnapshot(
+        services=tuple(services),
+        quantities=tuple(quantities),
+        unit_cents=unit,
+        line_cents=line,
+        unit_no_vat_cents=unit_nv,
+        line_no_vat_cents=line_nv,
+        original_unit_no_vat_cents=original_unit_nv,
+        original_line_no_vat_cents=original_line_nv,
+        base=Money(base),
+        extras=Money(extras),
+        discount_pct=discount_pct,
+        discount_amount=Money(discount_amount),
+        total_no_vat=Money(total_no_vat),
+        vat=Money(vat),
+        total_with_vat=Money(total_with_vat),
+        vat_rate=vat_rate,
+        vat_mode=vat_mode,
+        base_no_vat=Money(no_vat(base)),
+        original_base_no_vat=Money(no_vat(original_base)),
+        extras_no_vat=Money(sum(line_nv)),
+        original_extras_no_vat=Money(sum(original_line_nv)),
+    )
+
+
+class TotalsCache:
+    """
+    Posledny snapshot pre danu reviziu stavu.
+    Revizia sa zvysuje pri kazdej zmene, ktora ovplyvnuje sumy; kym sa nezmeni,
+    `get` vracia ten isty objekt bez prepoctu.
+    """
+
+    def __init__(self) -> None:
+        self._revision: int | None = None
+        self._snapshot: TotalsSnapshot | None = None
+
+    def get(self, revision: int, compute: Callable[[], TotalsSnapshot]) -> TotalsSnapshot:
+        if self._snapshot is None or self._revision != revision:
+            self._snapshot = compute()
+            self._revision = revision
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        self._revision = None
+        self._snapshot = None
@@ -1,8 +1,11 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import TYPE_CHECKING, List
 
+if TYPE_CHECKING:
+    from web_calculator.core.calculations.tiers import TierTable
 
-@dataclass
+
+@dataclass(slots=True)
 class Package:
     """Represents a predefined website package with a base price."""
 
@@ -17,3 +20,7 @@ class Package:
     note: str = ""
     included_services: List[str] = field(default_factory=list)
     included_quantities: dict[str, int] = field(default_factory=dict)
+    # Objemove pasma sluzieb platne len s tymto balikom (kod sluzby -> pasma ako `Service.tiers`)
+    service_tiers: dict[str, list] = field(default_factory=dict)
+    # Kompilovane `service_tiers` (pri nacitani katalogu); neuklada sa do JSON
+    compiled_tiers: dict[str, "TierTable"] = field(default_factory=dict, repr=False, compare=False)
@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PriceChange:
+    """One entry of the append-only price history (service or package price edit)."""
+
+    code: str
+    changed_at: str  # ISO datum a cas zmeny
+    prices: dict[str, float | None] = field(default_factory=dict)  # ceny platne od `changed_at`
+    previous: dict[str, float | None] = field(default_factory=dict)  # ceny pred zmenou
+    target: str = "service"  # service / package
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Promotion:
+    """Time-limited promo price for one package or service."""
+
+    code: str  # kod balika alebo sluzby
+    price: float
+    valid_from: str = ""  # ISO datum (vratane); prazdne = bez zaciatku
+    valid_to: str = ""  # ISO datum (vratane); prazdne = bez konca
+    target: str = "package"  # package / service
+    label: str = ""
@@ -0,0 +1,160 @@
+"""
+Stav vyberu v hlavnom okne: zvolene sluzby, mnozstva a rucne prepisane ceny.
+
+Uklada sa len to, co sa lisi od katalogu - zvolene kody, mnozstva rozne od 1 a prepisane ceny;
+predvolene hodnoty sa doplnia pri citani (`qty`, `prices`). Start aj reset su tak O(vyber),
+nie O(katalog), a `snapshot` je lacna nemenna kopia.
+
+Zvolene kody su bajtova maska nad stabilnymi id z `ServiceIndex` (`SelectedCodes`): hromadny
+vyber/zrusenie (zahrnute sluzby balika, cela sekcia) je jedna operacia nad maskou a
+`selected_services` prechadza len zvolene id v poradi katalogu.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Iterable, Iterator, Mapping
+
+from web_calculator.core.models.service import Service
+from web_calculator.core.models.service_index import SelectedCodes, ServiceIndex
+
+DEFAULT_QTY = 1
+
+
+@dataclass(frozen=True, slots=True)
+class SelectionSnapshot:
+    selected: frozenset[str]
+    quantities: Mapping[str, int]  # len nepredvolene mnozstva
+    price_overrides: Mapping[str, tuple[float, float]]
+
+    def qty(self, code: str) -> int:
+        return self.quantities.get(code, DEFAULT_QTY)
+
+
+@dataclass(slots=True)
+class SelectionState:
+    # Stabilne id sluzieb katalogu (bez indexu su vsetky kody v `selected.extra`)
+    index: ServiceIndex = field(default_factory=ServiceIndex, repr=False, compare=False)
+    selected: SelectedCodes = field(init=False)
+    # Riedke: len mnozstva rozne od `DEFAULT_QTY`; `quantities.get(code, 1)` je platne mnozstvo
+    quantities: dict[str, int] = field(default_factory=dict)
+    # Rucne prepisane (zakladna, alternativna) ceny; inak plati cena z katalogu
+    price_overrides: dict[str, tuple[float, float]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.selected = SelectedCodes(self.index)
+
+    @classmethod
+    def restore(
+        cls,
+        selected: Iterable[str],
+        quantities: Mapping[str, int] | None = None,
+        price_overrides: Mapping[str, tuple[float, float]] | None = None,
+        index: ServiceIndex | None = None,
+    ) -> "SelectionState":
+        """Stav z ulozeneho profilu (predvolene mnozstva sa neukladaju)."""
+        state = cls(index=index or ServiceIndex(), price_overrides=dict(price_overrides or {}))
+        state.select_all(selected)
+        for code, qty in (quantities or {}).items():
+            state.set_qty(code, qty)
+        return state
+
+    # -------- vyber --------
+    def select(self, code: str) -> None:
+        self.selected.add(code)
+
+    def deselect(self, code: str) -> None:
+        self.selected.discard(code)
+
+    def is_selected(self, code: str) -> bool:
+        return code in self.selected
+
+    def clear(self) -> None:
+        self.selected.clear()
+        self.quantities.clear()
+
+    def select_all(self, codes: Iterable[str]) -> None:
+        self.selected.add_codes(codes)
+
+    def deselect_all(self, codes: Iterable[str]) -> None:
+        codes = list(codes)
+        self.deselect_mask(self.index.mask(codes))
+        self.selected.extra.difference_update(codes)
+
+    def select_mask(self, mask: bytes) -> None:
+        self.selected.add_mask(mask)
+
+    def deselect_mask(self, mask: bytes) -> None:
+        self.selected.remove_mask(mask)
+
+    def toggle_mask(self, mask: bytes) -> bool:
+        """Ak su zvolene vsetky id z masky, zrusi ich, inak ich zvoli; vrati novy stav."""
+        if self.selected.covers(mask):
+            self.deselect_mask(mask)
+            return False
+        self.select_mask(mask)
+        return True
+
+    def selected_services(self) -> Iterator[Service]:
+        """Zvolene sluzby katalogu v jeho poradi (len zvolene id, bez prechodu katalogom)."""
+        for idx in self.selected.ids():
+            service = self.index.service(idx)
+            if service is not None:
+                yield service
+
+    # -------- mnozstva --------
+    def qty(self, code: str) -> int:
+        return self.quantities.get(code, DEFAULT_QTY)
+
+    def set_qty(self, code: str, qty: int) -> None:
+        if qty == DEFAULT_QTY:
+            self.quantities.pop(code, None)
+        else:
+            self.quantities[code] = qty
+
+    # -------- ceny --------
+    def prices(self, service: Service) -> tuple[float, float]:
+        """(zakladna, alternativna) cena: prepisana, inak z katalogu."""
+        override = self.price_overrides.get(service.code)
+        return override if override is not None else (service.price, service.price2)
+
+    def override_price(self, code: str, base: float, alt: float) -> None:
+        self.price_overrides[code] = (float(base), float(alt))
+
+    def clear_price(self, code: str) -> None:
+        self.price_overrides.pop(code, None)
+
+    # -------- zmeny katalogu --------
+    def register(self, service: Service) -> None:
+        """Nova (uz pridana na koniec katalogu) alebo upravena sluzba: id + masky sekcii."""
+        self.index.register(service)
+        if service.code in self.selected.extra:
+            # kod z profilu, ktory medzitym pribudol do katalogu -> presun do masky
+            self.selected.extra.discard(service.code)
+            self.selected.add(service.code)
+
+    def rename(self, old_code: str, new_code: str) -> None:
+        # id (a teda aj bit vo vybere) ostava, meni sa len kluc indexu
+        self.index.rename(old_code, new_code)
+        if old_code in self.selected.extra:
+            self.selected.extra.discard(old_code)
+            self.selected.extra.add(new_code)
+        for mapping in (self.quantities, self.price_overrides):
+            if old_code in mapping:
+                mapping[new_code] = mapping.pop(old_code)
+
+    def remove(self, code: str) -> None:
+        """Volat pred zmazanim sluzby z katalogu (index ju este musi najst)."""
+        self.selected.discard(code)
+        self.index.retire(code)
+        self.quantities.pop(code, None)
+        self.price_overrides.pop(code, None)
+
+    def snapshot(self) -> SelectionSnapshot:
+        """Nemenna kopia, O(vyber + nepredvolene hodnoty)."""
+        return SelectionSnapshot(
+            selected=frozenset(self.selected),
+            quantities=MappingProxyType(dict(self.quantities)),
+            price_overrides=MappingProxyType(dict(self.price_overrides)),
+        )
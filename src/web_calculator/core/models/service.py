@@ -1,7 +1,48 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from sys import intern
+from typing import TYPE_CHECKING, Optional
 
+if TYPE_CHECKING:
+    from web_calculator.core.calculations.tiers import TierTable
 
-@dataclass
+# Sekcie hlavneho okna; sekcia sluzby sa odvodi zo zdroja raz pri vytvoreni / normalizacii
+SECTIONS = ("primary", "eshop", "backend")
+_SECTION_BY_SOURCE: dict[str, str] = {}
+
+
+def section_for_source(source: str) -> str:
+    """Sekcia pre (normalizovany) zdroj: PRIMARY, ESHOP*, WEB; inak "" (cache podla zdroja)."""
+    section = _SECTION_BY_SOURCE.get(source)
+    if section is None:
+        if source == "PRIMARY":
+            section = "primary"
+        elif source.startswith("ESHOP"):
+            section = "eshop"
+        elif source == "WEB":
+            section = "backend"
+        else:
+            section = ""
+        section = _SECTION_BY_SOURCE[source] = intern(section)
+    return section
+
+
+def normalize_service(service) -> None:
+    """
+    Internuje opakujuce sa polia (source, unit, bundle, tag), zdroj a bundle prevedie na velke
+    pismena a predpocita `section` a `bundle_key`. Vola sa pri vytvoreni sluzby a po jej uprave
+    v UI (funguje aj pre `ServiceView`), aby horuce cesty len porovnavali hotove hodnoty.
+    """
+    source = intern((service.source or "").strip().upper())
+    bundle = intern((service.bundle or "").strip().upper() or "NONE")
+    service.source = source
+    service.bundle = bundle
+    service.unit = intern(service.unit or "")
+    service.tag = intern(service.tag or "")
+    service.section = section_for_source(source)
+    service.bundle_key = "" if bundle == "NONE" else bundle
+
+
+@dataclass(slots=True)
 class Service:
     """Represents a single billable service or add-on."""
 
@@ -14,4 +55,14 @@ class Service:
     bundle: str = "NONE"  # START / MINI / BUSINESS / PRO_CMS / ESHOP_Z / ESHOP_P / NONE
     tag: str = ""
     info: str = ""
+    # Objemove pasma [{"from": 1, "price": 10}, {"from": 6, "price": 8}]; prazdne = jednotna `price`
+    tiers: list = field(default_factory=list)
+    # Kompilovane pasma (pri nacitani katalogu); neuklada sa do JSON
+    price_tiers: Optional["TierTable"] = field(default=None, repr=False, compare=False)
+    # Predpocitane pri normalizacii (neukladaju sa): sekcia okna a bundle kluc ("" = bez bundlu)
+    section: str = field(default="", init=False, repr=False, compare=False)
+    bundle_key: str = field(default="", init=False, repr=False, compare=False)
     # Optional package filter in future
+
+    def __post_init__(self) -> None:
+        normalize_service(self)
@@ -0,0 +1,272 @@
+"""
+Stabilne cisla (id) sluzieb a vyber ako bajtova maska.
+
+`ServiceIndex` prideli kazdemu riadku katalogu id v jeho poradi; id sa nemeni pri premenovani
+ani zmazani inej sluzby (zmazane id sa len vyradi), nove sluzby (pridane na koniec katalogu)
+dostanu dalsie id. Index nedrzi objekty sluzieb: riadok je id minus pocet vyradenych id pred nim
+a sluzba sa cita z katalogu az pri pouziti (`ServiceStore` tak nevytvara pohlad na kazdy riadok).
+Kod -> id je zoradene pole hashov kodov (16 B na sluzbu), zhoda sa overi kodom v katalogu.
+
+Vyber (`SelectedCodes`) je `bytearray` s 0/1 na id: test `code in selected` je O(1),
+prechod zvolenymi je `find` nad maskou (C rychlost) a hromadne operacie - zahrnute sluzby
+balika, cela sekcia - su jedna bitova operacia nad celou maskou (`int.from_bytes`) namiesto
+cyklu cez katalog. Masky sekcii a tagov sa pocitaju raz (pri `ServiceStore` priamo zo stlpcov
+internovanych hodnot) a drzia v cache az do zmeny katalogu.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import MutableSet
+from typing import Iterable, Iterator, Sequence
+
+from web_calculator.core.models.service import Service
+from web_calculator.core.models.service_store import ServiceStore
+
+
+class ServiceIndex:
+    """Kod <-> stabilne id <-> riadok katalogu a cache masiek skupin."""
+
+    __slots__ = ("_services", "_hashes", "_ids", "_retired", "_size", "_groups")
+
+    def __init__(self, services: Sequence[Service] = ()) -> None:
+        # Katalog sa nekopiruje; nove sluzby sa do neho pridavaju na koniec (`register` po `append`)
+        self._services = services
+        self._retired: list[int] = []  # vyradene id (zmazane sluzby), rastuco
+        self._size = len(services)
+        self._groups: dict[str, dict[str, bytes]] = {}
+        codes = services.codes() if isinstance(services, ServiceStore) else (s.code for s in services)
+        hashes = array("q", map(hash, codes))
+        order = sorted(range(len(hashes)), key=hashes.__getitem__)
+        self._hashes = array("q", (hashes[idx] for idx in order))
+        self._ids = array("q", order)
+
+    def __len__(self) -> int:
+        return self._size
+
+    # -------- id <-> riadok --------
+    def row(self, idx: int) -> int | None:
+        """Aktualny riadok katalogu pre id (None pre vyradene id)."""
+        before = bisect_left(self._retired, idx)
+        if before < len(self._retired) and self._retired[before] == idx:
+            return None
+        return idx - before
+
+    def _value(self, row: int, name: str):
+        services = self._services
+        if isinstance(services, ServiceStore):
+            return services.get_value(row, name)
+        return getattr(services[row], name)
+
+    def code(self, idx: int) -> str | None:
+        row = self.row(idx)
+        return None if row is None else self._value(row, "code")
+
+    def service(self, idx: int) -> Service | None:
+        row = self.row(idx)
+        return None if row is None else self._services[row]
+
+    def _candidates(self, code: str) -> range:
+        key = hash(code)
+        return range(bisect_left(self._hashes, key), bisect_right(self._hashes, key))
+
+    def id(self, code: str) -> int | None:
+        for pos in self._candidates(code):
+            idx = self._ids[pos]
+            if self.code(idx) == code:
+                return idx
+        return None
+
+    # -------- zmeny katalogu --------
+    def register(self, service: Service) -> int:
+        """Nova sluzba (uz pridana na koniec katalogu) alebo upravena sluzba; zmaze cache skupin."""
+        idx = self.id(service.code)
+        if idx is None:
+            idx = self._size
+            self._size += 1
+            self._insert(service.code, idx)
+        self._groups.clear()
+        return idx
+
+    def rename(self, old_code: str, new_code: str) -> None:
+        """Id ostava, meni sa len kluc; sluzba v katalogu moze mat uz novy kod."""
+        for pos in self._candidates(old_code):
+            idx = self._ids[pos]
+            if self.code(idx) in (old_code, new_code):
+                del self._hashes[pos]
+                del self._ids[pos]
+                self._insert(new_code, idx)
+                return
+
+    def retire(self, code: str) -> None:
+        """Vyradi id sluzby; volat pred zmazanim riadku z katalogu (ostatne id sa nemenia)."""
+        for pos in self._candidates(code):
+            idx = self._ids[pos]
+            if self.code(idx) == code:
+                del self._hashes[pos]
+                del self._ids[pos]
+                insort(self._retired, idx)
+                self._groups.clear()
+                return
+
+    def _insert(self, code: str, idx: int) -> None:
+        key = hash(code)
+        pos = bisect_right(self._hashes, key)
+        self._hashes.insert(pos, key)
+        self._ids.insert(pos, idx)
+
+    # -------- masky --------
+    def mask(self, codes: Iterable[str]) -> bytes:
+        """Maska (0/1 na id) pre zoznam kodov; kody mimo katalogu sa preskocia."""
+        mask = bytearray(self._size)
+        for code in codes:
+            idx = self.id(code)
+            if idx is not None:
+                mask[idx] = 1
+        return bytes(mask)
+
+    def group_masks(self, name: str) -> dict[str, bytes]:
+        """Masky podla hodnoty internovaneho pola `name` (jeden prechod stlpcom, potom z cache)."""
+        groups = self._groups.get(name)
+        if groups is None:
+            groups = self._groups[name] = {value: self._to_ids(rows) for value, rows in self._row_masks(name).items()}
+        return groups
+
+    def _row_masks(self, name: str) -> dict[str, bytes]:
+        services = self._services
+        if isinstance(services, ServiceStore):
+            column, values = services.interned_column(name)
+            if len(values) <= 256:
+                # cisla hodnot ako bajty; maska hodnoty = `translate` (C rychlost, bez objektov na riadok)
+                raw = array("B", column).tobytes()
+                return {value: raw.translate(bytes(int(k == code) for k in range(256))) for code, value in enumerate(values)}
+        building: dict[str, bytearray] = {}
+        size = len(services)
+        for row, service in enumerate(services):
+            value = getattr(service, name) or ""
+            bucket = building.get(value)
+            if bucket is None:
+                bucket = building[value] = bytearray(size)
+            bucket[row] = 1
+        return {value: bytes(bucket) for value, bucket in building.items()}
+
+    def _to_ids(self, rows: bytes) -> bytes:
+        # vyradene id nemaju riadok -> na ich miesto nula
+        if not self._retired:
+            return rows
+        mask = bytearray(rows)
+        for idx in self._retired:
+            mask[idx:idx] = b"\0"
+        return bytes(mask)
+
+    def section_mask(self, section: str) -> bytes:
+        return self.group_masks("section").get(section, b"")
+
+    def tag_mask(self, tags: Iterable[str]) -> bytes:
+        masks = self.group_masks("tag")
+        return mask_or(self._size, *(masks.get(tag, b"") for tag in tags))
+
+
+def _as_int(mask: bytes | bytearray) -> int:
+    return int.from_bytes(mask, "little")
+
+
+def mask_or(size: int, *masks: bytes | bytearray) -> bytes:
+    value = 0
+    for mask in masks:
+        value |= _as_int(mask)
+    return value.to_bytes(size, "little")
+
+
+def mask_and(size: int, mask: bytes | bytearray, other: bytes | bytearray) -> bytes:
+    return (_as_int(mask) & _as_int(other)).to_bytes(size, "little")
+
+
+def mask_andnot(size: int, mask: bytes | bytearray, remove: bytes | bytearray) -> bytes:
+    return (_as_int(mask) & ~_as_int(remove)).to_bytes(size, "little")
+
+
+class SelectedCodes(MutableSet):
+    """
+    Mnozina kodov nad bajtovou maskou `ServiceIndex` (rozhranie `set[str]`).
+    Kody mimo katalogu (napr. z profilu) su v malej mnozine `extra`.
+    """
+
+    __slots__ = ("index", "mask", "extra")
+
+    def __init__(self, index: ServiceIndex, codes: Iterable[str] = ()) -> None:
+        self.index = index
+        self.mask = bytearray(len(index))
+        self.extra: set[str] = set()
+        self.add_codes(codes)
+
+    @classmethod
+    def _from_iterable(cls, iterable: Iterable[str]) -> set[str]:
+        # vysledky mnozinovych operacii (`-`, `&`, ...) su obycajne `set`
+        return set(iterable)
+
+    def __contains__(self, code: object) -> bool:
+        if not isinstance(code, str):
+            return False
+        idx = self.index.id(code)
+        if idx is None:
+            return code in self.extra
+        return idx < len(self.mask) and self.mask[idx] == 1
+
+    def __len__(self) -> int:
+        return self.mask.count(1) + len(self.extra)
+
+    def ids(self) -> Iterator[int]:
+        """Id zvolenych sluzieb katalogu rastuco (poradie katalogu)."""
+        mask = self.mask
+        idx = mask.find(1)
+        while idx != -1:
+            yield idx
+            idx = mask.find(1, idx + 1)
+
+    def __iter__(self) -> Iterator[str]:
+        for idx in self.ids():
+            code = self.index.code(idx)
+            if code is not None:
+                yield code
+        yield from self.extra
+
+    def add(self, code: str) -> None:
+        idx = self.index.id(code)
+        if idx is None:
+            self.extra.add(code)
+            return
+        if idx >= len(self.mask):
+            self.mask.extend(bytes(idx + 1 - len(self.mask)))
+        self.mask[idx] = 1
+
+    def discard(self, code: str) -> None:
+        self.extra.discard(code)
+        idx = self.index.id(code)
+        if idx is not None and idx < len(self.mask):
+            self.mask[idx] = 0
+
+    def clear(self) -> None:
+        self.mask = bytearray(len(self.index))
+        self.extra.clear()
+
+    def add_codes(self, codes: Iterable[str]) -> None:
+        """Prida kody: sluzby katalogu jednou operaciou nad maskou, ostatne do `extra`."""
+        codes = list(codes)
+        self.add_mask(self.index.mask(codes))
+        self.extra.update(code for code in codes if self.index.id(code) is None)
+
+    def add_mask(self, mask: bytes | bytearray) -> None:
+        """Prida vsetky id z masky jednou operaciou."""
+        self.mask = bytearray(mask_or(len(self.index), self.mask, mask))
+
+    def remove_mask(self, mask: bytes | bytearray) -> None:
+        self.mask = bytearray(mask_andnot(len(self.index), self.mask, mask))
+
+    def covers(self, mask: bytes | bytearray) -> bool:
+        """Su zvolene vsetky id z masky?"""
+        return not _as_int(mask) & ~_as_int(self.mask)
+
+    def __repr__(self) -> str:
+        return f"SelectedCodes({set(self)!r})"
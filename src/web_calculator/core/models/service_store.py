@@ -0,0 +1,266 @@
+"""
+Kompaktne (stlpcove) ulozenie velkeho katalogu sluzieb.
+
+Namiesto objektu `Service` na kazdy riadok drzi `ServiceStore` stlpce:
+- ceny v `array('d')`,
+- `source`, `unit`, `bundle`, `tag` (a predpocitane `section`, `bundle_key`) ako male cisla
+  do tabulky internovanych retazcov,
+- `code`, `label`, `info` ako UTF-8 bajty v jednom bloku s offsetmi,
+- objemove pasma len pre riadky, ktore ich maju (riedky dict).
+
+Pristup cez index vracia `ServiceView` - tenky objekt s rovnakymi atributmi ako `Service`
+(citanie aj zapis idu priamo do stlpcov), takze UI a vypocty funguju bez zmeny. Pohlady su
+cachovane slabymi referenciami: kym niekto drzi pohlad na riadok, dalsi pristup vrati ten isty
+objekt (porovnanie `is` v UI plati). `dataclasses.replace` / `asdict` na pohlade funguju
+a `replace` vracia samostatnu `Service`.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import MutableSequence
+from dataclasses import fields
+from typing import Iterable, Iterator
+from weakref import WeakValueDictionary
+
+from web_calculator.core.models.service import Service
+
+# Stlpce podla typu ulozenia
+_PRICE_FIELDS = ("price", "price2")
+_INTERNED_FIELDS = ("source", "unit", "bundle", "tag", "section", "bundle_key")
+_TEXT_FIELDS = ("code", "label", "info")
+_SPARSE_FIELDS = ("tiers", "price_tiers")
+
+
+class _Interner:
+    """Tabulka opakujucich sa retazcov -> male cislo."""
+
+    __slots__ = ("values", "ids")
+
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self.ids: dict[str, int] = {}
+
+    def id(self, value: str) -> int:
+        key = value or ""
+        idx = self.ids.get(key)
+        if idx is None:
+            idx = self.ids[key] = len(self.values)
+            self.values.append(key)
+        return idx
+
+
+class _TextColumn:
+    """Retazce ako UTF-8 v jednom `bytearray`; prepis prida nove bajty na koniec (stare ostanu)."""
+
+    __slots__ = ("blob", "starts", "ends")
+
+    def __init__(self) -> None:
+        self.blob = bytearray()
+        self.starts = array("I")  # offsety do 4 GiB na stlpec
+        self.ends = array("I")
+
+    def _encode(self, value: str) -> tuple[int, int]:
+        data = (value or "").encode("utf-8")
+        start = len(self.blob)
+        self.blob += data
+        return start, start + len(data)
+
+    def get(self, row: int) -> str:
+        return self.blob[self.starts[row] : self.ends[row]].decode("utf-8")
+
+    def set(self, row: int, value: str) -> None:
+        self.starts[row], self.ends[row] = self._encode(value)
+
+    def insert(self, row: int, value: str) -> None:
+        start, end = self._encode(value)
+        self.starts.insert(row, start)
+        self.ends.insert(row, end)
+
+    def delete(self, row: int) -> None:
+        del self.starts[row]
+        del self.ends[row]
+
+
+class _Column:
+    """Descriptor atributu `ServiceView` (cita/zapisuje stlpec v store)."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        return view._store.get_value(view._row, self.name)
+
+    def __set__(self, view, value) -> None:
+        view._store.set_value(view._row, self.name, value)
+
+
+class ServiceView:
+    """Tenky pohlad na jeden riadok `ServiceStore` s rozhranim `Service`."""
+
+    __slots__ = ("_store", "_row", "__weakref__")
+    # `dataclasses.fields/asdict/replace` pracuju s pohladom ako so `Service`
+    __dataclass_fields__ = Service.__dataclass_fields__
+
+    def __new__(cls, *args, **kwargs):
+        # `dataclasses.replace(view, ...)` vola `type(view)(**polia)` -> samostatna `Service`
+        return Service(*args, **kwargs)
+
+    @classmethod
+    def _bind(cls, store: "ServiceStore", row: int) -> "ServiceView":
+        view = object.__new__(cls)
+        view._store = store
+        view._row = row
+        return view
+
+    def to_service(self) -> Service:
+        """Samostatna kopia riadku."""
+        # predpocitane polia (`section`, `bundle_key`) dopocita `Service.__post_init__`
+        return Service(**{f.name: getattr(self, f.name) for f in fields(Service) if f.init})
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Service, ServiceView)):
+            return all(getattr(self, f.name) == getattr(other, f.name) for f in fields(Service) if f.compare)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.to_service()).replace("Service(", "ServiceView(", 1)
+
+
+for _field in fields(Service):
+    setattr(ServiceView, _field.name, _Column(_field.name))
+del _field
+
+
+class ServiceStore(MutableSequence):
+    """Stlpcovy zoznam sluzieb; spravanie ako `list[Service]` (index, iteracia, append, del)."""
+
+    def __init__(self, services: Iterable[Service] = ()) -> None:
+        self._prices = {name: array("d") for name in _PRICE_FIELDS}
+        self._interned = {name: array("I") for name in _INTERNED_FIELDS}
+        self._tables = {name: _Interner() for name in _INTERNED_FIELDS}
+        self._texts = {name: _TextColumn() for name in _TEXT_FIELDS}
+        self._sparse: dict[str, dict[int, object]] = {name: {} for name in _SPARSE_FIELDS}
+        self._views: WeakValueDictionary[int, ServiceView] = WeakValueDictionary()
+        self._size = 0
+        for service in services:
+            self.append(service)
+
+    # -------- pristup k hodnotam --------
+    def get_value(self, row: int, name: str):
+        if name in self._prices:
+            return self._prices[name][row]
+        if name in self._interned:
+            return self._tables[name].values[self._interned[name][row]]
+        if name in self._texts:
+            return self._texts[name].get(row)
+        if name == "tiers":
+            # prazdne pasma sa neukladaju (zmena sa zapise az priradenim `view.tiers = [...]`)
+            return self._sparse[name].get(row) or []
+        return self._sparse[name].get(row)
+
+    def set_value(self, row: int, name: str, value) -> None:
+        if name in self._prices:
+            self._prices[name][row] = float(value)
+        elif name in self._interned:
+            self._interned[name][row] = self._tables[name].id(value)
+        elif name in self._texts:
+            self._texts[name].set(row, value)
+        elif value:
+            self._sparse[name][row] = value
+        else:
+            self._sparse[name].pop(row, None)
+
+    def codes(self) -> Iterator[str]:
+        """Kody riadkov priamo zo stlpca (bez vytvarania pohladov)."""
+        column = self._texts["code"]
+        for row in range(self._size):
+            yield column.get(row)
+
+    def interned_column(self, name: str) -> tuple[array, list[str]]:
+        """Stlpec internovaneho pola: (cisla hodnot po riadkoch, tabulka hodnot)."""
+        return self._interned[name], self._tables[name].values
+
+    # -------- MutableSequence --------
+    def __len__(self) -> int:
+        return self._size
+
+    def _row(self, index: int) -> int:
+        row = index + self._size if index < 0 else index
+        if not 0 <= row < self._size:
+            raise IndexError("service index out of range")
+        return row
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        row = self._row(index)
+        view = self._views.get(row)
+        if view is None:
+            view = self._views[row] = ServiceView._bind(self, row)
+        return view
+
+    def __iter__(self) -> Iterator[ServiceView]:
+        for row in range(self._size):
+            yield self[row]
+
+    def __setitem__(self, index: int, service: Service) -> None:
+        row = self._row(index)
+        for f in fields(Service):
+            self.set_value(row, f.name, getattr(service, f.name))
+
+    def insert(self, index: int, service: Service) -> None:
+        row = max(0, min(self._size, index + self._size if index < 0 else index))
+        for name, column in self._prices.items():
+            column.insert(row, float(getattr(service, name)))
+        for name, column in self._interned.items():
+            column.insert(row, self._tables[name].id(getattr(service, name)))
+        for name, column in self._texts.items():
+            column.insert(row, getattr(service, name))
+        self._shift(row, 1)
+        self._size += 1
+        for name in _SPARSE_FIELDS:
+            self.set_value(row, name, getattr(service, name))
+
+    def append(self, service: Service) -> None:
+        self.insert(self._size, service)
+
+    def __delitem__(self, index: int) -> None:
+        row = self._row(index)
+        view = self._views.pop(row, None)
+        if view is not None:
+            # odstraneny riadok ostane dostupny ako samostatna kopia
+            detached = self._detach(row)
+            view._store, view._row = detached, 0
+        for column in self._prices.values():
+            del column[row]
+        for column in self._interned.values():
+            del column[row]
+        for column in self._texts.values():
+            column.delete(row)
+        for name in _SPARSE_FIELDS:
+            self._sparse[name].pop(row, None)
+        self._shift(row + 1, -1)
+        self._size -= 1
+
+    def _detach(self, row: int) -> "ServiceStore":
+        return ServiceStore([ServiceView._bind(self, row).to_service()])
+
+    def _shift(self, start: int, delta: int) -> None:
+        """Posunie cisla riadkov >= start (pohlady a riedke stlpce) po vlozeni/zmazani."""
+        moved = sorted((row for row in self._views.keys() if row >= start), reverse=delta > 0)
+        for row in moved:
+            view = self._views.pop(row, None)
+            if view is not None:
+                view._row = row + delta
+                self._views[row + delta] = view
+        for name in _SPARSE_FIELDS:
+            sparse = self._sparse[name]
+            if any(row >= start for row in sparse):
+                self._sparse[name] = {(row + delta if row >= start else row): value for row, value in sparse.items()}
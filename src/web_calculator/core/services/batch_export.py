@@ -0,0 +1,148 @@
+"""
+Headless batch PDF export (napr. hromadne pregenerovanie faktur na konci mesiaca).
+
+Dokumenty sa renderuju paralelne v `ProcessPoolExecutor`; kazdy worker si pri starte
+nacita fonty do cache procesu, takze TTF sa necita pri kazdom dokumente. Vystupy sa
+zapisuju atomicky a pre kazdy dokument sa vracia cas, velkost alebo chyba.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Mapping, Sequence
+
+from web_calculator.core.services.catalog import Catalog, load_catalog
+from web_calculator.core.services.pdf_content import load_pdf_content
+from web_calculator.core.services.profile import build_payload_from_profile, load_client_profile
+from web_calculator.core.services.supplier import active_supplier_mapping, load_supplier
+from web_calculator.utils.pdf.core import fonts
+from web_calculator.utils.pdf.core.output import write_bytes_atomic
+from web_calculator.utils.pdf.renderers.pdf_renderer import render_pdf_bytes
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    output: Path
+    payload: Mapping
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    output: Path
+    ok: bool
+    seconds: float
+    size: int = 0
+    error: str = ""
+
+
+def jobs_from_profiles(
+    profile_paths: Iterable[str | Path],
+    out_dir: str | Path,
+    catalog: Catalog,
+    supplier: dict | None = None,
+    doc_type: str = "invoice",
+    issued: date | None = None,
+    as_of: date | None = None,
+    pdf_content: dict | None = None,
+) -> list[BatchJob]:
+    """
+    Build batch jobs from saved client profiles; output name = profile name + `.pdf`.
+    Vsetky dokumenty sa precenia k jednemu datumu vystavenia `issued` (akcie, predvolene dnes);
+    s `as_of` sa pouziju cennikove ceny z historie cien k tomu datumu. Upravy sekcii z `pdf_content`
+    (predvolene `pdf_content.json`) sa pouziju rovnako ako pri exporte v UI.
+    """
+    issued = issued or as_of or date.today()
+    pdf_content = load_pdf_content() if pdf_content is None else pdf_content
+    supplier_map = supplier if supplier is not None else active_supplier_mapping(load_supplier())
+    out_dir = Path(out_dir)
+    jobs: list[BatchJob] = []
+    for profile_path in profile_paths:
+        profile_path = Path(profile_path)
+        payload = build_payload_from_profile(
+            load_client_profile(profile_path),
+            catalog,
+            supplier_map,
+            doc_type,
+            issued=issued,
+            as_of=as_of,
+            pdf_content=pdf_content,
+        )
+        jobs.append(BatchJob(output=out_dir / f"{profile_path.stem}.pdf", payload=payload))
+    return jobs
+
+
+def export_batch(jobs: Sequence[BatchJob], max_workers: int | None = None) -> list[BatchResult]:
+    """
+    Render all jobs and return results in the same order.
+    `max_workers=1` renderuje v aktualnom procese (bez poolu); inak pocet jadier.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    workers = max_workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+    if workers == 1:
+        _init_worker()
+        return [_render_job(job) for job in jobs]
+    # Vacsie chunky znizuju reziu medziprocesovej komunikacie pri stovkach dokumentov.
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_render_job, jobs, chunksize=chunksize))
+
+
+def _init_worker() -> None:
+    fonts.warm_font_cache()
+
+
+def _render_job(job: BatchJob) -> BatchResult:
+    start = time.perf_counter()
+    try:
+        job.output.parent.mkdir(parents=True, exist_ok=True)
+        data = render_pdf_bytes(job.payload)
+        write_bytes_atomic(job.output, data)
+    except Exception as exc:
+        return BatchResult(output=job.output, ok=False, seconds=time.perf_counter() - start, error=f"{type(exc).__name__}: {exc}")
+    return BatchResult(output=job.output, ok=True, seconds=time.perf_counter() - start, size=len(data))
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Hromadny export PDF z ulozenych profilov klientov.")
+    parser.add_argument("profiles", nargs="+", help="JSON profily klientov")
+    parser.add_argument("--out", default="dist", help="cielovy priecinok")
+    parser.add_argument("--doc-type", default="invoice", choices=["quote", "proforma", "invoice"])
+    parser.add_argument("--catalog", default=None, help="cesta ku katalogu (priecinok alebo JSON)")
+    parser.add_argument("--pdf-content", type=Path, default=None, help="upravy sekcii PDF (predvolene pdf_content.json)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="datum vystavenia YYYY-MM-DD (predvolene dnes)")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None, help="ceny z historie k datumu YYYY-MM-DD")
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog(args.catalog)
+    jobs = jobs_from_profiles(
+        args.profiles,
+        args.out,
+        catalog,
+        doc_type=args.doc_type,
+        issued=args.date,
+        as_of=args.as_of,
+        pdf_content=load_pdf_content(args.pdf_content),
+    )
+    start = time.perf_counter()
+    results = export_batch(jobs, max_workers=args.workers)
+    failed = [r for r in results if not r.ok]
+    for res in results:
+        status = "OK " if res.ok else "ERR"
+        detail = f"{res.size} B" if res.ok else res.error
+        print(f"{status} {res.seconds * 1000:8.1f} ms  {res.output}  {detail}")
+    print(f"{len(results) - len(failed)}/{len(results)} OK za {time.perf_counter() - start:.2f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
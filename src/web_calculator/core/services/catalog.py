@@ -1,18 +1,52 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable
 
+from web_calculator.core.calculations.price_history import PriceHistory, parse_moment, price_change
+from web_calculator.core.calculations.promotions import PromotionIndex, promotion_problem
+from web_calculator.core.calculations.tiers import compile_tier_map, compile_tiers
 from web_calculator.core.models.package import Package
+from web_calculator.core.models.price_change import PriceChange
+from web_calculator.core.models.promotion import Promotion
 from web_calculator.core.models.service import Service
+from web_calculator.core.models.service_store import ServiceStore
+
+# Od tohto poctu sluzieb sa katalog drzi stlpcovo (`ServiceStore`), ak `compact` nie je zadane
+COMPACT_THRESHOLD = 50_000
 
 
 @dataclass
 class Catalog:
     packages: list[Package]
-    services: list[Service]
+    services: list[Service] | ServiceStore
+    promotions: list[Promotion] = field(default_factory=list)
+    # Index akcii podla datumu (zostavi sa pri nacitani, vid `index_promotions`)
+    promotion_index: PromotionIndex = field(default_factory=PromotionIndex, repr=False, compare=False)
+    # Historia cien (append-only `price_history.jsonl`), vid `record_price_change`
+    price_history: PriceHistory = field(default_factory=PriceHistory, repr=False, compare=False)
+    # Subor historie vedla nacitaneho katalogu; sem zapisuje `record_price_change`
+    history_path: Path | None = field(default=None, repr=False, compare=False)
+
+
+def index_promotions(catalog: Catalog) -> Catalog:
+    """
+    (Pre)stavia index akcii po nacitani alebo zmene `catalog.promotions`.
+    Neplatne akcie (zly datum, obrateny interval) sa s varovanim vynechaju z indexu, v katalogu ostanu.
+    """
+    valid: list[Promotion] = []
+    for promo in catalog.promotions:
+        problem = promotion_problem(promo)
+        if problem:
+            print(f"Warning: skipping promotion {promo.code}: {problem}")
+            continue
+        valid.append(promo)
+    catalog.promotion_index = PromotionIndex(valid)
+    return catalog
 
 
 def _load_packages(path: Path) -> list[Package]:
@@ -23,30 +57,137 @@ def _load_packages(path: Path) -> list[Package]:
         item = dict(item)
         item.setdefault("included_services", [])
         item.setdefault("included_quantities", {})
-        packages.append(Package(**item))
+        packages.append(_compile_package(Package(**item)))
     return packages
 
 
-def _load_services(path: Path) -> list[Service]:
+def _load_services(path: Path, into: list[Service] | ServiceStore | None = None) -> list[Service] | ServiceStore:
     data = json.loads(path.read_text(encoding="utf-8"))
     raw = data.get("services", data)
-    services: list[Service] = []
+    services = into if into is not None else []
     for item in raw:
         item = dict(item)
         item.setdefault("price2", 0.0)
         item.setdefault("bundle", "NONE")
-        services.append(Service(**item))
+        services.append(_compile_service(Service(**item)))
+    return services
+
+
+def _load_promotions(path: Path) -> list[Promotion]:
+    if not path.exists():
+        return []
+    data = json.loads(path.read_text(encoding="utf-8"))
+    raw = data.get("promotions", data) if isinstance(data, dict) else data
+    return _promotions_from(raw)
+
+
+def _promotions_from(raw: Iterable[dict]) -> list[Promotion]:
+    promotions: list[Promotion] = []
+    for item in raw:
+        try:
+            promotions.append(Promotion(**item))
+        except TypeError as exc:
+            # zaznam s chybajucim/neznamym polom nezablokuje nacitanie katalogu
+            print(f"Warning: skipping promotion {item!r}: {exc}")
+    return promotions
+
+
+def _load_price_history(path: Path) -> PriceHistory:
+    if not path.exists():
+        return PriceHistory()
+    changes = []
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                change = PriceChange(**json.loads(line))
+                parse_moment(change.changed_at)  # zly datum by inak zlyhal az pri zoradeni v `PriceHistory`
+            except (ValueError, TypeError):
+                # poskodeny riadok (napr. preruseny zapis) nezablokuje nacitanie zvysku
+                continue
+            changes.append(change)
+    return PriceHistory(changes)
+
+
+def record_price_change(
+    catalog: Catalog,
+    target: str,
+    code: str,
+    before: dict[str, float | None],
+    after: dict[str, float | None],
+    path: str | Path | None = None,
+    when: datetime | None = None,
+) -> PriceChange | None:
+    """
+    Prida zmenu ceny na koniec `price_history.jsonl` (nic sa neprepisuje) a do indexu katalogu.
+    Subor je `path`, inak ten vedla nacitaneho katalogu (`catalog.history_path`), inak `data/` balika.
+    Vracia zaznam, alebo None ak sa ceny nezmenili.
+    """
+    change = price_change(target, code, before, after, when)
+    if change is None:
+        return None
+    base_dir = Path(__file__).resolve().parents[2]
+    history_path = Path(path or catalog.history_path or base_dir / "data" / "price_history.jsonl")
+    if history_path.is_dir():
+        history_path = history_path / "price_history.jsonl"
+    with history_path.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(asdict(change), ensure_ascii=False) + "\n")
+    catalog.price_history.add(change)
+    return change
+
+
+def _compile_service(service: Service) -> Service:
+    # internovanie zdroja/tagu/jednotky/bundlu a `section`/`bundle_key` uz spravil `Service.__post_init__`
+    # objemove pasma sa kompiluju raz pri nacitani (bisect + prefixove sucty pri cenotvorbe)
+    service.price_tiers = compile_tiers(service.tiers)
+    return service
+
+
+def _compile_package(package: Package) -> Package:
+    package.compiled_tiers = compile_tier_map(package.service_tiers)
+    return package
+
+
+# Runtime polia (kompilovane pasma) sa do JSON neukladaju; prazdne pasma sa vynechaju
+_RUNTIME_FIELDS = ("price_tiers", "compiled_tiers", "section", "bundle_key")
+_OPTIONAL_FIELDS = ("tiers", "service_tiers")
+
+
+def _to_json(item) -> dict:
+    data = asdict(item)
+    for name in _RUNTIME_FIELDS:
+        data.pop(name, None)
+    for name in _OPTIONAL_FIELDS:
+        if name in data and not data[name]:
+            del data[name]
+    return data
+
+
+def _service_container(compact: bool | None) -> list[Service] | ServiceStore:
+    return ServiceStore() if compact else []
+
+
+def _finish_services(services: list[Service] | ServiceStore, compact: bool | None) -> list[Service] | ServiceStore:
+    # automaticky rezim: velky katalog sa po nacitani prevedie do stlpcov
+    if compact is None and not isinstance(services, ServiceStore) and len(services) > COMPACT_THRESHOLD:
+        return ServiceStore(services)
     return services
 
 
-def _load_from_combined(json_path: Path) -> Catalog:
+def _load_from_combined(json_path: Path, compact: bool | None = None) -> Catalog:
     data = json.loads(json_path.read_text(encoding="utf-8"))
-    packages = [Package(**item) for item in data.get("packages", [])]
-    services = _load_services(Path(json_path))
-    return Catalog(packages=packages, services=services)
+    packages = [_compile_package(Package(**item)) for item in data.get("packages", [])]
+    services = _finish_services(_load_services(Path(json_path), _service_container(compact)), compact)
+    promotions = _promotions_from(data.get("promotions", []))
+    catalog = Catalog(packages=packages, services=services, promotions=promotions)
+    catalog.history_path = json_path.parent / "price_history.jsonl"
+    catalog.price_history = _load_price_history(catalog.history_path)
+    return index_promotions(catalog)
 
 
-def _load_from_split(base_dir: Path) -> Catalog:
+def _load_from_split(base_dir: Path, compact: bool | None = None) -> Catalog:
     packages_path = base_dir / "data" / "packages.json"
     services_paths = [
         base_dir / "data" / "services_web.json",
@@ -56,19 +197,26 @@ def _load_from_split(base_dir: Path) -> Catalog:
     ]
     packages = _load_packages(packages_path)
 
-    services: list[Service] = []
+    services = _service_container(compact)
     for spath in services_paths:
         if spath.exists():
-            services.extend(_load_services(spath))
-    return Catalog(packages=packages, services=services)
+            _load_services(spath, services)
+    services = _finish_services(services, compact)
+    promotions = _load_promotions(base_dir / "data" / "promotions.json")
+    catalog = Catalog(packages=packages, services=services, promotions=promotions)
+    catalog.history_path = base_dir / "data" / "price_history.jsonl"
+    catalog.price_history = _load_price_history(catalog.history_path)
+    return index_promotions(catalog)
 
 
-def load_catalog(path: str | Path | None = None) -> Catalog:
+def load_catalog(path: str | Path | None = None, compact: bool | None = None) -> Catalog:
     """
     Load catalog primarne zo split JSON (packages + services_*); fallback Excel.
 
-    - Split JSON: `data/packages.json`, `data/services_web.json`, `data/services_eshop.json`, `data/services_primary.json`, volitelne `services_extra.json`
+    - Split JSON: `data/packages.json`, `data/services_web.json`, `data/services_eshop.json`, `data/services_primary.json`, volitelne `services_extra.json`, `promotions.json` a `price_history.jsonl`
     - Fallback Excel: odstranene (historicky len na import)
+    - `compact`: sluzby v stlpcovom `ServiceStore` (True), v zozname `Service` (False),
+      None = automaticky podla `COMPACT_THRESHOLD`.
     """
 
     base_dir = Path(__file__).resolve().parents[2]
@@ -80,14 +228,14 @@ def load_catalog(path: str | Path | None = None) -> Catalog:
         elif custom.exists():
             # Allow explicit combined path pre-existing, but prefer split if folder is provided.
             try:
-                return _load_from_combined(custom)
+                return _load_from_combined(custom, compact)
             except Exception as exc:
                 print(f"Warning: failed to load provided catalog {custom}: {exc}")
 
     packages_path = base_dir / "data" / "packages.json"
     if packages_path.exists():
         try:
-            return _load_from_split(base_dir)
+            return _load_from_split(base_dir, compact)
         except Exception as exc:
             print(f"Warning: failed to load split catalog: {exc}")
 
@@ -95,6 +243,15 @@ def load_catalog(path: str | Path | None = None) -> Catalog:
     return Catalog(packages=[], services=[])
 
 
+@lru_cache(maxsize=None)
+def _file_group(source: str) -> str:
+    # zdroj je po normalizacii internovany velkymi pismenami -> rozhodnutie raz na zdroj
+    for prefix in ("WEB", "PRIMARY", "ESHOP"):
+        if source.startswith(prefix):
+            return prefix
+    return "EXTRA"
+
+
 def save_catalog(catalog: Catalog, path: str | Path | None = None) -> Path:
     """
     Persist catalog do split JSON (packages.json + services_*).
@@ -112,26 +269,23 @@ def save_catalog(catalog: Catalog, path: str | Path | None = None) -> Path:
         "EXTRA": target_dir / "services_extra.json",
     }
 
-    pkg_payload = {"packages": [asdict(p) for p in catalog.packages]}
+    pkg_payload = {"packages": [_to_json(p) for p in catalog.packages]}
     pkg_path.write_text(json.dumps(pkg_payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
     grouped: dict[str, list[Service]] = {"WEB": [], "PRIMARY": [], "ESHOP": [], "EXTRA": []}
     for svc in catalog.services:
-        src = (svc.source or "").upper()
-        if src.startswith("WEB"):
-            grouped["WEB"].append(svc)
-        elif src.startswith("PRIMARY"):
-            grouped["PRIMARY"].append(svc)
-        elif src.startswith("ESHOP"):
-            grouped["ESHOP"].append(svc)
-        else:
-            grouped["EXTRA"].append(svc)
+        grouped[_file_group(svc.source)].append(svc)
 
     for key, items in grouped.items():
         path = services_paths[key]
-        payload = {"services": [asdict(s) for s in items]}
+        payload = {"services": [_to_json(s) for s in items]}
         path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
+    promo_path = target_dir / "promotions.json"
+    if catalog.promotions or promo_path.exists():
+        payload = {"promotions": [asdict(p) for p in catalog.promotions]}
+        promo_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
     return pkg_path
 
 
@@ -142,6 +296,6 @@ def save_packages(catalog: Catalog, path: str | Path | None = None) -> Path:
     """
     base_dir = Path(__file__).resolve().parents[2]
     pkg_path = Path(path) if path else base_dir / "data" / "packages.json"
-    payload = {"packages": [asdict(p) for p in catalog.packages]}
+    payload = {"packages": [_to_json(p) for p in catalog.packages]}
     pkg_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
     return pkg_path
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime
 from pathlib import Path
 from typing import Iterable, Optional
 
 from web_calculator.core.calculations.pricing_engine import PricingEngine
+from web_calculator.core.calculations.totals import TotalsSnapshot
 from web_calculator.core.models.package import Package
 from web_calculator.core.models.service import Service
 
@@ -49,72 +50,45 @@ def build_invoice_payload(
     doc_title: str = "Cenova ponuka",
     discount_pct: float = 0.0,
     original_package_price: float | None = None,
+    issued: date | None = None,
+    as_of: date | datetime | None = None,
 ) -> dict:
     """
     Build structured payload for invoice PDF rendering.
     Zlava sa uplatnuje na sumu bez DPH.
     - selections mozu obsahovat aj povodnu cenu: (service, qty, original_price).
+    - `issued`: datum vystavenia (predvolene `as_of`, inak dnes); ceny uz maju byt k nemu vyhodnotene.
+    - `as_of`: datum, ku ktoremu su ceny v `selections` (napr. z `PriceHistory`) pri opatovnom vystaveni.
     """
-    selections = list(selections)
-    breakdown = pricing.summarize(selections)
-    discount_amount = breakdown.total * (discount_pct / 100.0)
-    if vat_mode == "included":
-        total_with_vat = max(0.0, breakdown.total - discount_amount)
-        subtotal_no_vat = total_with_vat / (1 + vat_rate) if vat_rate > 0 else total_with_vat
-        vat = total_with_vat - subtotal_no_vat
-    else:
-        subtotal_no_vat = max(0.0, breakdown.total - discount_amount)
-        vat = subtotal_no_vat * vat_rate
-        total_with_vat = subtotal_no_vat + vat
-    today = date.today()
-    issue_date = today.strftime("%d/%m/%Y")
+    if issued is None and as_of is not None:
+        issued = as_of.date() if isinstance(as_of, datetime) else as_of
+    totals = pricing.totals(
+        selections,
+        discount_pct=discount_pct,
+        vat_rate=vat_rate,
+        vat_mode=vat_mode,
+        original_package_price=original_package_price,
+    )
+    return build_payload_from_totals(
+        totals, package, client, supplier=supplier, qr_data=qr_data, doc_title=doc_title, issued=issued
+    )
+
+
+def build_payload_from_totals(
+    totals: TotalsSnapshot,
+    package: Package | None,
+    client: dict,
+    supplier: dict | None = None,
+    qr_data: Optional[str] = None,
+    doc_title: str = "Cenova ponuka",
+    issued: date | None = None,
+) -> dict:
+    """
+    Payload z hotoveho `TotalsSnapshot` (napr. z cache hlavneho okna) bez dalsieho prepoctu.
+    """
+    issue_date = (issued or date.today()).strftime("%d/%m/%Y")
     invoice_no = generate_variable_symbol()
 
-    base_raw = package.base_price if package else 0.0
-    base_original_raw = original_package_price if original_package_price is not None else base_raw
-    if vat_mode == "included" and vat_rate > 0:
-        base_current = base_raw / (1 + vat_rate)
-        base_original = base_original_raw / (1 + vat_rate)
-    else:
-        base_current = base_raw
-        base_original = base_original_raw
-
-    items = []
-    extras_original = 0.0
-    extras_current = 0.0
-    for selection in selections:
-        if len(selection) == 3:
-            svc, qty, orig_price = selection  # type: ignore[misc]
-        else:
-            svc, qty = selection  # type: ignore[misc]
-            orig_price = svc.price
-        if vat_mode == "included" and vat_rate > 0:
-            unit_no_vat = svc.price / (1 + vat_rate)
-            orig_unit_no_vat = float(orig_price) / (1 + vat_rate)
-        else:
-            unit_no_vat = svc.price
-            orig_unit_no_vat = float(orig_price)
-
-        line_total = unit_no_vat * qty
-        original_total = float(orig_unit_no_vat) * qty
-        extras_original += original_total
-        extras_current += line_total
-        items.append(
-            {
-                "name": svc.label,
-                "unit": svc.unit,
-                "qty": qty,
-                "unit_price": unit_no_vat,
-                "total": line_total,
-                "original_unit_price": float(orig_unit_no_vat),
-                "original_total": original_total,
-            }
-        )
-
-    total_original_before_discount = base_original + extras_original
-    original_services_total = extras_original
-    base_for_totals = base_current if vat_mode == "included" else breakdown.base
-
     return {
         "invoice_no": invoice_no,
         "issue_date": issue_date,
@@ -128,25 +102,8 @@ def build_invoice_payload(
             "icdph": client.get("icdph") or "",
             "email": client.get("email") or "",
         },
-        "totals": {
-            "base": base_for_totals,
-            "extras": extras_current if vat_mode == "included" else breakdown.extras,
-            "original_base": base_original,
-            "original_extras": extras_original,
-            # Original services total is calculated "bez balika" (sum of service base prices).
-            # This value is used for the "povodna cena sluzieb" comparison in PDF.
-            "original_services_total": original_services_total,
-            "discount_pct": discount_pct,
-            "discount_amount": discount_amount,
-            "total_before_discount": breakdown.total,
-            "total_no_vat": subtotal_no_vat,
-            "vat": vat,
-            "total_with_vat": total_with_vat,
-            "vat_rate": vat_rate,
-            "vat_mode": vat_mode,
-            "original_total_before_discount": total_original_before_discount,
-        },
-        "items": items,
+        "totals": totals.as_totals(),
+        "items": totals.items(),
         "qr_data": qr_data,
         "doc_title": doc_title,
     }
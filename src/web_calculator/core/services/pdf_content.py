@@ -25,6 +25,10 @@ DEFAULT_CONTENT: Dict[str, dict] = {
 }
 
 
+# Sekcie vzdy z aktualnych dat (klient, VS, sumy); ulozene upravy sa pre ne nepouziju
+FRESH_SECTIONS = ("client_lines", "payment_lines", "summary_lines")
+
+
 def load_pdf_content(path: Path | None = None) -> dict:
     target = path or PDF_CONTENT_PATH
     if target.exists():
@@ -40,3 +44,32 @@ def save_pdf_content(data: dict, path: Path | None = None) -> Path:
     target.parent.mkdir(parents=True, exist_ok=True)
     target.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
     return target
+
+
+def merge_section_content(defaults: dict, saved: dict | None) -> dict:
+    """
+    Spoji ulozene uzivatelske upravy sekcii s defaultmi.
+    Ak uzivatel odstrani nejaky riadok (napr. IBAN), ponecha sa prazdny zoznam a neregeneruje sa z defaultov;
+    sekcie z `FRESH_SECTIONS` su vzdy cerstve defaulty (stare udaje klienta alebo VS sa nezobrazia).
+    """
+    saved = saved or {}
+    result: dict[str, list[str]] = {}
+    for key, def_lines in defaults.items():
+        if key not in FRESH_SECTIONS and key in saved:
+            result[key] = list(saved.get(key) or [])
+        else:
+            result[key] = def_lines
+    return result
+
+
+def apply_pdf_content(payload: dict, doc_type: str, content: dict | None = None) -> dict:
+    """
+    Doplni do payloadu `*_override` z ulozenych uprav dokumentu `doc_type` rovnako ako export v UI
+    (bez UI: defaulty sekcii doplni renderer). `content` = obsah `pdf_content.json`, None = nacitaj.
+    """
+    content = load_pdf_content() if content is None else content
+    saved = content.get(doc_type, {}) or {}
+    for key in saved:
+        if key.endswith("_lines") and key not in FRESH_SECTIONS:
+            payload[f"{key}_override"] = list(saved.get(key) or [])
+    return payload
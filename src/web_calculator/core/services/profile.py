@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+from datetime import date, datetime
+from pathlib import Path
+
+from web_calculator.core.calculations.pricing_engine import PricingEngine, effective_service_price, package_with_price
+from web_calculator.core.services.catalog import Catalog
+from web_calculator.core.services.invoice import build_invoice_payload
+from web_calculator.core.services.pdf_content import apply_pdf_content
+
+# Titulky dokumentov podla typu (zhodne s exportom v UI).
+DOC_TITLES = {
+    "quote": "Cenova ponuka",
+    "proforma": "Predfaktura",
+    "invoice": "Faktura",
+}
+
+
+def load_client_profile(path: str | Path) -> dict:
+    """Nacita ulozeny profil klienta (JSON z 'Uloz klienta')."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def build_payload_from_profile(
+    profile: dict,
+    catalog: Catalog,
+    supplier: dict | None = None,
+    doc_type: str = "invoice",
+    issued: date | None = None,
+    as_of: date | datetime | None = None,
+    pdf_content: dict | None = None,
+) -> dict:
+    """
+    Zostavi PDF payload z ulozeneho profilu klienta bez UI.
+    Ceny sa pocitaju rovnako ako v hlavnom okne (cenova uroven balika, zahrnute sluzby, bundle ceny)
+    vratane akcii platnych k datumu vystavenia `issued` (predvolene dnes).
+    - `as_of`: cennikove ceny z historie cien k tomuto datumu (opatovne vystavenie starej ponuky);
+      ak nie je zadany `issued`, doklad sa datuje tymto dnom.
+    - `pdf_content`: upravy sekcii dokumentov (`pdf_content.json`, None = nacitaj) ako pri exporte v UI.
+    """
+    if issued is None and as_of is not None:
+        issued = as_of.date() if isinstance(as_of, datetime) else as_of
+    issued = issued or date.today()
+    promotions = catalog.promotion_index
+    history = catalog.price_history if as_of is not None else None
+    price_mode = str(profile.get("price_mode") or "base")
+    pkg_code = profile.get("package")
+    raw_package = next((p for p in catalog.packages if p.code == pkg_code), None) if pkg_code else None
+    package = package_with_price(raw_package, price_mode, promotions, issued, history, as_of)
+    if history:
+        raw_package = history.package_as_of(raw_package, as_of)
+
+    selected = set(profile.get("services", []))
+    quantities = profile.get("quantities", {}) or {}
+    selections = []
+    for svc in catalog.services:
+        if svc.code not in selected:
+            continue
+        qty = int(quantities.get(svc.code, 1) or 1)
+        promo_price = promotions.service_price(svc.code, issued) if promotions else None
+        eff_price = effective_service_price(svc, package, qty, base_price=promo_price, history=history, as_of=as_of)
+        list_price = history.service_as_of(svc, as_of).price if history else svc.price
+        selections.append((replace(svc, price=eff_price), qty, list_price))
+
+    title = DOC_TITLES.get(doc_type, DOC_TITLES["quote"])
+    payload = build_invoice_payload(
+        package,
+        selections,
+        profile.get("client", {}) or {},
+        PricingEngine(package),
+        supplier=supplier,
+        vat_rate=float(profile.get("vat_rate", 0.23) or 0.0),
+        vat_mode=str(profile.get("vat_mode", "add") or "add"),
+        discount_pct=float(profile.get("discount_pct", 0.0) or 0.0),
+        doc_title=title,
+        original_package_price=raw_package.base_price if raw_package else None,
+        issued=issued,
+    )
+    total_with_vat = payload.get("totals", {}).get("total_with_vat", 0)
+    payload["qr_data"] = f"{title}:{payload.get('invoice_no', '')}:SUMA{total_with_vat}"
+    return apply_pdf_content(payload, doc_type, pdf_content)
+
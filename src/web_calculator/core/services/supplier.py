@@ -112,3 +112,19 @@ def save_supplier(data: dict, path: Path | None = None) -> Path:
     target.parent.mkdir(parents=True, exist_ok=True)
     target.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
     return target
+
+
+def active_supplier_mapping(data: dict) -> dict[str, str]:
+    """Flatten active supplier profile into `{code: value}` for PDF payloads."""
+    active_id = data.get("active")
+    profiles = data.get("profiles", [])
+    prof = next((p for p in profiles if p.get("id") == active_id), profiles[0] if profiles else {"fields": []})
+    mapping: dict[str, str] = {}
+    for item in prof.get("fields", []):
+        code = (item.get("code") or item.get("label") or "").strip()
+        val = (item.get("value") or "").strip()
+        if not code and not val:
+            continue
+        key = code or f"field_{len(mapping)+1}"
+        mapping[key] = val
+    return mapping
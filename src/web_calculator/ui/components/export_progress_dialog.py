@@ -0,0 +1,50 @@
+import tkinter as tk
+import customtkinter as ctk
+
+
+class ExportProgressDialog(ctk.CTkToplevel):
+    """
+    Nemodalne okno s priebehom PDF exportov na pozadi (aktualny dokument, pocet v rade, zrusenie).
+    """
+
+    def __init__(self, master: tk.Misc, on_cancel, on_cancel_all, firm_name: str = ""):
+        super().__init__(master)
+        suffix = f" - {firm_name}" if firm_name else ""
+        self.title(f"Export PDF{suffix}")
+        self.transient(master)
+        self.geometry("420x170")
+        self.minsize(360, 150)
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+
+        frame = ctk.CTkFrame(self, fg_color="transparent")
+        frame.pack(fill="both", expand=True, padx=16, pady=16)
+
+        self._current_var = tk.StringVar(value="")
+        self._queue_var = tk.StringVar(value="")
+        ctk.CTkLabel(frame, textvariable=self._current_var, font=("Segoe UI", 11, "bold")).pack(anchor="w")
+        self._bar = ctk.CTkProgressBar(frame, mode="indeterminate")
+        self._bar.pack(fill="x", pady=(8, 4))
+        ctk.CTkLabel(frame, textvariable=self._queue_var).pack(anchor="w")
+
+        btns = ctk.CTkFrame(frame, fg_color="transparent")
+        btns.pack(fill="x", pady=(10, 0))
+        ctk.CTkButton(btns, text="Zrusit vsetko", command=on_cancel_all).pack(side="right", padx=(6, 0))
+        ctk.CTkButton(btns, text="Zrusit", command=on_cancel).pack(side="right")
+        self._running = False
+
+    def update_state(self, current_label: str | None, queued: int) -> None:
+        if current_label is None and queued == 0:
+            self._stop()
+            self.withdraw()
+            return
+        self._current_var.set(f"Generujem: {current_label}" if current_label else "Caka na spracovanie...")
+        self._queue_var.set(f"V rade: {queued}" if queued else "")
+        self.deiconify()
+        if not self._running:
+            self._bar.start()
+            self._running = True
+
+    def _stop(self) -> None:
+        if self._running:
+            self._bar.stop()
+            self._running = False
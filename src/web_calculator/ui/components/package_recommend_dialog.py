@@ -0,0 +1,88 @@
+import tkinter as tk
+import customtkinter as ctk
+from tkinter import ttk
+from typing import Callable, Sequence
+
+from web_calculator.core.calculations.recommender import PackageQuote
+from web_calculator.core.models.package import Package
+
+
+class PackageRecommendDialog(ctk.CTkToplevel):
+    """Porovnanie balikov pre aktualny vyber sluzieb (najlacnejsie hore); dvojklik balik pouzije."""
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        quotes: Sequence[PackageQuote],
+        on_apply: Callable[[Package | None, str], None],
+        firm_name: str = "",
+    ):
+        super().__init__(master)
+        suffix = f" - {firm_name}" if firm_name else ""
+        self.title(f"Odporucanie balika{suffix}")
+        self.transient(master)
+        self.grab_set()
+        self.geometry("760x460")
+        self.minsize(620, 360)
+        self.resizable(True, True)
+        self._quotes = list(quotes)
+        self._on_apply = on_apply
+
+        main = ctk.CTkFrame(self, fg_color="transparent")
+        main.pack(fill="both", expand=True, padx=12, pady=12)
+        main.columnconfigure(0, weight=1)
+        main.rowconfigure(1, weight=1)
+        ctk.CTkLabel(
+            main,
+            text="Cena ponuky pri kazdom baliku a cenovej urovni (vratane sluzieb, ktore balik prida).",
+        ).grid(row=0, column=0, sticky="w", pady=(0, 6))
+
+        columns = ("package", "mode", "package_price", "services", "no_vat", "with_vat", "added")
+        tree = ttk.Treeview(main, columns=columns, show="headings", height=14)
+        for col, text, width, anchor in (
+            ("package", "Balik", 150, "w"),
+            ("mode", "Uroven", 60, "center"),
+            ("package_price", "Cena balika", 90, "e"),
+            ("services", "Sluzby", 90, "e"),
+            ("no_vat", "Spolu bez DPH", 100, "e"),
+            ("with_vat", "Spolu s DPH", 100, "e"),
+            ("added", "Prida", 50, "center"),
+        ):
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor=anchor)
+        for idx, quote in enumerate(self._quotes):
+            tree.insert(
+                "",
+                tk.END,
+                iid=str(idx),
+                values=(
+                    quote.package.code if quote.package else "Bez balika",
+                    quote.price_mode if quote.package else "-",
+                    f"{quote.package_price:.2f} EUR",
+                    f"{quote.services_total:.2f} EUR",
+                    f"{quote.total_no_vat:.2f} EUR",
+                    f"{quote.total_with_vat:.2f} EUR",
+                    len(quote.added_services) or "",
+                ),
+            )
+        scrollbar = ttk.Scrollbar(main, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.grid(row=1, column=0, sticky="nsew")
+        scrollbar.grid(row=1, column=1, sticky="ns")
+        tree.bind("<Double-Button-1>", lambda _e: self._apply())
+        if self._quotes:
+            tree.selection_set("0")
+        self._tree = tree
+
+        buttons = ctk.CTkFrame(main, fg_color="transparent")
+        buttons.grid(row=2, column=0, columnspan=2, sticky="e", pady=(10, 0))
+        ctk.CTkButton(buttons, text="Zavriet", command=self.destroy).pack(side="right", padx=(6, 0))
+        ctk.CTkButton(buttons, text="Pouzit balik", command=self._apply).pack(side="right")
+
+    def _apply(self) -> None:
+        selection = self._tree.selection()
+        if not selection:
+            return
+        quote = self._quotes[int(selection[0])]
+        self.destroy()
+        self._on_apply(quote.package, quote.price_mode)
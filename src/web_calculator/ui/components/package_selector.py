@@ -14,12 +14,14 @@ class PackageSelector(ctk.CTkFrame):
         on_select: Callable[[Package | None], None],
         on_price_mode_change: Callable[[str], None] | None = None,
         on_edit_package: Callable[[Package], None] | None = None,
+        on_recommend: Callable[[], None] | None = None,
     ):
         super().__init__(master, fg_color="transparent")
         self._packages = packages
         self._on_select = on_select
         self._on_price_mode_change = on_price_mode_change or (lambda _mode: None)
         self._on_edit_package = on_edit_package or (lambda _pkg: None)
+        self._on_recommend = on_recommend
         self._desc_var = tk.StringVar(value="")
         self._items: list[Package | None] = [None] + list(packages)
         self._price_mode = "base"
@@ -41,6 +43,8 @@ class PackageSelector(ctk.CTkFrame):
         self._mode_combo.pack(side="left", padx=(6, 0))
         theme.style_combo_box(self._mode_combo, theme.PALETTE)
         self._mode_combo.set(self._mode_var.get())
+        if self._on_recommend is not None:
+            ctk.CTkButton(mode_frame, text="Odporucit", width=90, command=self._on_recommend).pack(side="left", padx=(6, 0))
 
         self._list = tk.Listbox(self, height=max(1, min(8, len(self._items))), activestyle="dotbox")
         theme.style_listbox(self._list, theme.PALETTE)
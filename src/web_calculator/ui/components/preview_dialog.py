@@ -1,11 +1,10 @@
 import tkinter as tk
 import customtkinter as ctk
 from tkinter import ttk
-from typing import Iterable
 
-from web_calculator.core.calculations.pricing_engine import PricingBreakdown, PricingEngine
+from web_calculator.core.calculations.pricing_engine import PricingEngine
+from web_calculator.core.calculations.totals import TotalsSnapshot
 from web_calculator.core.models.package import Package
-from web_calculator.core.models.service import Service
 from web_calculator.ui.styles import theme
 
 
@@ -14,15 +13,14 @@ class PreviewDialog(ctk.CTkToplevel):
         self,
         master: tk.Misc,
         package: Package | None,
-        services: Iterable[tuple[Service, int]],
-        breakdown: PricingBreakdown,
-        discount_pct: float,
+        totals: TotalsSnapshot,
         pricing: PricingEngine,
-        vat_rate: float,
-        vat_mode: str,
         firm_name: str = "",
     ):
         super().__init__(master)
+        discount_pct = totals.discount_pct
+        vat_rate = totals.vat_rate
+        vat_mode = totals.vat_mode
         suffix = f" - {firm_name}" if firm_name else ""
         self.title(f"Nahlad objednavky{suffix}")
         self.transient(master)
@@ -58,34 +56,22 @@ class PreviewDialog(ctk.CTkToplevel):
         tree.column("total", width=110, anchor="e")
         tree.grid(row=4, column=0, columnspan=2, sticky="nsew")
 
-        total_no_vat = breakdown.total
-        discount_amount = total_no_vat * (discount_pct / 100.0)
-        if vat_mode == "included":
-            total_with_vat = max(0.0, total_no_vat - discount_amount)
-            subtotal = total_with_vat / (1 + vat_rate) if vat_rate > 0 else total_with_vat
-            vat = total_with_vat - subtotal
-        else:
-            subtotal = max(0.0, total_no_vat - discount_amount)
-            vat = subtotal * vat_rate
-            total_with_vat = subtotal + vat
-
-        for svc, qty in services:
-            line_total = svc.price * qty
+        for line in totals.lines:
             tree.insert(
                 "",
                 tk.END,
-                values=(svc.label, qty, f"{svc.price:.2f} EUR", f"{line_total:.2f} EUR"),
+                values=(line.service.label, line.qty, f"{line.unit_price:.2f} EUR", f"{line.total:.2f} EUR"),
             )
 
         summary = ctk.CTkFrame(main, fg_color="transparent")
         summary.grid(row=5, column=0, columnspan=2, sticky="e", pady=(10, 0))
         ctk.CTkLabel(summary, text="Bez DPH:").grid(row=0, column=0, sticky="e")
-        ctk.CTkLabel(summary, text=f"{subtotal:.2f} EUR").grid(row=0, column=1, sticky="e")
+        ctk.CTkLabel(summary, text=f"{totals.total_no_vat:.2f} EUR").grid(row=0, column=1, sticky="e")
         ctk.CTkLabel(summary, text=f"Zlava {discount_pct:.2f}%:").grid(row=1, column=0, sticky="e")
-        ctk.CTkLabel(summary, text=f"-{discount_amount:.2f} EUR").grid(row=1, column=1, sticky="e")
+        ctk.CTkLabel(summary, text=f"-{totals.discount_amount:.2f} EUR").grid(row=1, column=1, sticky="e")
         ctk.CTkLabel(summary, text=f"DPH {vat_rate*100:.2f}%:").grid(row=2, column=0, sticky="e")
-        ctk.CTkLabel(summary, text=f"{vat:.2f} EUR").grid(row=2, column=1, sticky="e")
+        ctk.CTkLabel(summary, text=f"{totals.vat:.2f} EUR").grid(row=2, column=1, sticky="e")
         ctk.CTkLabel(summary, text="Spolu s DPH:", font=("Segoe UI", 11, "bold")).grid(row=3, column=0, sticky="e", pady=(4, 0))
-        ctk.CTkLabel(summary, text=f"{total_with_vat:.2f} EUR", font=("Segoe UI", 11, "bold")).grid(row=3, column=1, sticky="e", pady=(4, 0))
+        ctk.CTkLabel(summary, text=f"{totals.total_with_vat:.2f} EUR", font=("Segoe UI", 11, "bold")).grid(row=3, column=1, sticky="e", pady=(4, 0))
 
         ctk.CTkButton(main, text="Zavriet", command=self.destroy).grid(row=6, column=0, columnspan=2, pady=10)
@@ -0,0 +1,84 @@
+import tkinter as tk
+import customtkinter as ctk
+from tkinter import ttk
+from typing import Callable, Sequence
+
+from web_calculator.core.calculations.scenarios import Scenario, ScenarioResult
+
+
+class ScenarioPanel(ctk.CTkFrame):
+    """
+    Porovnanie aktualnej ponuky pri inych zlavach, rezimoch DPH a cenovych urovniach.
+    Aktualne nastavenie je oznacene "*"; zoznam zliav sa da upravit (oddelene ciarkou).
+    """
+
+    _MODE_LABELS = {"add": "pripocitat", "included": "v cene"}
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        on_discounts_change: Callable[[list[float]], None] | None = None,
+        discounts: Sequence[float] = (0.0, 5.0, 10.0),
+    ):
+        super().__init__(master, fg_color="transparent")
+        self._on_discounts_change = on_discounts_change or (lambda _values: None)
+        self._discounts_var = tk.StringVar(value=", ".join(f"{d:g}" for d in discounts))
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.grid(row=0, column=0, sticky="we", padx=8)
+        ctk.CTkLabel(header, text="Porovnanie", font=("Segoe UI", 12, "bold")).pack(side="left")
+        entry = ctk.CTkEntry(header, width=120, textvariable=self._discounts_var, justify="right")
+        entry.pack(side="right")
+        ctk.CTkLabel(header, text="Zlavy (%)").pack(side="right", padx=(0, 6))
+        entry.bind("<Return>", lambda _e: self._handle_discounts())
+        entry.bind("<FocusOut>", lambda _e: self._handle_discounts())
+
+        columns = ("current", "price_mode", "vat_mode", "discount", "no_vat", "with_vat")
+        tree = ttk.Treeview(self, columns=columns, show="headings", height=6)
+        for col, text, width, anchor in (
+            ("current", "", 20, "center"),
+            ("price_mode", "Uroven", 60, "center"),
+            ("vat_mode", "DPH", 80, "center"),
+            ("discount", "Zlava", 60, "e"),
+            ("no_vat", "Bez DPH", 100, "e"),
+            ("with_vat", "S DPH", 100, "e"),
+        ):
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor=anchor)
+        tree.grid(row=1, column=0, sticky="nsew", padx=8, pady=(4, 0))
+        self._tree = tree
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+    def discounts(self) -> list[float]:
+        values: list[float] = []
+        for part in self._discounts_var.get().replace(";", ",").split(","):
+            raw = part.strip().replace("%", "")
+            if not raw:
+                continue
+            try:
+                value = float(raw)
+            except ValueError:
+                continue
+            values.append(min(100.0, max(0.0, value)))
+        return values
+
+    def _handle_discounts(self) -> None:
+        self._on_discounts_change(self.discounts())
+
+    def update_results(self, results: Sequence[ScenarioResult], current: Scenario) -> None:
+        self._tree.delete(*self._tree.get_children())
+        for result in results:
+            sc = result.scenario
+            self._tree.insert(
+                "",
+                tk.END,
+                values=(
+                    "*" if sc == current else "",
+                    sc.price_mode,
+                    f"{sc.vat_rate*100:g} % {self._MODE_LABELS.get(sc.vat_mode, sc.vat_mode)}",
+                    f"{sc.discount_pct:g} %",
+                    f"{result.total_no_vat:.2f} EUR",
+                    f"{result.total_with_vat:.2f} EUR",
+                ),
+            )
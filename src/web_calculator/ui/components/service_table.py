@@ -27,6 +27,7 @@ class ServiceTable(ctk.CTkFrame):
         on_edit_price: Callable[[Service], None],
         on_edit_qty: Callable[[Service], None],
         price_provider: Callable[[Service], float] | None = None,
+        on_toggle_all: Callable[[str], None] | None = None,
     ):
         super().__init__(master, fg_color="transparent")
         self._services: List[Service] = []
@@ -52,7 +53,11 @@ class ServiceTable(ctk.CTkFrame):
         container.pack(fill="both", expand=True, pady=(4, 0))
         container.bind("<Enter>", lambda _e: self._tree.focus_set())
         tree = ttk.Treeview(container, columns=columns, show="headings", selectmode="none", height=12)
-        tree.heading("check", text="[ ]")
+        if on_toggle_all is not None:
+            # klik na hlavicku stlpca zvoli/zrusi vsetky zobrazene sluzby sekcie
+            tree.heading("check", text="[ ]", command=lambda: on_toggle_all(self._table_id))
+        else:
+            tree.heading("check", text="[ ]")
         tree.heading("label", text="Sluzba", command=lambda: self._on_sort("label"))
         tree.heading("qty", text="Mnoz.")
         tree.heading("price", text="Cena", command=lambda: self._on_sort("price"))
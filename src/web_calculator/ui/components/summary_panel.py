@@ -1,7 +1,8 @@
 import tkinter as tk
 import customtkinter as ctk
 
-from web_calculator.core.calculations.pricing_engine import PricingBreakdown, PricingEngine
+from web_calculator.core.calculations.pricing_engine import PricingEngine
+from web_calculator.core.calculations.totals import TotalsSnapshot
 from web_calculator.ui.styles import theme
 
 
@@ -117,29 +118,19 @@ class SummaryPanel(ctk.CTkFrame):
         mode_txt = " (pripocitana)" if self._vat_mode == "add" else " (uz v cene)"
         return f"DPH {self._vat_rate*100:.2f} %{mode_txt}"
 
-    def update_values(self, breakdown: PricingBreakdown, discount_pct: float, vat_rate: float, vat_mode: str) -> None:
+    def update_values(self, totals: TotalsSnapshot) -> None:
         self._updating = True
         try:
-            self._discount_var.set(f"{discount_pct:.2f}")
-            self._vat_rate_var.set(f"{vat_rate*100:.2f}")
-            self._vat_mode_var.set(self._mode_labels.get(vat_mode, self._mode_labels["add"]))
+            self._discount_var.set(f"{totals.discount_pct:.2f}")
+            self._vat_rate_var.set(f"{totals.vat_rate*100:.2f}")
+            self._vat_mode_var.set(self._mode_labels.get(totals.vat_mode, self._mode_labels["add"]))
         finally:
             self._updating = False
 
-        self._vat_rate = vat_rate
-        self._vat_mode = vat_mode
-        discount_amount = breakdown.total * (discount_pct / 100.0)
-        if vat_mode == "included":
-            total_with_vat = max(0.0, breakdown.total - discount_amount)
-            subtotal = total_with_vat / (1 + self._vat_rate) if self._vat_rate > 0 else total_with_vat
-            vat = total_with_vat - subtotal
-        else:
-            subtotal = max(0.0, breakdown.total - discount_amount)
-            vat = subtotal * self._vat_rate
-            total_with_vat = subtotal + vat
-
-        self._discount_amount_var.set(f"- {self._pricing.format_currency(discount_amount)}")
-        self._total_var.set(self._pricing.format_currency(subtotal))
-        self._vat_var.set(self._pricing.format_currency(vat))
-        self._total_vat_var.set(self._pricing.format_currency(total_with_vat))
+        self._vat_rate = totals.vat_rate
+        self._vat_mode = totals.vat_mode
+        self._discount_amount_var.set(f"- {self._pricing.format_currency(totals.discount_amount)}")
+        self._total_var.set(self._pricing.format_currency(totals.total_no_vat))
+        self._vat_var.set(self._pricing.format_currency(totals.vat))
+        self._total_vat_var.set(self._pricing.format_currency(totals.total_with_vat))
         self._vat_label.configure(text=self._vat_label_text())
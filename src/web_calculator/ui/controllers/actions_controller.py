@@ -4,12 +4,17 @@ import json
 from pathlib import Path
 from tkinter import filedialog, messagebox
 
-from web_calculator.core.services.invoice import build_invoice_payload
+from web_calculator.core.models.selection_state import SelectionState
+from web_calculator.core.services.invoice import build_payload_from_totals
 from web_calculator.core.services.catalog import save_packages, save_catalog
-from web_calculator.core.services.pdf_content import load_pdf_content, save_pdf_content
+from web_calculator.core.services.pdf_content import load_pdf_content, merge_section_content, save_pdf_content
+from web_calculator.ui.components.export_progress_dialog import ExportProgressDialog
 from web_calculator.ui.components.pdf_export_dialog import PdfExportDialog
 from web_calculator.ui.components.pdf_content_dialog import PdfContentDialog
-from web_calculator.utils.pdf.exports import export_quote_pdf, export_proforma_pdf, export_invoice_pdf
+from web_calculator.ui.controllers.export_worker import ExportWorker
+from web_calculator.ui.controllers.prerender import PdfPrerenderer
+from web_calculator.utils.pdf.renderers.pdf_renderer import render_pdf_bytes
+from web_calculator.utils.pdf.sections.payment import payment_status_line
 
 
 class ActionsController:
@@ -18,9 +23,20 @@ class ActionsController:
     Drzi referenciu na hlavne okno, aby nemusel duplicovat stav.
     """
 
+    _DOC_MAP = {
+        "quote": ("Cenova ponuka", "ponuka"),
+        "proforma": ("Predfaktura", "predfaktura"),
+        "invoice": ("Faktura", "faktura"),
+    }
+
     def __init__(self, window) -> None:
         self.w = window
         self._pdf_content = load_pdf_content()
+        self._export_worker: ExportWorker | None = None
+        self._export_dialog: ExportProgressDialog | None = None
+        # Predrenderuje sa len naposledy exportovany typ dokumentu (na zaciatku ponuka)
+        self._last_doc_type = "quote"
+        self._prerender = PdfPrerenderer(self.w, self._build_prerender_payloads, render_pdf_bytes)
 
     # --- UI helpers ---
     def update_save_buttons(self) -> None:
@@ -45,8 +61,8 @@ class ActionsController:
             return
         data = {
             "package": self.w._current_package.code if self.w._current_package else None,
-            "services": list(self.w._selected_services),
-            "quantities": self.w._service_qty,
+            "services": list(self.w._selection.selected),
+            "quantities": self.w._selection.quantities,
             "client": client,
             "discount_pct": self.w._discount_pct,
             "price_mode": getattr(self.w, "_price_mode", "base"),
@@ -72,13 +88,17 @@ class ActionsController:
         self.w.package_selector.set_price_mode(price_mode)
         pkg_code = data.get("package")
         self.w.package_selector.select_package(pkg_code)
-        self.w._selected_services = set(data.get("services", []))
-        self.w._service_qty = data.get("quantities", {code: 1 for code in self.w._selected_services})
+        self.w._selection = SelectionState.restore(
+            data.get("services", []),
+            data.get("quantities"),
+            self.w._selection.price_overrides,
+            index=self.w._selection.index,
+        )
         self.w._discount_pct = float(data.get("discount_pct", 0.0) or 0.0)
         self.w._vat_rate = float(data.get("vat_rate", getattr(self.w, "_vat_rate", 0.23)) or 0.0)
         self.w._vat_mode = str(data.get("vat_mode", getattr(self.w, "_vat_mode", "add")) or "add")
         self.w.set_client_data(data.get("client", {}))
-        self.w.service_area.refresh_selection(self.w._selected_services, self.w._service_qty)
+        self.w.service_area.refresh_selection(self.w._selection.selected, self.w._selection.quantities)
         self.w._services.update_summary()
         self.update_save_buttons()
 
@@ -99,8 +119,7 @@ class ActionsController:
             if code or label or value:
                 supplier_options.append((code, label, value))
 
-        payload_preview = self._build_payload_for_preview(doc_type)
-        totals = payload_preview.get("totals", {}) if payload_preview else {}
+        totals = payload_preview.get("totals", {})
         fmt = self.w._pricing.format_currency
         payment_options = [
             ("vs", "Variabilny symbol", str(payload_preview.get("invoice_no", ""))),
@@ -156,12 +175,7 @@ class ActionsController:
         if not self.w.has_client_data():
             messagebox.showwarning("Export PDF", "Vypln aspon jeden udaj o klientovi alebo firme.")
             return
-        doc_map = {
-            "quote": ("Cenova ponuka", export_quote_pdf, "ponuka"),
-            "proforma": ("Predfaktura", export_proforma_pdf, "predfaktura"),
-            "invoice": ("Faktura", export_invoice_pdf, "faktura"),
-        }
-        title, exporter, default_name = doc_map.get(doc_type, doc_map["quote"])
+        title, default_name = self._DOC_MAP.get(doc_type, self._DOC_MAP["quote"])
         path = filedialog.asksaveasfilename(
             defaultextension=".pdf",
             filetypes=[("PDF", "*.pdf"), ("All files", "*.*")],
@@ -172,9 +186,27 @@ class ActionsController:
             return
         out_path = Path(path)
 
-        payload = self._build_payload_for_preview(doc_type, title=title)
+        payload = self._build_export_payload(doc_type, title)
         if payload is None:
             return
+        self._last_doc_type = doc_type
+        # Render bezi vo vlakne na pozadi; Tk slucka ostava responzivna aj pri dlhych dokumentoch.
+        # Ak uz je PDF predrenderovane z rovnakeho payloadu, len sa zapisu hotove bajty;
+        # cakajuce predrenderovanie ustupi exportu az do jeho konca (`_on_export_progress`).
+        ready = self._prerender.take(doc_type, payload)
+        self._prerender.hold()
+        self._get_export_worker().submit(
+            f"{title} ({out_path.name})",
+            out_path,
+            render=(lambda: ready) if ready is not None else (lambda: render_pdf_bytes(payload)),
+            on_done=lambda p: messagebox.showinfo(title, f"PDF ulozene:\n{p}"),
+            on_error=lambda exc: self._show_export_error(title, exc),
+        )
+
+    def _build_export_payload(self, doc_type: str, title: str) -> dict | None:
+        payload = self._build_payload_for_preview(doc_type, title=title)
+        if payload is None:
+            return None
         # apply per-document overrides for freeform text sections
         defaults = self._build_section_content(doc_type, payload)
         payload["supplier_lines_override"] = defaults.get("supplier_lines", [])
@@ -186,43 +218,59 @@ class ActionsController:
             payload["qr_data"] = f"{title}:{payload.get('invoice_no','')}:SUMA{total_with_vat}"
         except Exception:
             pass
-        try:
-            exporter(out_path, payload)
-        except PermissionError:
+        return payload
+
+    def schedule_prerender(self) -> None:
+        """Zmena vyberu/klienta/sum: po chvili necinnosti predrenderuj PDF na pozadi."""
+        self._prerender.schedule()
+
+    def _build_prerender_payloads(self) -> dict[str, dict] | None:
+        if not self.w.has_client_data():
+            return None
+        doc_type = self._last_doc_type
+        title, _default_name = self._DOC_MAP.get(doc_type, self._DOC_MAP["quote"])
+        payload = self._build_export_payload(doc_type, title)
+        return {doc_type: payload} if payload is not None else None
+
+    def _show_export_error(self, title: str, exc: BaseException) -> None:
+        if isinstance(exc, PermissionError):
             messagebox.showerror(
                 title,
                 "Export zlyhal: subor je pravdepodobne otvoreny alebo zamknuty.\n"
                 "Zatvor PDF prehliadac alebo zvol iny nazov umiestnenia a skus znova.",
             )
             return
-        except Exception as exc:  # pragma: no cover (UI feedback)
-            messagebox.showerror(title, f"Export zlyhal:\n{exc}")
-            return
-        messagebox.showinfo(title, f"PDF ulozene:\n{out_path}")
+        messagebox.showerror(title, f"Export zlyhal:\n{exc}")
+
+    def _get_export_worker(self) -> ExportWorker:
+        if self._export_worker is None:
+            self._export_worker = ExportWorker(self.w, on_change=self._on_export_progress)
+        return self._export_worker
+
+    def _on_export_progress(self, current, queued: int) -> None:
+        if not self._get_export_worker().is_busy():
+            self._prerender.release()
+        if self._export_dialog is None or not self._export_dialog.winfo_exists():
+            if current is None and queued == 0:
+                return
+            worker = self._get_export_worker()
+            self._export_dialog = ExportProgressDialog(
+                self.w,
+                on_cancel=lambda: worker.cancel(),
+                on_cancel_all=worker.cancel_all,
+                firm_name=self.w._supplier_display_name(),
+            )
+        self._export_dialog.update_state(current.label if current else None, queued)
 
     def _build_payload_for_preview(self, doc_type: str, title: str | None = None) -> dict | None:
-        selections = []
-        for s in self.w._catalog.services:
-            if s.code not in self.w._selected_services:
-                continue
-            eff = self.w._services.with_effective_price(s)
-            qty = self.w._service_qty.get(s.code, 1)
-            original_price = self.w._base_prices.get(s.code, (s.price, s.price2))[0]
-            selections.append((eff, qty, original_price))
-
-        payload = build_invoice_payload(
+        # Sumy sa neprepocitavaju: snapshot pre aktualnu reviziu stavu zdiela aj suhrn a nahlad.
+        return build_payload_from_totals(
+            self.w._services.current_totals(),
             self.w._current_package,
-            selections,
             self.w.client_data(),
-            self.w._pricing,
             supplier=self.w.supplier_data(),
-            vat_rate=self.w._vat_rate,
-            vat_mode=self.w._vat_mode,
-            discount_pct=self.w._discount_pct,
             doc_title=title or doc_type,
-            original_package_price=self.w._current_package_raw.base_price if self.w._current_package_raw else None,
         )
-        return payload
 
     def _build_section_defaults(self, doc_type: str, payload: dict) -> dict:
         fmt = self.w._pricing.format_currency
@@ -242,7 +290,7 @@ class ActionsController:
             f"Variabilny symbol: {invoice_no}",
             f"Datum vystavenia: {issue_date}",
             f"Balik: {package_label}",
-            "Stav: Nezaplateny",
+            payment_status_line(payload),
         ]
 
         client = payload.get("client", {}) or {}
@@ -279,31 +327,16 @@ class ActionsController:
         }
 
     def _build_section_content(self, doc_type: str, payload: dict) -> dict:
-        """
-        Combine ulozene uzivatelske upravy s defaultmi.
-        Ak uzivatel odstrani nejaky riadok (napr. IBAN), ponechame prazdny zoznam a neregenerujeme ho z defaultov.
-        Pre citlive sekcie (client_lines, payment_lines) vsak berieme vzdy cerstve defaulty,
-        aby sa nezobrazovali stare udaje pri zmene klienta alebo VS.
-        """
+        """Combine ulozene uzivatelske upravy s defaultmi (`merge_section_content`, rovnako ako hromadny export)."""
         defaults = self._build_section_defaults(doc_type, payload)
-        saved = self._pdf_content.get(doc_type, {}) or {}
-        result: dict[str, list[str]] = {}
-        for key, def_lines in defaults.items():
-            if key in ("client_lines", "payment_lines", "summary_lines"):
-                result[key] = def_lines
-            elif key in saved:
-                result[key] = list(saved.get(key) or [])
-            else:
-                result[key] = def_lines
-        return result
+        return merge_section_content(defaults, self._pdf_content.get(doc_type, {}))
 
     def reset_selection(self) -> None:
-        self.w._selected_services.clear()
+        self.w._selection.clear()
         self.w._current_package = None
         self.w._current_package_raw = None
-        self.w._service_qty = {s.code: 1 for s in self.w._catalog.services}
         self.w._discount_pct = 0.0
         self.w.package_selector.select_none()
-        self.w.service_area.refresh_selection(self.w._selected_services, self.w._service_qty)
+        self.w.service_area.refresh_selection(self.w._selection.selected, self.w._selection.quantities)
         self.w._services.update_summary()
         self.update_save_buttons()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from web_calculator.utils.pdf.core.output import write_bytes_atomic
+
+
+@dataclass
+class ExportJob:
+    job_id: int
+    label: str
+    out_path: Path
+    render: Callable[[], bytes]
+    on_done: Callable[[Path], None]
+    on_error: Callable[[BaseException], None]
+    cancelled: threading.Event = field(default_factory=threading.Event)
+
+
+class ExportWorker:
+    """
+    Rad PDF exportov spracovany vo vlakne na pozadi.
+
+    Render (fonty, QR, sekcie, builder) bezi mimo Tk slucky; vysledky sa vracaju do hlavneho
+    vlakna cez `after()` polling, takze callbacky (`on_done`/`on_error`/`on_change`) mozu
+    bezpecne pracovat s widgetmi. Zrusenie: cakajuce joby sa preskocia, beziaci job sa
+    dorenderuje, ale subor sa nezapise.
+    """
+
+    def __init__(self, root, poll_ms: int = 80, on_change: Callable[[ExportJob | None, int], None] | None = None) -> None:
+        self._root = root
+        self._poll_ms = poll_ms
+        self._on_change = on_change or (lambda _current, _queued: None)
+        self._jobs: "queue.Queue[ExportJob | None]" = queue.Queue()
+        self._results: "queue.Queue[tuple[str, ExportJob, BaseException | None]]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._pending: dict[int, ExportJob] = {}
+        self._current: ExportJob | None = None
+        self._poll_id = None
+        self._thread = threading.Thread(target=self._run, name="pdf-export", daemon=True)
+        self._thread.start()
+
+    # --- API (hlavne vlakno) ---
+    def submit(
+        self,
+        label: str,
+        out_path: Path,
+        render: Callable[[], bytes],
+        on_done: Callable[[Path], None],
+        on_error: Callable[[BaseException], None],
+    ) -> int:
+        job = ExportJob(next(self._ids), label, Path(out_path), render, on_done, on_error)
+        self._pending[job.job_id] = job
+        self._jobs.put(job)
+        self._notify()
+        self._schedule_poll()
+        return job.job_id
+
+    def cancel(self, job_id: int | None = None) -> None:
+        """Zrus konkretny job alebo (bez id) aktualne beziaci."""
+        target = self._pending.get(job_id) if job_id is not None else self._current
+        if target is not None:
+            target.cancelled.set()
+
+    def cancel_all(self) -> None:
+        for job in list(self._pending.values()):
+            job.cancelled.set()
+
+    def queued_count(self) -> int:
+        return sum(1 for job in self._pending.values() if job is not self._current and not job.cancelled.is_set())
+
+    def is_busy(self) -> bool:
+        return bool(self._pending)
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        self._jobs.put(None)
+
+    # --- Worker vlakno ---
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if job.cancelled.is_set():
+                self._results.put(("cancelled", job, None))
+                continue
+            self._results.put(("started", job, None))
+            try:
+                data = job.render()
+                if job.cancelled.is_set():
+                    self._results.put(("cancelled", job, None))
+                    continue
+                write_bytes_atomic(job.out_path, data)
+            except BaseException as exc:  # noqa: BLE001 - chyba ide do UI
+                self._results.put(("error", job, exc))
+                continue
+            self._results.put(("done", job, None))
+
+    # --- Polling (hlavne vlakno) ---
+    def _schedule_poll(self) -> None:
+        if self._poll_id is None:
+            self._poll_id = self._root.after(self._poll_ms, self._poll)
+
+    def _poll(self) -> None:
+        self._poll_id = None
+        while True:
+            try:
+                state, job, exc = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if state == "started":
+                self._current = job
+            else:
+                self._pending.pop(job.job_id, None)
+                if self._current is job:
+                    self._current = None
+                if state == "done":
+                    job.on_done(job.out_path)
+                elif state == "error" and exc is not None:
+                    job.on_error(exc)
+            self._notify()
+        if self._pending:
+            self._schedule_poll()
+
+    def _notify(self) -> None:
+        self._on_change(self._current, self.queued_count())
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Mapping
+
+from web_calculator.utils.pdf.core.render_cache import cache_key
+
+
+class PdfPrerenderer:
+    """
+    Predrenderovanie PDF na pozadi po zmene vyberu, klienta alebo sum.
+
+    `schedule()` sa vola z hlavneho vlakna pri kazdej zmene; po `delay_ms` necinnosti sa
+    payloady zostavia v hlavnom vlakne (citaju Tk stav) a renderuju vo vlakne na pozadi.
+    Kazda zmena zvysi generaciu, takze zastarany render sa prerusi medzi dokumentmi a jeho
+    vysledok sa zahodi. Export si hotove bajty vyzdvihne cez `take()`, ak payload sedi.
+    Skutocny export ma prednost: `hold()` zahodi cakajuce predrenderovanie a dalsie odlozi,
+    kym `release()` (export dobehol) neoznami volny renderer.
+    """
+
+    def __init__(
+        self,
+        root,
+        build_payloads: Callable[[], Mapping[str, Mapping] | None],
+        render: Callable[[Mapping], bytes],
+        delay_ms: int = 700,
+    ) -> None:
+        self._root = root
+        self._build_payloads = build_payloads
+        self._render = render
+        self._delay_ms = delay_ms
+        self._after_id = None
+        self._held = False
+        self._deferred = False
+        self._generation = 0
+        self._request: tuple[int, dict[str, Mapping]] | None = None
+        self._ready: dict[str, tuple[str, bytes]] = {}
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="pdf-prerender", daemon=True)
+        self._thread.start()
+
+    # --- API (hlavne vlakno) ---
+    def schedule(self) -> None:
+        with self._cond:
+            self._generation += 1
+            self._request = None
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._held:
+            self._deferred = True
+            return
+        self._after_id = self._root.after(self._delay_ms, self._fire)
+
+    def hold(self) -> None:
+        """Export ma prednost: zrusi naplanovane/cakajuce predrenderovanie, nove odlozi do `release()`."""
+        self._held = True
+        with self._cond:
+            if self._request is not None:
+                self._request = None
+                self._deferred = True
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+            self._deferred = True
+
+    def release(self) -> None:
+        """Export dobehol; odlozene predrenderovanie sa naplanuje znova."""
+        if not self._held:
+            return
+        self._held = False
+        if self._deferred:
+            self._deferred = False
+            self.schedule()
+
+    def take(self, doc_type: str, payload: Mapping) -> bytes | None:
+        """Hotove PDF pre dany typ dokumentu, ak bolo vyrenderovane z rovnakeho payloadu."""
+        with self._cond:
+            entry = self._ready.get(doc_type)
+        if entry is None or entry[0] != cache_key(payload):
+            return None
+        return entry[1]
+
+    def _fire(self) -> None:
+        self._after_id = None
+        if self._held:
+            self._deferred = True
+            return
+        try:
+            payloads = self._build_payloads()
+        except Exception:
+            return
+        if not payloads:
+            return
+        with self._cond:
+            self._request = (self._generation, dict(payloads))
+            self._cond.notify()
+
+    # --- Worker vlakno ---
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._request is None:
+                    self._cond.wait()
+                generation, payloads = self._request
+                self._request = None
+            for doc_type, payload in payloads.items():
+                if generation != self._generation:
+                    break
+                try:
+                    data = self._render(payload)
+                except Exception:
+                    continue
+                with self._cond:
+                    if generation == self._generation:
+                        self._ready[doc_type] = (cache_key(payload), data)
@@ -4,15 +4,22 @@ import json
 import tkinter as tk
 import customtkinter as ctk
 from dataclasses import replace
+from datetime import date
 from pathlib import Path
 from tkinter import messagebox, simpledialog
 from typing import Iterable, Set
 
+from web_calculator.core.calculations.pricing_engine import effective_service_price, package_with_price
+from web_calculator.core.calculations.recommender import recommend_packages
+from web_calculator.core.calculations.scenarios import Scenario, scenario_grid, sweep
+from web_calculator.core.calculations.totals import TotalsSnapshot
 from web_calculator.core.models.package import Package
-from web_calculator.core.models.service import Service
-from web_calculator.core.services.catalog import save_catalog, save_packages
+from web_calculator.core.models.service import SECTIONS, Service, normalize_service
+from web_calculator.core.models.service_index import mask_and, mask_andnot
+from web_calculator.core.services.catalog import record_price_change, save_catalog, save_packages
 from web_calculator.core.services.invoice import build_invoice_payload
 from web_calculator.ui.components.service_editor_window import ServiceEditorWindow
+from web_calculator.ui.components.package_recommend_dialog import PackageRecommendDialog
 from web_calculator.ui.components.preview_dialog import PreviewDialog
 from web_calculator.ui.components.search_dialog import SearchDialog
 
@@ -44,43 +51,51 @@ class ServiceController:
         self.update_summary()
 
     def _package_with_price(self, package: Package | None) -> Package | None:
-        if not package:
-            return None
-        price = package.base_price
-        if self.w._price_mode == "promo" and package.promo_price is not None:
-            price = package.promo_price
-        elif self.w._price_mode == "intra" and package.intra_price is not None:
-            price = package.intra_price
-        return replace(package, base_price=price)
+        return package_with_price(package, self.w._price_mode, self.w._catalog.promotion_index, date.today())
 
     # -------- Service handling --------
     def refresh_service_tables(self, package: Package | None) -> None:
         all_services: list[Service] = [
             s for s in self.w._catalog.services if self._matches_filters(s) and s.code not in self.w._hidden_service_codes
         ]
-        primary = [s for s in all_services if (s.source or "").upper() == "PRIMARY"]
-        eshop = [s for s in all_services if (s.source or "").upper().startswith("ESHOP")]
-        backend = [s for s in all_services if (s.source or "").upper() == "WEB"]
+        # sekcia je predpocitana pri nacitani (`Service.section`) -> jeden prechod bez `.upper()`
+        sections: dict[str, list[Service]] = {"primary": [], "eshop": [], "backend": [], "": []}
+        for s in all_services:
+            sections[s.section].append(s)
 
-        primary_sorted = self._apply_sort(primary)
-        eshop_sorted = self._apply_sort(eshop)
-        backend_sorted = self._apply_sort(backend)
+        primary_sorted = self._apply_sort(sections["primary"])
+        eshop_sorted = self._apply_sort(sections["eshop"])
+        backend_sorted = self._apply_sort(sections["backend"])
 
         self.w.service_area.set_services(
-            primary_sorted, eshop_sorted, backend_sorted, self.w._selected_services, self.w._service_qty
+            primary_sorted, eshop_sorted, backend_sorted, self.w._selection.selected, self.w._selection.quantities
         )
         self._refresh_service_editor_windows()
 
     def on_service_toggle(self, service: Service, selected: bool) -> None:
         if selected:
-            self.w._selected_services.add(service.code)
-            self.w._service_qty.setdefault(service.code, 1)
+            self.w._selection.select(service.code)
         else:
-            self.w._selected_services.discard(service.code)
-        self.w.service_area.refresh_selection(self.w._selected_services, self.w._service_qty)
+            self.w._selection.deselect(service.code)
+        self.w.service_area.refresh_selection(self.w._selection.selected, self.w._selection.quantities)
+        self._refresh_service_editor_windows()
+        self.update_summary()
+
+    def toggle_section(self, section_id: str) -> None:
+        """Zvoli (alebo zrusi, ak su uz zvolene) vsetky zobrazene sluzby sekcie jednou operaciou nad maskou."""
+        self.w._selection.toggle_mask(self._visible_section_mask(section_id))
+        self.w.service_area.refresh_selection(self.w._selection.selected, self.w._selection.quantities)
         self._refresh_service_editor_windows()
         self.update_summary()
 
+    def _visible_section_mask(self, section_id: str) -> bytes:
+        index = self.w._selection.index
+        size = len(index)
+        mask = mask_andnot(size, index.section_mask(section_id), index.mask(self.w._hidden_service_codes))
+        if self.w._filter_tags:
+            mask = mask_and(size, mask, index.tag_mask(self.w._filter_tags))
+        return mask
+
     def on_filter_header(self, field: str) -> None:
         tags = {s.tag for s in self.w._catalog.services if s.tag}
         from web_calculator.ui.components.filter_dialog import FilterDialog
@@ -137,16 +152,18 @@ class ServiceController:
         except ValueError:
             messagebox.showerror("Chyba", "Zadaj platne cislo.")
             return
+        before = {"price": service.price, "price2": service.price2}
         service.price = price
-        _, alt = self.w._base_prices.get(service.code, (price, service.price2))
-        self.w._base_prices[service.code] = (price, alt)
+        record_price_change(self.w._catalog, "service", service.code, before, {"price": price, "price2": service.price2})
+        # nova cena je v katalogu, pripadne rucne prepisanie uz neplati
+        self.w._selection.clear_price(service.code)
         save_catalog(self.w._catalog)
         self.refresh_service_tables(self.w._current_package)
         self.update_summary()
         self._refresh_service_editor_windows()
 
     def edit_service_qty(self, _section: str, service: Service) -> None:
-        current = self.w._service_qty.get(service.code, 1)
+        current = self.w._selection.qty(service.code)
         value = simpledialog.askstring(
             "Upravit mnozstvo",
             f"Nova hodnota pre:\n{service.label}",
@@ -163,9 +180,9 @@ class ServiceController:
         if qty <= 0:
             messagebox.showerror("Chyba", "Mnozstvo musi byt vacsie ako 0.")
             return
-        self.w._service_qty[service.code] = qty
-        self.w._selected_services.add(service.code)
-        self.w.service_area.refresh_selection(self.w._selected_services, self.w._service_qty)
+        self.w._selection.set_qty(service.code, qty)
+        self.w._selection.select(service.code)
+        self.w.service_area.refresh_selection(self.w._selection.selected, self.w._selection.quantities)
         self._refresh_service_editor_windows()
         self.update_summary()
 
@@ -204,8 +221,8 @@ class ServiceController:
             section_id=section_id,
             title=title,
             services=self._services_for_section(section_id),
-            selected=set(self.w._selected_services),
-            quantities=dict(self.w._service_qty),
+            selected=set(self.w._selection.selected),
+            quantities=dict(self.w._selection.quantities),
             on_toggle=self.on_service_toggle,
             on_edit_qty=lambda svc: self.edit_service_qty(section_id, svc),
             on_edit_price=self.edit_service_price,
@@ -226,7 +243,11 @@ class ServiceController:
                     continue
                 refresh = getattr(win, "refresh", None)
                 if callable(refresh):
-                    refresh(self._services_for_section(section_id), set(self.w._selected_services), dict(self.w._service_qty))
+                    refresh(
+                        self._services_for_section(section_id),
+                        set(self.w._selection.selected),
+                        dict(self.w._selection.quantities),
+                    )
             except Exception:
                 continue
 
@@ -234,12 +255,8 @@ class ServiceController:
         all_services: list[Service] = [
             s for s in self.w._catalog.services if self._matches_filters(s) and s.code not in self.w._hidden_service_codes
         ]
-        if section_id == "primary":
-            services = [s for s in all_services if (s.source or "").upper() == "PRIMARY"]
-        elif section_id == "eshop":
-            services = [s for s in all_services if (s.source or "").upper().startswith("ESHOP")]
-        elif section_id == "backend":
-            services = [s for s in all_services if (s.source or "").upper() == "WEB"]
+        if section_id in SECTIONS:
+            services = [s for s in all_services if s.section == section_id]
         else:
             services = all_services
         return self._apply_sort(services)
@@ -344,6 +361,7 @@ class ServiceController:
                 return
 
             old_code = service.code
+            before = {} if is_new else {"price": service.price, "price2": service.price2}
             service.code = new_code
             service.label = raw_label
             service.price = new_price
@@ -351,13 +369,16 @@ class ServiceController:
             service.tag = (tag_var.get() or "").strip()
             service.info = (info.get("1.0", "end") or "").strip()
             service.source = new_source
+            normalize_service(service)
 
             if is_new:
                 self.w._catalog.services.append(service)
-                self.w._service_qty.setdefault(service.code, 1)
 
             self._apply_code_change(old_code, service.code)
-            self.w._base_prices[service.code] = (float(service.price), float(service.price2))
+            self.w._selection.register(service)
+            self.w._selection.clear_price(service.code)
+            after = {"price": service.price, "price2": service.price2}
+            record_price_change(self.w._catalog, "service", service.code, before, after)
 
             save_catalog(self.w._catalog)
             self.refresh_service_tables(self.w._current_package)
@@ -389,15 +410,7 @@ class ServiceController:
     def _apply_code_change(self, old_code: str, new_code: str) -> None:
         if not old_code or old_code == new_code:
             return
-        if old_code in self.w._selected_services:
-            self.w._selected_services.discard(old_code)
-            self.w._selected_services.add(new_code)
-        qty = self.w._service_qty.pop(old_code, None)
-        if qty is not None:
-            self.w._service_qty[new_code] = qty
-        base_prices = self.w._base_prices.pop(old_code, None)
-        if base_prices:
-            self.w._base_prices[new_code] = base_prices
+        self.w._selection.rename(old_code, new_code)
         if old_code in self.w._auto_selected:
             self.w._auto_selected.discard(old_code)
             self.w._auto_selected.add(new_code)
@@ -421,10 +434,13 @@ class ServiceController:
 
     def _remove_service(self, service: Service) -> None:
         code = service.code
-        self.w._catalog.services = [s for s in self.w._catalog.services if s is not service]
-        self.w._selected_services.discard(code)
-        self.w._service_qty.pop(code, None)
-        self.w._base_prices.pop(code, None)
+        services = self.w._catalog.services
+        # mazanie podla identity (funguje pre zoznam aj stlpcovy `ServiceStore`)
+        index = next((i for i, s in enumerate(services) if s is service), None)
+        # vyber/index sluzbu vyradia este pred zmazanim riadku (id ostatnych sa nemenia)
+        self.w._selection.remove(code)
+        if index is not None:
+            del services[index]
         self.w._auto_selected.discard(code)
         self.w._hidden_service_codes.discard(code)
         for pkg in self.w._catalog.packages:
@@ -438,7 +454,7 @@ class ServiceController:
                 pkg.included_quantities.pop(code, None)
         save_catalog(self.w._catalog)
         self.refresh_service_tables(self.w._current_package)
-        self.w.service_area.refresh_selection(self.w._selected_services, self.w._service_qty)
+        self.w.service_area.refresh_selection(self.w._selection.selected, self.w._selection.quantities)
         self.update_summary()
         self._refresh_service_editor_windows()
 
@@ -459,7 +475,7 @@ class ServiceController:
         return mapping.get(section_id or "", "")
 
     def show_selected_service_info(self) -> None:
-        selected = list(self.w._selected_services)
+        selected = list(self.w._selection.selected)
         if not selected:
             messagebox.showinfo("Info sluzby", "Nie je zvolena ziadna sluzba.")
             return
@@ -469,28 +485,42 @@ class ServiceController:
             self.show_service_info(svc)
 
     def show_preview(self) -> None:
-        services = [
-            (self.with_effective_price(s), self.w._service_qty.get(s.code, 1))
-            for s in self.w._catalog.services
-            if s.code in self.w._selected_services
-        ]
-        if not services and not self.w._current_package:
+        totals = self.current_totals()
+        if not totals.lines and not self.w._current_package:
             messagebox.showinfo("Nahlad", "Vyber aspon balicek alebo jednu sluzbu.")
             return
-        client = self.w.client_data()
-        breakdown = self.w._pricing.summarize(services)
         PreviewDialog(
             self.w,
             self.w._current_package,
-            services,
-            breakdown,
-            self.w._discount_pct,
+            totals,
             self.w._pricing,
-            self.w._vat_rate,
-            self.w._vat_mode,
             firm_name=self.w._supplier_display_name(),
         )
 
+    def show_package_recommendations(self) -> None:
+        # Zelany vyber = rucne zvolene sluzby (bez tych, ktore pridal aktualny balik)
+        wanted = self.w._selection.selected - self.w._auto_selected
+        if not wanted:
+            messagebox.showinfo("Odporucanie balika", "Vyber aspon jednu sluzbu.")
+            return
+        quotes = recommend_packages(
+            self.w._catalog.packages,
+            self.w._catalog.services,
+            self.w._selection.quantities,
+            wanted,
+            prices=self.w._selection.price_overrides,
+            discount_pct=self.w._discount_pct,
+            vat_rate=self.w._vat_rate,
+            vat_mode=self.w._vat_mode,
+            promotions=self.w._catalog.promotion_index,
+            on=date.today(),
+        )
+        PackageRecommendDialog(self.w, quotes, self._apply_recommendation, firm_name=self.w._supplier_display_name())
+
+    def _apply_recommendation(self, package: Package | None, price_mode: str) -> None:
+        self.w.package_selector.set_price_mode(price_mode)
+        self.w.package_selector.select_package(package.code if package else None)
+
     def open_search(self) -> None:
         SearchDialog(self.w, self.w._catalog.services, self.select_service_by_code, firm_name=self.w._supplier_display_name())
 
@@ -498,20 +528,57 @@ class ServiceController:
         svc = next((s for s in self.w._catalog.services if s.code == code), None)
         if not svc:
             return
-        self.w._selected_services.add(code)
-        self.w._service_qty.setdefault(code, 1)
-        self.w.service_area.refresh_selection(self.w._selected_services, self.w._service_qty)
+        self.w._selection.select(code)
+        self.w.service_area.refresh_selection(self.w._selection.selected, self.w._selection.quantities)
         self.update_summary()
 
     # -------- Pricing helpers --------
     def update_summary(self) -> None:
-        services = [
-            (self.with_effective_price(s), self.w._service_qty.get(s.code, 1))
-            for s in self.w._catalog.services
-            if s.code in self.w._selected_services
-        ]
-        breakdown = self.w._pricing.summarize(services)
-        self.w.summary.update_values(breakdown, self.w._discount_pct, self.w._vat_rate, self.w._vat_mode)
+        # Kazda zmena vyberu/mnozstiev/cien/zlavy/DPH konci tu -> nova revizia stavu.
+        self.w._state_revision += 1
+        totals = self.current_totals()
+        self.w.summary.update_values(totals)
+        self.update_scenarios(totals)
+        self.w._actions.schedule_prerender()
+
+    def update_scenarios(self, totals: TotalsSnapshot | None = None) -> None:
+        """Porovnanie aktualneho vyberu pri inych zlavach/DPH/urovniach; sluzby sa beru zo snapshotu."""
+        if not hasattr(self.w, "scenarios"):
+            return
+        totals = totals or self.current_totals()
+        raw = self.w._current_package_raw
+        price_modes = [self.w._price_mode]
+        if raw is not None:
+            for mode, price in (("base", raw.base_price), ("promo", raw.promo_price), ("intra", raw.intra_price)):
+                if price is not None and mode not in price_modes:
+                    price_modes.append(mode)
+        discounts = list(dict.fromkeys([self.w._discount_pct, *self.w.scenarios.discounts()]))
+        grid = scenario_grid(discounts, (self.w._vat_rate,), ("add", "included"), price_modes)
+        current = Scenario(self.w._discount_pct, self.w._vat_rate, self.w._vat_mode, self.w._price_mode)
+        self.w.scenarios.update_results(sweep(totals.extras, raw, grid, self.w._catalog.promotion_index, date.today()), current)
+
+    def set_scenario_discounts(self, _discounts: list[float]) -> None:
+        self.update_scenarios()
+
+    def current_totals(self) -> TotalsSnapshot:
+        """Snapshot sum pre aktualnu reviziu stavu (pocita sa raz, potom sa berie z cache)."""
+        return self.w._totals_cache.get(self.w._state_revision, self._compute_totals)
+
+    def _compute_totals(self) -> TotalsSnapshot:
+        selection = self.w._selection
+        selections = []
+        # len zvolene id z masky vyberu (poradie katalogu), nie cely katalog
+        for s in selection.selected_services():
+            original_price = selection.prices(s)[0]
+            selections.append((self.with_effective_price(s), selection.qty(s.code), original_price))
+        raw = self.w._current_package_raw
+        return self.w._pricing.totals(
+            selections,
+            discount_pct=self.w._discount_pct,
+            vat_rate=self.w._vat_rate,
+            vat_mode=self.w._vat_mode,
+            original_package_price=raw.base_price if raw else None,
+        )
 
     def set_discount(self, value: float) -> None:
         self.w._discount_pct = min(100.0, max(0.0, value))
@@ -522,31 +589,13 @@ class ServiceController:
         return replace(service, price=price)
 
     def effective_price(self, service: Service) -> float:
-        base_price, alt_price = self.w._base_prices.get(service.code, (service.price, service.price2))
-        qty = self.w._service_qty.get(service.code, 1)
-        if not self.w._current_package:
-            return base_price
-
-        pkg_code = (self.w._current_package.code or "").upper()
-        included_set = self.included_services_for(self.w._current_package)
-
-        # Services explicitly included in the selected package use the package price (`price2`).
-        # If `included_quantities` defines a free quota, only the paid remainder uses base price.
-        included_qty = self._included_qty_map().get(service.code, 0)
-        if service.code in included_set:
-            if qty <= 0:
-                return base_price
-            bundle_qty = included_qty if included_qty > 0 else 1
-            if qty <= bundle_qty:
-                return float(alt_price)
-            total_cost = (bundle_qty * float(alt_price)) + ((qty - bundle_qty) * base_price)
-            return total_cost / qty if qty > 0 else base_price
-
-        # Optional bundle discount: show/apply alternative price when the service declares a bundle match.
-        bundle_match = (service.bundle or "NONE").upper()
-        if bundle_match != "NONE" and pkg_code.startswith(bundle_match):
-            return float(alt_price)
-        return base_price
+        base_price, alt_price = self.w._selection.prices(service)
+        promotions = self.w._catalog.promotion_index
+        promo_price = promotions.service_price(service.code, date.today()) if promotions else None
+        if promo_price is not None:
+            base_price = promo_price
+        qty = self.w._selection.qty(service.code)
+        return effective_service_price(service, self.w._current_package, qty, base_price, alt_price)
 
     def _matches_filters(self, service: Service) -> bool:
         if self.w._filter_tags and (service.tag or "") not in self.w._filter_tags:
@@ -560,18 +609,17 @@ class ServiceController:
 
     def apply_included_services(self, package: Package | None) -> None:
         included = self.included_services_for(package)
-        for code in list(self.w._auto_selected):
-            self.w._selected_services.discard(code)
+        selection = self.w._selection
+        selection.deselect_all(self.w._auto_selected)
         self.w._auto_selected.clear()
 
         if not included:
             return
-        qty_map = self._included_qty_map()
-        for code in included:
-            self.w._selected_services.add(code)
-            min_qty = qty_map.get(code, 1)
-            current = self.w._service_qty.get(code, 0)
-            self.w._service_qty[code] = max(current, min_qty)
+        selection.select_all(included)
+        # minimalne mnozstva len pre kody s kvotou (ostatne maju predvolene 1)
+        for code, min_qty in self._included_qty_map().items():
+            if code in included:
+                selection.set_qty(code, max(selection.qty(code), min_qty))
         self.w._auto_selected = set(included)
 
     def _included_qty_map(self) -> dict[str, int]:
@@ -590,7 +638,7 @@ class ServiceController:
         Helper na ulozenie stavu sluzieb (na debug). Nepouzite v UI.
         """
         payload = {
-            "selected_services": list(self.w._selected_services),
-            "quantities": self.w._service_qty,
+            "selected_services": list(self.w._selection.selected),
+            "quantities": self.w._selection.quantities,
         }
         path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
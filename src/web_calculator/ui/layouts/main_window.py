@@ -4,14 +4,18 @@ from tkinter import messagebox, simpledialog, ttk
 from typing import Set
 
 from web_calculator.core.calculations.pricing_engine import PricingEngine
+from web_calculator.core.calculations.totals import TotalsCache
 from web_calculator.core.models.package import Package
-from web_calculator.core.models.service import Service
-from web_calculator.core.services.catalog import Catalog, save_catalog, save_packages
-from web_calculator.core.services.supplier import load_supplier, save_supplier
+from web_calculator.core.models.selection_state import SelectionState
+from web_calculator.core.models.service_index import ServiceIndex
+from web_calculator.core.models.service import Service, normalize_service
+from web_calculator.core.services.catalog import Catalog, record_price_change, save_catalog, save_packages
+from web_calculator.core.services.supplier import active_supplier_mapping, load_supplier, save_supplier
 from web_calculator.ui.layouts.service_area import ServiceArea
 from web_calculator.ui.components.client_dialog import ClientDialog
 from web_calculator.ui.layouts.actions_bar import ActionsBar
 from web_calculator.ui.components.package_selector import PackageSelector
+from web_calculator.ui.components.scenario_panel import ScenarioPanel
 from web_calculator.ui.components.summary_panel import SummaryPanel
 from web_calculator.ui.styles import theme
 from web_calculator.ui.controllers.actions_controller import ActionsController
@@ -42,8 +46,9 @@ class MainWindow(ctk.CTk):
         self.after(0, self._maximize_window)
         self._catalog = catalog
         self._pricing = PricingEngine()
-        self._selected_services: Set[str] = set()
-        self._service_qty: dict[str, int] = {s.code: 1 for s in catalog.services}
+        # Vyber, mnozstva a prepisane ceny; len odchylky od katalogu (O(vyber), nie O(katalog)).
+        # Vyber je maska nad stabilnymi id sluzieb (`ServiceIndex`), hromadne operacie su nad maskou.
+        self._selection = SelectionState(ServiceIndex(catalog.services))
         self._filter_tags: Set[str] = set()
         self._sort_field: str | None = None
         self._sort_dir: str = "asc"
@@ -53,8 +58,10 @@ class MainWindow(ctk.CTk):
         self._discount_pct: float = 0.0
         self._vat_rate: float = 0.23
         self._vat_mode: str = "add"  # add = ceny bez DPH, included = ceny s DPH
-        self._base_prices: dict[str, tuple[float, float]] = {s.code: (s.price, s.price2) for s in catalog.services}
         self._auto_selected: Set[str] = set()
+        # Revizia stavu ovplyvnujuceho sumy (zvysuje ServiceController.update_summary) + cache snapshotu
+        self._state_revision = 0
+        self._totals_cache = TotalsCache()
         self._hidden_service_codes: Set[str] = {"ESHOP-E-SHOP-MODUL-ZAKLAD"}
         self._service_editor_windows: dict[str, tk.Toplevel] = {}
         self._client_data: dict[str, str] = {}
@@ -72,6 +79,7 @@ class MainWindow(ctk.CTk):
             self._services.on_package_select,
             on_price_mode_change=self._services.on_price_mode_change,
             on_edit_package=self._open_package_edit_dialog,
+            on_recommend=self._services.show_package_recommendations,
         )
         self.package_selector.grid(row=0, column=0, sticky="nsw")
 
@@ -87,11 +95,17 @@ class MainWindow(ctk.CTk):
             self._services.reset_filters,
             self._open_client_dialog,
             price_provider=self._services.effective_price,
+            on_toggle_section=self._services.toggle_section,
         )
         self.service_area.set_client_name(self._client_display_name())
 
+        # Suhrn a vedla neho porovnanie scenarov (zlavy / DPH / cenove urovne)
+        summary_row = ctk.CTkFrame(self, fg_color="transparent")
+        summary_row.grid(row=1, column=0, columnspan=2, sticky="ew")
+        summary_row.columnconfigure(0, weight=1)
+        summary_row.columnconfigure(1, weight=1)
         self.summary = SummaryPanel(
-            self,
+            summary_row,
             self._pricing,
             vat_rate=self._vat_rate,
             vat_mode=self._vat_mode,
@@ -99,7 +113,9 @@ class MainWindow(ctk.CTk):
             on_vat_change=self._set_vat_rate,
             on_vat_mode_change=self._set_vat_mode,
         )
-        self.summary.grid(row=1, column=0, columnspan=2, sticky="ew")
+        self.summary.grid(row=0, column=0, sticky="new")
+        self.scenarios = ScenarioPanel(summary_row, on_discounts_change=self._services.set_scenario_discounts)
+        self.scenarios.grid(row=0, column=1, sticky="nsew")
 
         self.actions = ActionsBar(
             self,
@@ -211,15 +227,11 @@ class MainWindow(ctk.CTk):
                 idx = code.find(query)
             return idx if idx >= 0 else 999
 
+        section_by_filter = {"PRIMARY": "primary", "ESHOP": "eshop", "WEB": "backend"}
+
         def matches_source(svc: Service, source_filter: str) -> bool:
-            source = (svc.source or "").upper()
-            if source_filter == "PRIMARY":
-                return source == "PRIMARY"
-            if source_filter == "ESHOP":
-                return source.startswith("ESHOP")
-            if source_filter == "WEB":
-                return source == "WEB"
-            return True
+            section = section_by_filter.get(source_filter)
+            return section is None or svc.section == section
 
         def refresh_list() -> None:
             nonlocal visible_codes, updating
@@ -322,17 +334,23 @@ class MainWindow(ctk.CTk):
                 messagebox.showerror("Chyba", "Zadaj platne cislo pre ceny balika.", parent=dialog)
                 return
 
+            before = {"base_price": package.base_price, "promo_price": package.promo_price, "intra_price": package.intra_price}
             package.base_price = float(base_price)
             package.promo_price = promo_price
             package.intra_price = intra_price
+            after = {"base_price": package.base_price, "promo_price": package.promo_price, "intra_price": package.intra_price}
+            record_price_change(self._catalog, "package", package.code, before, after)
 
             package.included_services = [svc.code for svc in services if svc.code in selected_codes]
             # Update bundle flag on services: added -> set bundle to package; removed -> NONE if previously linked.
+            package_key = (package.code or "").upper()
             for svc in self._catalog.services:
                 if svc.code in selected_codes:
                     svc.bundle = package.code
-                elif (svc.bundle or "").upper() == (package.code or "").upper():
+                    normalize_service(svc)
+                elif svc.bundle_key and svc.bundle_key == package_key:
                     svc.bundle = "NONE"
+                    normalize_service(svc)
             # Keep included quantities in sync: remove dropped codes, ensure new ones at least 1.
             for code in list(qty_map.keys()):
                 if code not in selected_codes:
@@ -346,7 +364,7 @@ class MainWindow(ctk.CTk):
             self.package_selector.refresh_packages()
             if self._current_package_raw and self._current_package_raw.code == package.code:
                 self._services.set_package(self._current_package_raw)
-                self.service_area.refresh_selection(self._selected_services, self._service_qty)
+                self.service_area.refresh_selection(self._selection.selected, self._selection.quantities)
             dialog.destroy()
 
         ctk.CTkButton(buttons, text="Zrusit", command=dialog.destroy).pack(side="right", padx=(6, 0))
@@ -407,11 +425,13 @@ class MainWindow(ctk.CTk):
         self._client_data = dict(data or {})
         self.service_area.set_client_name(self._client_display_name())
         self._update_save_buttons()
+        self._actions.schedule_prerender()
 
     def reset_client_data(self) -> None:
         self._client_data = {}
         self.service_area.set_client_name(self._client_display_name())
         self._update_save_buttons()
+        self._actions.schedule_prerender()
 
     def has_client_data(self) -> bool:
         keys = ["name", "company", "ico", "dic", "icdph", "email", "address"]
@@ -419,18 +439,7 @@ class MainWindow(ctk.CTk):
 
     def supplier_data(self) -> dict:
         # Return flattened mapping of active profile for PDF consumption
-        active_id = self._supplier_data.get("active")
-        profiles = self._supplier_data.get("profiles", [])
-        prof = next((p for p in profiles if p.get("id") == active_id), profiles[0] if profiles else {"fields": []})
-        mapping: dict[str, str] = {}
-        for item in prof.get("fields", []):
-            code = (item.get("code") or item.get("label") or "").strip()
-            val = (item.get("value") or "").strip()
-            if not code and not val:
-                continue
-            key = code or f"field_{len(mapping)+1}"
-            mapping[key] = val
-        return mapping
+        return active_supplier_mapping(self._supplier_data)
 
     def supplier_fields(self) -> list[dict]:
         active_id = self._supplier_data.get("active")
@@ -442,6 +451,7 @@ class MainWindow(ctk.CTk):
         self._supplier_data = dict(data or {})
         save_supplier(self._supplier_data)
         self._update_title()
+        self._actions.schedule_prerender()
 
     def _supplier_display_name(self) -> str:
         profiles = self._supplier_data.get("profiles", [])
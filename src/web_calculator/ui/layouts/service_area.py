@@ -26,6 +26,7 @@ class ServiceArea(ctk.CTkFrame):
         on_open_client,
         price_provider,
         row_minsize: int = 220,
+        on_toggle_section=None,
     ):
         super().__init__(master, fg_color="transparent")
         self.grid(row=0, column=1, sticky="nsew")
@@ -62,6 +63,7 @@ class ServiceArea(ctk.CTkFrame):
             on_edit_price=on_edit_price,
             on_edit_qty=lambda svc: on_edit_qty("primary", svc),
             price_provider=price_provider,
+            on_toggle_all=on_toggle_section,
         )
         self.primary_table.grid(row=1, column=0, sticky="nsew", pady=(4, 0))
 
@@ -77,6 +79,7 @@ class ServiceArea(ctk.CTkFrame):
             on_edit_price=on_edit_price,
             on_edit_qty=lambda svc: on_edit_qty("eshop", svc),
             price_provider=price_provider,
+            on_toggle_all=on_toggle_section,
         )
         self.eshop_table.grid(row=2, column=0, sticky="nsew", pady=(4, 0))
 
@@ -92,6 +95,7 @@ class ServiceArea(ctk.CTkFrame):
             on_edit_price=on_edit_price,
             on_edit_qty=lambda svc: on_edit_qty("backend", svc),
             price_provider=price_provider,
+            on_toggle_all=on_toggle_section,
         )
         self.backend_table.grid(row=3, column=0, sticky="nsew", pady=(4, 0))
 
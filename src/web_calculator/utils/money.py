@@ -0,0 +1,221 @@
+"""
+Penazne sumy v celych centoch (int) s pevnymi pravidlami zaokruhlovania.
+
+Sucty, zlava a DPH sa pocitaju v centoch, takze sucet riadkov presne sedi so sumou dokladu
+a nic sa nezaokruhluje viackrat. Vstupy (ceny z JSON, float sumy) sa na centy prevedu raz
+cez `to_cents`; float, ktory uz je na centy, ide rychlou cestou bez parsovania textu.
+Sadzby (DPH, zlava) su v desattisicinach (`RATE_SCALE`): 0.23 -> 2300, zlava 12.5 % -> 1250.
+
+Pre velke vybery su ceny a mnozstva `array('q')` (`cents_array`, `dot`), ktore sa daju priamo
+odovzdat aj do NumPy (`numpy.frombuffer`).
+"""
+
+from __future__ import annotations
+
+from array import array
+from fractions import Fraction
+from functools import total_ordering
+from operator import mul
+from typing import Iterable
+
+HALF_UP = "half_up"  # 0.005 -> 0.01, -0.005 -> -0.01 (od nuly)
+HALF_EVEN = "half_even"  # bankarske: 0.005 -> 0.00, 0.015 -> 0.02
+
+CENT = 100
+RATE_SCALE = 10_000
+
+
+def div_round(numerator: int, denominator: int, rounding: str = HALF_UP) -> int:
+    """Presne celociselne delenie so zaokruhlenim na cele cislo."""
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(abs(numerator), denominator)
+    twice = remainder * 2
+    if twice > denominator or (twice == denominator and (rounding != HALF_EVEN or quotient % 2 == 1)):
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def to_fixed(value, places: int, rounding: str = HALF_UP) -> int:
+    """
+    Hodnota (int/float/str/Decimal) ako cele cislo v jednotkach 10**-places.
+    Float sa berie podla svojho najkratsieho desatinneho zapisu (2.675 -> 268 centov),
+    nie podla binarnej hodnoty; text moze mat desatinnu ciarku.
+    """
+    scale = 10**places
+    if isinstance(value, int):
+        return value * scale
+    if isinstance(value, float):
+        scaled = value * scale
+        nearest = round(scaled)
+        # rychla cesta: hodnota uz je na dane miesta (po prevode floatu len sum v poslednych bitoch)
+        if abs(scaled - nearest) <= 1e-7 + abs(scaled) * 1e-15:
+            return int(nearest)
+        text = repr(value)
+    else:
+        text = str(value).strip().replace(" ", "").replace(",", ".")
+    if not text:
+        return 0
+    if "e" in text or "E" in text or "/" in text:
+        exact = Fraction(text) * scale
+        return div_round(exact.numerator, exact.denominator, rounding)
+    negative = text.startswith("-")
+    integer, _, fraction = text.lstrip("+-").partition(".")
+    digits = int((integer + fraction) or 0)
+    if len(fraction) <= places:
+        units = digits * 10 ** (places - len(fraction))
+    else:
+        units = div_round(digits, 10 ** (len(fraction) - places), rounding)
+    return -units if negative else units
+
+
+def to_cents(value, rounding: str = HALF_UP) -> int:
+    return to_fixed(value, 2, rounding)
+
+
+def rate_units(rate) -> int:
+    """Sadzba ako podiel (0.23) v jednotkach `RATE_SCALE`."""
+    return to_fixed(rate, 4)
+
+
+def percent_units(pct) -> int:
+    """Percenta (12.5) v jednotkach `RATE_SCALE` (podiel 0.125)."""
+    return to_fixed(pct, 2)
+
+
+def apply_rate(cents: int, units: int, rounding: str = HALF_UP) -> int:
+    """`cents * sadzba` zaokruhlene na centy (napr. DPH zo zakladu, suma zlavy)."""
+    return div_round(cents * units, RATE_SCALE, rounding)
+
+
+def remove_rate(cents: int, units: int, rounding: str = HALF_UP) -> int:
+    """Zaklad zo sumy, ktora uz obsahuje sadzbu: `cents / (1 + sadzba)`."""
+    return div_round(cents * RATE_SCALE, RATE_SCALE + units, rounding)
+
+
+def split_vat_cents(amount: int, vat_units: int, vat_mode: str, rounding: str = HALF_UP) -> tuple[int, int, int]:
+    """
+    (bez DPH, DPH, s DPH) v centoch.
+    - `included`: suma uz obsahuje DPH, zaklad sa z nej vypocita a DPH je rozdiel,
+    - `add`: suma je bez DPH, DPH sa pripocita.
+    Zaporna suma (zlava nad 100 %) sa orezava na nulu.
+    """
+    amount = max(0, amount)
+    if vat_mode == "included":
+        no_vat = remove_rate(amount, vat_units, rounding) if vat_units > 0 else amount
+        return no_vat, amount - no_vat, amount
+    vat = apply_rate(amount, vat_units, rounding)
+    return amount, vat, amount + vat
+
+
+def from_cents(cents: int) -> float:
+    return cents / CENT
+
+
+def format_cents(cents: int, suffix: str = " EUR") -> str:
+    sign = "-" if cents < 0 else ""
+    whole, rest = divmod(abs(cents), CENT)
+    return f"{sign}{whole:,}.{rest:02d}{suffix}"
+
+
+def cents_array(values: Iterable, rounding: str = HALF_UP) -> array:
+    """Centy pre celu postupnost; floaty na centy idu bez volania `to_cents` (hromadny prevod)."""
+    out = array("q")
+    append = out.append
+    for value in values:
+        if value.__class__ is float:
+            scaled = value * CENT
+            nearest = round(scaled)
+            if abs(scaled - nearest) <= 1e-7 + abs(scaled) * 1e-15:
+                append(nearest)
+                continue
+        append(to_cents(value, rounding))
+    return out
+
+
+def remove_rate_array(cents: Iterable[int], units: int, rounding: str = HALF_UP) -> array:
+    """`remove_rate` pre cele pole (zaklad bez DPH kazdeho riadku)."""
+    out = array("q")
+    append = out.append
+    denominator = RATE_SCALE + units
+    for value in cents:
+        if value < 0:
+            append(div_round(value * RATE_SCALE, denominator, rounding))
+            continue
+        quotient, remainder = divmod(value * RATE_SCALE, denominator)
+        twice = remainder * 2
+        if twice > denominator or (twice == denominator and (rounding != HALF_EVEN or quotient & 1)):
+            quotient += 1
+        append(quotient)
+    return out
+
+
+def dot(prices: array, quantities: Iterable[int]) -> int:
+    """Sucet `cena * mnozstvo` cez cele pole (bez medzivysledkov vo floate)."""
+    return sum(map(mul, prices, quantities))
+
+
+@total_ordering
+class Money:
+    """Nemenna suma v centoch; aritmetika len s `Money` a cele nasobky."""
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents: int = 0) -> None:
+        object.__setattr__(self, "cents", int(cents))
+
+    @classmethod
+    def of(cls, value, rounding: str = HALF_UP) -> "Money":
+        return value if isinstance(value, Money) else cls(to_cents(value, rounding))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Money is immutable")
+
+    def __add__(self, other: "Money") -> "Money":
+        if not isinstance(other, Money):
+            return NotImplemented
+        return Money(self.cents + other.cents)
+
+    def __sub__(self, other: "Money") -> "Money":
+        if not isinstance(other, Money):
+            return NotImplemented
+        return Money(self.cents - other.cents)
+
+    def __mul__(self, qty: int) -> "Money":
+        if not isinstance(qty, int):
+            return NotImplemented
+        return Money(self.cents * qty)
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> "Money":
+        return Money(-self.cents)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Money) and self.cents == other.cents
+
+    def __lt__(self, other: "Money") -> bool:
+        if not isinstance(other, Money):
+            return NotImplemented
+        return self.cents < other.cents
+
+    def __hash__(self) -> int:
+        return hash(self.cents)
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def __float__(self) -> float:
+        return self.cents / CENT
+
+    def __format__(self, spec: str) -> str:
+        return format(self.cents / CENT, spec) if spec else str(self)
+
+    def __str__(self) -> str:
+        return format_cents(self.cents)
+
+    def __repr__(self) -> str:
+        return f"Money({format_cents(self.cents, '')})"
+
+    def rate(self, units: int, rounding: str = HALF_UP) -> "Money":
+        return Money(apply_rate(self.cents, units, rounding))
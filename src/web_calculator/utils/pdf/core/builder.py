@@ -4,17 +4,106 @@ PDF object builder: assembles content streams and fonts into a minimal PDF byte
 
 from __future__ import annotations
 
-from typing import List
+import io
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO, List, Sequence, Union
 
-from web_calculator.utils.pdf.core import fonts
+from web_calculator.utils.pdf.core import fonts, telemetry
 from web_calculator.utils.pdf.core.fonts import _build_unicode_font_objs
+from web_calculator.utils.pdf.core.linearize import linearize_objects
 
+# Objekt je bud hotove bajty, alebo tuple casti (napr. FontFile2 s `memoryview` namapovaneho fontu).
+PdfObject = Union[bytes, "tuple[bytes | memoryview, ...]"]
 
-def build_pdf_bytes(content_streams: List[str], page_size=(595, 842)) -> bytes:
+
+def build_pdf_bytes(
+    content_streams: List[bytes | str],
+    page_size=(595, 842),
+    outlines: Sequence[tuple[str, int]] | None = None,
+    linearize: bool = False,
+    object_streams: bool = False,
+) -> bytes:
+    """
+    Given list of page content streams (bytes z `ContentStream`, alebo str), return ready-to-write PDF bytes.
+
+    `outlines` je volitelny zoznam (titulok, index strany) pre zalozky; vsetky strany
+    zdielaju jeden objekt /Resources s fontami, takze sa fonty vkladaju iba raz.
+    `linearize=True` zapise linearizovane PDF (prva strana hned pri streamovani, vid `linearize.py`).
+    `object_streams=True` zapise PDF 1.5: male objekty v komprimovanych /ObjStm a xref stream.
+    Pre zapis do suboru je lacnejsi `write_pdf` (bez kopie celeho dokumentu v pamati).
+    """
+    buf = io.BytesIO()
+    write_pdf(
+        buf, content_streams, page_size=page_size, outlines=outlines, linearize=linearize, object_streams=object_streams
+    )
+    return buf.getvalue()
+
+
+def write_pdf(
+    fh: BinaryIO,
+    content_streams: List[bytes | str],
+    page_size=(595, 842),
+    outlines: Sequence[tuple[str, int]] | None = None,
+    linearize: bool = False,
+    object_streams: bool = False,
+) -> int:
     """
-    Given list of page content streams (str), return ready-to-write PDF bytes.
+    Streamovacia verzia `build_pdf_bytes`: objekty zapisuje postupne do `fh` a vrati pocet bajtov.
+
+    Zakladny (PDF 1.4) vystup posiela FontFile2 cez `writelines` priamo z `memoryview`
+    namapovaneho TTF, takze font sa v pamati nekopiruje. Linearizacia a object streams
+    potrebuju cely dokument naraz (precislovanie, /ObjStm), tie sa skladaju v pamati.
     """
-    streams_bytes = [s.encode("ascii", "ignore") for s in content_streams]
+    if linearize and object_streams:
+        raise ValueError("linearize a object_streams sa zatial nedaju kombinovat")
+    with telemetry.stage("build"):
+        doc = _assemble_objects(content_streams, page_size, outlines)
+    _count_object_bytes(doc)
+
+    with telemetry.stage("write"):
+        if linearize:
+            flat = [_join_obj(obj) for obj in doc.objs]
+            data = linearize_objects(
+                {int(obj.split(b" ", 1)[0]): obj for obj in flat},
+                catalog_id=1,
+                pages=[(page_id, [content_id]) for page_id, content_id in zip(doc.page_ids, doc.content_ids)],
+                shared_ids=[doc.resources_id] + [int(_join_obj(obj).split(b" ", 1)[0]) for obj in doc.font_objs],
+                doc_level_ids=[int(obj.split(b" ", 1)[0]) for obj in doc.outline_objs],
+            )
+            fh.write(data)
+            written = len(data)
+        elif object_streams:
+            data = _build_with_object_streams([_join_obj(obj) for obj in doc.objs])
+            fh.write(data)
+            written = len(data)
+        else:
+            written = _write_objects(fh, doc.objs)
+    record = telemetry.current()
+    if record is not None:
+        record.total_bytes += written
+        record.pages += len(doc.page_ids)
+    return written
+
+
+@dataclass(frozen=True)
+class _Assembled:
+    """Objekty dokumentu v poradi cisel (1..N) + cisla, ktore potrebuje linearizacia."""
+
+    objs: list
+    font_objs: list
+    page_objs: list
+    outline_objs: list
+    page_ids: list[int]
+    content_ids: list[int]
+    resources_id: int
+
+
+def _assemble_objects(
+    content_streams: List[bytes | str], page_size, outlines: Sequence[tuple[str, int]] | None
+) -> _Assembled:
+    streams_bytes = [s if isinstance(s, (bytes, bytearray)) else s.encode("ascii", "ignore") for s in content_streams]
     lengths = [len(s) for s in streams_bytes]
 
     page_objs: list[bytes] = []
@@ -30,43 +119,297 @@ def build_pdf_bytes(content_streams: List[str], page_size=(595, 842)) -> bytes:
             b"4 0 obj << /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >> endobj\n",
         ]
         next_obj_id = 5
+    resources_id = next_obj_id
+    resources_obj = f"{resources_id} 0 obj << /Font << /F1 {font1_id} 0 R /F2 {font2_id} 0 R >> >> endobj\n".encode("ascii")
+    next_obj_id += 1
     pages_kids: list[int] = []
+    page_contents: list[int] = []
 
     for stream, length in zip(streams_bytes, lengths):
         content_id = next_obj_id
         page_id = next_obj_id + 1
         pages_kids.append(page_id)
+        page_contents.append(content_id)
         page_objs.append(
             f"{content_id} 0 obj << /Length {length} >> stream\n".encode("ascii") + stream + b"\nendstream endobj\n"
         )
         page_objs.append(
-            f"{page_id} 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_size[0]} {page_size[1]}] /Contents {content_id} 0 R /Resources << /Font << /F1 {font1_id} 0 R /F2 {font2_id} 0 R >> >> >> endobj\n".encode(
+            f"{page_id} 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_size[0]} {page_size[1]}] /Contents {content_id} 0 R /Resources {resources_id} 0 R >> endobj\n".encode(
                 "ascii"
             )
         )
         next_obj_id += 2
 
+    outline_objs: list[bytes] = []
+    outlines_ref = ""
+    if outlines:
+        outline_objs, outlines_id = _build_outline_objs(outlines, pages_kids, next_obj_id)
+        outlines_ref = f" /Outlines {outlines_id} 0 R /PageMode /UseOutlines"
+
     kids_ref = " ".join(f"{kid} 0 R" for kid in pages_kids)
     pages_obj = f"2 0 obj << /Type /Pages /Count {len(pages_kids)} /Kids [{kids_ref}] >> endobj\n".encode("ascii")
-    catalog_obj = b"1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n"
+    catalog_obj = f"1 0 obj << /Type /Catalog /Pages 2 0 R{outlines_ref} >> endobj\n".encode("ascii")
 
-    objs = [catalog_obj, pages_obj] + font_objs + page_objs
+    objs: list[PdfObject] = [catalog_obj, pages_obj] + font_objs + [resources_obj] + page_objs + outline_objs
+    return _Assembled(
+        objs=objs,
+        font_objs=font_objs,
+        page_objs=page_objs,
+        outline_objs=outline_objs,
+        page_ids=pages_kids,
+        content_ids=page_contents,
+        resources_id=resources_id,
+    )
 
+
+def _count_object_bytes(doc: _Assembled) -> None:
+    """Bajty podla triedy objektu (pre `telemetry`); mimo render scope sa nic nepocita."""
+    if telemetry.current() is None:
+        return
+    for obj in doc.font_objs:
+        telemetry.count_bytes("fontfile" if isinstance(obj, tuple) else "font", _obj_len(obj))
+    telemetry.count_bytes("content", sum(len(obj) for obj in doc.page_objs[0::2]))
+    telemetry.count_bytes("page", sum(len(obj) for obj in doc.page_objs[1::2]))
+    telemetry.count_bytes("outline", sum(len(obj) for obj in doc.outline_objs))
+    # katalog, /Pages a /Resources
+    telemetry.count_bytes("structure", sum(_obj_len(obj) for obj in doc.objs[:2]) + _obj_len(doc.objs[2 + len(doc.font_objs)]))
+
+
+def _write_objects(fh: BinaryIO, objs: Sequence[PdfObject]) -> int:
+    """Zapise hlavicku, objekty (offsety sa pocitaju z dlzok casti), xref a trailer."""
     header = b"%PDF-1.4\n"
+    fh.write(header)
     offsets = [0]
-    pdf_body = bytearray()
     current_offset = len(header)
     for obj in objs:
         offsets.append(current_offset)
-        pdf_body += obj
-        current_offset += len(obj)
+        if isinstance(obj, tuple):
+            fh.writelines(obj)
+        else:
+            fh.write(obj)
+        current_offset += _obj_len(obj)
 
     xref_entries = ["0000000000 65535 f \n"] + [_format_xref_entry(off) for off in offsets[1:]]
     xref = ("xref\n0 %d\n" % len(offsets)).encode("ascii") + "".join(xref_entries).encode("ascii")
-    startxref = len(header) + len(pdf_body) + len(xref)
-    trailer = f"trailer << /Size {len(offsets)} /Root 1 0 R >>\nstartxref\n{startxref}\n%%EOF\n".encode("ascii")
+    trailer = f"trailer << /Size {len(offsets)} /Root 1 0 R >>\nstartxref\n{current_offset}\n%%EOF\n".encode("ascii")
+    fh.write(xref + trailer)
+    telemetry.count_bytes("xref", len(xref) + len(trailer))
+    return current_offset + len(xref) + len(trailer)
+
+
+def _obj_len(obj: PdfObject) -> int:
+    return sum(len(part) for part in obj) if isinstance(obj, tuple) else len(obj)
+
+
+def _obj_id(obj: PdfObject) -> int:
+    first = obj[0] if isinstance(obj, tuple) else obj
+    return int(first.split(b" ", 1)[0])
+
+
+def _join_obj(obj: PdfObject) -> bytes:
+    return b"".join(obj) if isinstance(obj, tuple) else obj
+
+
+class PdfPageWriter:
+    """
+    Zapisovac PDF po stranach pre velke dokumenty (napr. cennik so stovkami stran).
+
+    Obsah strany sa zapise do `fh` hned v `add_page`; v pamati ostavaju iba offsety a cisla
+    objektov. Fonty (ich /W tabulka zavisi od pouzitych glyfov), /Resources, /Pages, katalog,
+    zalozky a xref sa zapisu v `close()`. Cislovanie objektov je rovnake ako v `write_pdf`
+    (1 katalog, 2 /Pages, fonty, /Resources), strany nasleduju za nimi.
+    """
+
+    def __init__(self, fh: BinaryIO, page_size=(595, 842)) -> None:
+        self._fh = fh
+        self._page_size = page_size
+        font_map = fonts.get_font_map()
+        self._unicode_fonts = "/F1" in font_map and "/F2" in font_map
+        self._resources_id = 11 if self._unicode_fonts else 5
+        self._next_id = self._resources_id + 1
+        self._offsets: dict[int, int] = {}
+        self._page_ids: list[int] = []
+        self._outlines: list[tuple[str, int]] = []
+        header = b"%PDF-1.4\n"
+        fh.write(header)
+        self._pos = len(header)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def add_outline(self, title: str, page_index: int | None = None) -> None:
+        """Zalozka na stranu `page_index` (default: nasledujuca pridana strana)."""
+        self._outlines.append((title, self.page_count if page_index is None else page_index))
+
+    def add_page(self, content: bytes | str) -> int:
+        stream = content if isinstance(content, (bytes, bytearray)) else content.encode("ascii", "ignore")
+        content_id, page_id = self._next_id, self._next_id + 1
+        self._next_id += 2
+        self._write_obj(content_id, (f"{content_id} 0 obj << /Length {len(stream)} >> stream\n".encode("ascii"), stream, b"\nendstream endobj\n"), "content")
+        self._write_obj(
+            page_id,
+            f"{page_id} 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 {self._page_size[0]} {self._page_size[1]}] /Contents {content_id} 0 R /Resources {self._resources_id} 0 R >> endobj\n".encode(
+                "ascii"
+            ),
+            "page",
+        )
+        self._page_ids.append(page_id)
+        return len(self._page_ids) - 1
+
+    def close(self) -> int:
+        """Dopise fonty, strom stran, katalog, zalozky a xref; vrati celkovy pocet bajtov."""
+        if not self._page_ids:
+            raise ValueError("PDF needs at least one page")
+        font_map = fonts.get_font_map()
+        if self._unicode_fonts:
+            font_objs, font1_id, font2_id, _ = _build_unicode_font_objs(font_map["/F1"], font_map["/F2"])
+        else:
+            font1_id, font2_id = 3, 4
+            font_objs = [
+                b"3 0 obj << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> endobj\n",
+                b"4 0 obj << /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >> endobj\n",
+            ]
+        for obj in font_objs:
+            self._write_obj(_obj_id(obj), obj, "fontfile" if isinstance(obj, tuple) else "font")
+        self._write_obj(
+            self._resources_id,
+            f"{self._resources_id} 0 obj << /Font << /F1 {font1_id} 0 R /F2 {font2_id} 0 R >> >> endobj\n".encode("ascii"),
+            "structure",
+        )
+        outlines_ref = ""
+        if self._outlines:
+            outline_objs, outlines_id = _build_outline_objs(self._outlines, self._page_ids, self._next_id)
+            for offset, obj in enumerate(outline_objs):
+                self._write_obj(outlines_id + offset, obj, "outline")
+            self._next_id += len(outline_objs)
+            outlines_ref = f" /Outlines {outlines_id} 0 R /PageMode /UseOutlines"
+        kids_ref = " ".join(f"{kid} 0 R" for kid in self._page_ids)
+        self._write_obj(2, f"2 0 obj << /Type /Pages /Count {len(self._page_ids)} /Kids [{kids_ref}] >> endobj\n".encode("ascii"), "structure")
+        self._write_obj(1, f"1 0 obj << /Type /Catalog /Pages 2 0 R{outlines_ref} >> endobj\n".encode("ascii"), "structure")
+
+        size = self._next_id
+        xref_entries = ["0000000000 65535 f \n"] + [_format_xref_entry(self._offsets[obj_id]) for obj_id in range(1, size)]
+        xref = ("xref\n0 %d\n" % size).encode("ascii") + "".join(xref_entries).encode("ascii")
+        trailer = f"trailer << /Size {size} /Root 1 0 R >>\nstartxref\n{self._pos}\n%%EOF\n".encode("ascii")
+        self._fh.write(xref + trailer)
+        telemetry.count_bytes("xref", len(xref) + len(trailer))
+        total = self._pos + len(xref) + len(trailer)
+        record = telemetry.current()
+        if record is not None:
+            record.total_bytes += total
+            record.pages += len(self._page_ids)
+        return total
+
+    def _write_obj(self, obj_id: int, obj: PdfObject, object_class: str) -> None:
+        self._offsets[obj_id] = self._pos
+        if isinstance(obj, tuple):
+            self._fh.writelines(obj)
+        else:
+            self._fh.write(obj)
+        size = _obj_len(obj)
+        self._pos += size
+        telemetry.count_bytes(object_class, size)
+
+
+# Maximalny pocet objektov v jednom /ObjStm (citatel rozbaluje cely stream naraz).
+OBJSTM_MAX_OBJECTS = 100
+
+
+def _build_with_object_streams(objs: Sequence[bytes]) -> bytes:
+    """
+    PDF 1.5 vystup: objekty bez streamu sa zbalia do /ObjStm (Flate), objekty so streamom
+    (obsah stran, FontFile2) ostanu v tele a xref je binarny /XRef stream.
+    Predpoklada objekty cislovane 1..N v poradi zoznamu (ako ich sklada `build_pdf_bytes`).
+    """
+    size = len(objs) + 1
+    packed: list[tuple[int, bytes]] = []
+    direct: list[tuple[int, bytes]] = []
+    for obj_id, obj in enumerate(objs, start=1):
+        body = obj[len(f"{obj_id} 0 obj") :].strip()
+        if body.endswith(b"endobj"):
+            body = body[: -len(b"endobj")].rstrip()
+        if b"stream\n" in body:
+            direct.append((obj_id, obj))
+        else:
+            packed.append((obj_id, body))
+
+    header = b"%PDF-1.5\n%\xe2\xe3\xcf\xd3\n"
+    pdf_body = bytearray()
+    # (typ, pole2, pole3) pre kazdy objekt; 0 = volny zaznam
+    entries: dict[int, tuple[int, int, int]] = {0: (0, 0, 65535)}
+    for obj_id, obj in direct:
+        entries[obj_id] = (1, len(header) + len(pdf_body), 0)
+        pdf_body += obj
+
+    for start in range(0, len(packed), OBJSTM_MAX_OBJECTS):
+        chunk = packed[start : start + OBJSTM_MAX_OBJECTS]
+        stm_id = size
+        size += 1
+        index_parts: list[str] = []
+        data = bytearray()
+        for idx, (obj_id, body) in enumerate(chunk):
+            index_parts.append(f"{obj_id} {len(data)}")
+            data += body + b"\n"
+            entries[obj_id] = (2, stm_id, idx)
+        index = (" ".join(index_parts) + "\n").encode("ascii")
+        stream = zlib.compress(index + bytes(data))
+        entries[stm_id] = (1, len(header) + len(pdf_body), 0)
+        pdf_body += (
+            f"{stm_id} 0 obj << /Type /ObjStm /N {len(chunk)} /First {len(index)} /Filter /FlateDecode /Length {len(stream)} >> stream\n".encode(
+                "ascii"
+            )
+            + stream
+            + b"\nendstream endobj\n"
+        )
+
+    xref_id = size
+    size += 1
+    xref_at = len(header) + len(pdf_body)
+    entries[xref_id] = (1, xref_at, 0)
+    # Sirka pola offsetu podla velkosti suboru (W [1 n 2]).
+    offset_width = max(1, (xref_at.bit_length() + 7) // 8)
+    rows = bytearray()
+    for obj_id in range(size):
+        kind, field2, field3 = entries[obj_id]
+        rows += bytes([kind]) + field2.to_bytes(offset_width, "big") + struct.pack(">H", field3)
+    xref_stream = zlib.compress(bytes(rows))
+    xref_obj = (
+        f"{xref_id} 0 obj << /Type /XRef /Size {size} /Root 1 0 R /W [1 {offset_width} 2] "
+        f"/Filter /FlateDecode /Length {len(xref_stream)} >> stream\n".encode("ascii")
+        + xref_stream
+        + b"\nendstream endobj\n"
+    )
+    trailer = f"startxref\n{xref_at}\n%%EOF\n".encode("ascii")
+    return header + bytes(pdf_body) + xref_obj + trailer
+
+
+def _build_outline_objs(outlines: Sequence[tuple[str, int]], page_ids: Sequence[int], first_id: int) -> tuple[list[bytes], int]:
+    """Build /Outlines root + flat list of items pointing to page indices."""
+    root_id = first_id
+    item_ids = [root_id + 1 + i for i in range(len(outlines))]
+    objs = [
+        f"{root_id} 0 obj << /Type /Outlines /First {item_ids[0]} 0 R /Last {item_ids[-1]} 0 R /Count {len(item_ids)} >> endobj\n".encode("ascii")
+    ]
+    for i, (title, page_index) in enumerate(outlines):
+        page_id = page_ids[min(max(0, page_index), len(page_ids) - 1)]
+        links = ""
+        if i > 0:
+            links += f" /Prev {item_ids[i - 1]} 0 R"
+        if i < len(item_ids) - 1:
+            links += f" /Next {item_ids[i + 1]} 0 R"
+        objs.append(
+            f"{item_ids[i]} 0 obj << /Title {_pdf_text_string(title)} /Parent {root_id} 0 R{links} /Dest [{page_id} 0 R /Fit] >> endobj\n".encode("ascii")
+        )
+    return objs, root_id
+
 
-    return header + pdf_body + xref + trailer
+def _pdf_text_string(text: str) -> str:
+    """Encode text string: literal for ASCII, UTF-16BE hex (s BOM) pre diakritiku."""
+    value = str(text)
+    if value.isascii():
+        return "(" + value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+    return "<FEFF" + value.encode("utf-16-be").hex().upper() + ">"
 
 
 def _format_xref_entry(offset: int) -> str:
@@ -0,0 +1,112 @@
+"""
+Zapisovac PDF content streamu nad `bytearray`.
+
+Operatory sa zapisuju priamo ako ASCII bajty (bez medzivysledkov `str` a finalneho
+`encode`); formatovanie cisel je cachovane, lebo suradnice sa v dokumente opakuju.
+Vystup je bajtovo zhodny s povodnymi f-string helpermi v `drawing.py`.
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from functools import lru_cache
+
+from web_calculator.utils.pdf.core import fonts
+
+
+def _normalize_ascii(text: str) -> str:
+    """Remove diacritics to stay compatible with built-in PDF Type1 fonts."""
+    normalized = unicodedata.normalize("NFKD", str(text))
+    return normalized.encode("ascii", "ignore").decode("ascii")
+
+
+def _escape_pdf_text(text: str) -> str:
+    ascii_text = _normalize_ascii(text)
+    return ascii_text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _num(value: float) -> bytes:
+    # typed=True: 1 a 1.0 sa formatuju rozdielne ("1" vs "1.0"), rovnako ako f"{value}"
+    return str(value).encode("ascii")
+
+
+@lru_cache(maxsize=4096)
+def _num2(value: float) -> bytes:
+    return f"{value:.2f}".encode("ascii")
+
+
+@lru_cache(maxsize=256)
+def _name(value: str) -> bytes:
+    return value.encode("ascii")
+
+
+_RECT_OPS = {(True, True): b" re B\n", (False, True): b" re f\n", (True, False): b" re S\n", (False, False): b" re S\n"}
+
+
+class ContentStream:
+    """Content stream jednej strany; `getvalue()` vrati hotove bajty pre builder."""
+
+    __slots__ = ("buf",)
+
+    def __init__(self) -> None:
+        self.buf = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.buf)
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buf)
+
+    def raw(self, ops: bytes | str) -> "ContentStream":
+        self.buf += ops.encode("ascii") if isinstance(ops, str) else ops
+        return self
+
+    # --- farby (hodnota farby je retazec "r g b" z COLORS) ---
+    def fill_color(self, color: str) -> "ContentStream":
+        self.buf += _name(color) + b" rg "
+        return self
+
+    def stroke_color(self, color: str) -> "ContentStream":
+        self.buf += _name(color) + b" RG "
+        return self
+
+    def colors(self, fill: str, stroke: str | None = None) -> "ContentStream":
+        self.buf += _name(fill) + b" rg " + _name(stroke if stroke is not None else fill) + b" RG "
+        return self
+
+    def reset_colors(self) -> "ContentStream":
+        self.buf += b"0 0 0 rg 0 0 0 RG "
+        return self
+
+    # --- tvary ---
+    def rect(self, x: float, y: float, w: float, h: float, stroke: bool = True, fill: bool = False) -> "ContentStream":
+        self.buf += _num(x) + b" " + _num(y) + b" " + _num(w) + b" " + _num(h) + _RECT_OPS[(stroke, fill)]
+        return self
+
+    def strike(self, color: str, width: float, x: float, y: float, length: float) -> "ContentStream":
+        """Preciarknutie (povodna cena): `color RG width w x y m x+len y l S`."""
+        y_b = _num2(y)
+        self.buf += (
+            _name(color) + b" RG " + _num2(width) + b" w " + _num(x) + b" " + y_b + b" m "
+            + _num2(x + length) + b" " + y_b + b" l S\n"
+        )
+        return self
+
+    # --- text ---
+    def text(self, text: str, x: float, y: float, font: str, size: float) -> "ContentStream":
+        """Jeden riadok textu; Unicode TTF cez hex glyfy (Identity-H), inak literal pre Type1."""
+        font_obj = fonts.get_font_map().get(font)
+        self.buf += b"BT " + _name(font) + b" " + _num(size) + b" Tf " + _num(x) + b" " + _num(y) + b" Td "
+        if font_obj is not None:
+            self.buf += b"<" + font_obj.encode_text_hex(text).encode("ascii") + b"> Tj ET\n"
+        else:
+            self.buf += b"(" + _escape_pdf_text(text).encode("ascii") + b") Tj ET\n"
+        return self
+
+    def text_lines(self, lines, x: float, y: float, font: str, size: float, leading: float | None = None) -> "ContentStream":
+        spacing = leading or (size + 2)
+        for line in lines:
+            self.text(str(line), x, y, font, size)
+            y -= spacing
+        return self
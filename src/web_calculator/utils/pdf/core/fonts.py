@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import hashlib
+import mmap
 import os
+import re
 import struct
 from dataclasses import dataclass
 from pathlib import Path
@@ -8,6 +11,8 @@ from typing import Callable, Dict
 
 # Font cache (Unicode TTFs, fallback to built-in Type1)
 _FONT_MAP: Dict[str, "TrueTypeFont"] = {}
+# Rozparsovane TTF podla (cesta, pdf meno); prezije clear_font_map, aby sa subor necital pri kazdom exporte.
+_TTF_CACHE: Dict[tuple[str, str], "TrueTypeFont"] = {}
 
 
 def get_font_map() -> Dict[str, "TrueTypeFont"]:
@@ -21,7 +26,14 @@ def set_font_map(font_map: Dict[str, "TrueTypeFont"]) -> Dict[str, "TrueTypeFont
 
 
 def load_font_map() -> Dict[str, "TrueTypeFont"]:
-    return set_font_map(_try_load_unicode_fonts())
+    font_map = set_font_map(_try_load_unicode_fonts())
+    reset_font_usage()
+    return font_map
+
+
+def warm_font_cache() -> bool:
+    """Preload Unicode TTFs into the process cache (e.g. in batch workers). Returns True if found."""
+    return bool(_try_load_unicode_fonts())
 
 
 def clear_font_map() -> None:
@@ -29,6 +41,12 @@ def clear_font_map() -> None:
     _FONT_MAP = {}
 
 
+def reset_font_usage() -> None:
+    """Zabudni pouzite glyfy (okrem medzery), aby dalsi dokument mal vlastnu /W tabulku."""
+    for font in _FONT_MAP.values():
+        font.used_gids = {font.glyph_id(ord(" "))}
+
+
 @dataclass(frozen=True)
 class _TtfTables:
     cmap: tuple[int, int]
@@ -42,7 +60,7 @@ class TrueTypeFont:
     def __init__(self, path: Path, pdf_name: str):
         self.path = path
         self.pdf_name = pdf_name  # Name object, e.g. "/SegoeUI"
-        self.data = path.read_bytes()
+        self.data = _map_font_file(path)
         self.tables = self._parse_tables(self.data)
 
         head_offset, _ = self.tables.head
@@ -59,10 +77,19 @@ class TrueTypeFont:
 
         self._advance_widths = self._load_advance_widths()
         self._cmap_lookup = self._build_cmap_lookup()
+        self._glyph_hex: dict[str, tuple[int, str]] = {}  # znak -> (gid, 4 hex znaky pre Identity-H)
         self.used_gids: set[int] = set()
+        self._digest: str | None = None
+
+    @property
+    def digest(self) -> str:
+        """Odtlacok obsahu TTF (zapisuje sa do CIDFont, aby sa dal overit pri inkrementalnej uprave)."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.data).hexdigest()[:32]
+        return self._digest
 
     @staticmethod
-    def _parse_tables(data: bytes) -> _TtfTables:
+    def _parse_tables(data: bytes | memoryview) -> _TtfTables:
         if len(data) < 12:
             raise ValueError("Invalid TTF (too small)")
         num_tables = struct.unpack_from(">H", data, 4)[0]
@@ -70,7 +97,7 @@ class TrueTypeFont:
         entries: dict[str, tuple[int, int]] = {}
         for i in range(num_tables):
             base = directory_offset + i * 16
-            tag = data[base : base + 4].decode("ascii", "replace")
+            tag = bytes(data[base : base + 4]).decode("ascii", "replace")
             offset = struct.unpack_from(">I", data, base + 8)[0]
             length = struct.unpack_from(">I", data, base + 12)[0]
             entries[tag] = (offset, length)
@@ -115,12 +142,19 @@ class TrueTypeFont:
         return int(gid)
 
     def encode_text_hex(self, text: str) -> str:
-        out = bytearray()
-        for ch in str(text):
-            gid = self.glyph_id(ord(ch))
-            self.used_gids.add(gid)
-            out += int(gid).to_bytes(2, "big", signed=False)
-        return out.hex().upper()
+        text = str(text)
+        glyphs = self._glyph_hex
+        try:
+            encoded = "".join([glyphs[ch][1] for ch in text])
+        except KeyError:
+            # prvy vyskyt znaku: cmap lookup (linearny cez segmenty) sa robi raz na znak a font
+            for ch in text:
+                if ch not in glyphs:
+                    gid = self.glyph_id(ord(ch))
+                    glyphs[ch] = (gid, f"{gid:04X}")
+            encoded = "".join([glyphs[ch][1] for ch in text])
+        self.used_gids.update(glyphs[ch][0] for ch in set(text))
+        return encoded
 
     def _build_cmap_lookup(self) -> Callable[[int], int | None]:
         cmap_offset, _ = self.tables.cmap
@@ -211,31 +245,73 @@ class TrueTypeFont:
         return lookup
 
 
+def _map_font_file(path: Path) -> memoryview | bytes:
+    """
+    Namapuje TTF read-only cez `mmap` a vrati `memoryview` (parsovanie cez `struct.unpack_from`,
+    zapis do PDF bez kopie). Mapovanie zije s fontom v `_TTF_CACHE`; ak mmap nejde, cita sa cely subor.
+    """
+    try:
+        with path.open("rb") as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return path.read_bytes()
+    return memoryview(mapped)
+
+
 def _try_load_unicode_fonts() -> dict[str, TrueTypeFont]:
     """
     Try to load a Unicode-capable TrueType font (Windows), so PDF can render diacritics.
     Falls back to ASCII-only mode if unavailable.
     """
+    for regular_path, bold_path in _font_candidates():
+        try:
+            if not regular_path.exists() or not bold_path.exists():
+                continue
+            regular = _cached_font(regular_path, "/UnicodeRegular")
+            bold = _cached_font(bold_path, "/UnicodeBold")
+            regular.used_gids.add(regular.glyph_id(ord(" ")))
+            bold.used_gids.add(bold.glyph_id(ord(" ")))
+            return {"/F1": regular, "/F2": bold}
+        except Exception:
+            continue
+    return {}
+
+
+def _font_candidates() -> list[tuple[Path, Path]]:
     override = os.environ.get("WEB_CALCULATOR_PDF_FONT")
+    if override and override.strip().lower() == "type1":
+        return []  # vynutene vstavane Helvetica (napr. benchmark, minimalna velkost PDF)
     base_dir = Path(override) if override else None
     candidates: list[tuple[Path, Path]] = []
     if base_dir and base_dir.is_dir():
         candidates.append((base_dir / "regular.ttf", base_dir / "bold.ttf"))
     candidates.append((Path(r"C:\Windows\Fonts\segoeui.ttf"), Path(r"C:\Windows\Fonts\segoeuib.ttf")))
     candidates.append((Path(r"C:\Windows\Fonts\arial.ttf"), Path(r"C:\Windows\Fonts\arialbd.ttf")))
+    return candidates
 
-    for regular_path, bold_path in candidates:
+
+def font_fingerprint() -> str:
+    """
+    Identita fontov, ktore by render pouzil (cesta, velkost, mtime); TTF su uz v cache procesu.
+    Pouziva sa v kluci cache hotovych PDF.
+    """
+    parts = []
+    for name, font in sorted(_try_load_unicode_fonts().items()):
         try:
-            if not regular_path.exists() or not bold_path.exists():
-                continue
-            regular = TrueTypeFont(regular_path, pdf_name="/UnicodeRegular")
-            bold = TrueTypeFont(bold_path, pdf_name="/UnicodeBold")
-            regular.used_gids.add(regular.glyph_id(ord(" ")))
-            bold.used_gids.add(bold.glyph_id(ord(" ")))
-            return {"/F1": regular, "/F2": bold}
-        except Exception:
+            st = font.path.stat()
+        except OSError:
             continue
-    return {}
+        parts.append(f"{name}={font.path}:{st.st_size}:{st.st_mtime_ns}")
+    return "|".join(parts) or "type1:helvetica"
+
+
+def _cached_font(path: Path, pdf_name: str) -> TrueTypeFont:
+    key = (str(path), pdf_name)
+    font = _TTF_CACHE.get(key)
+    if font is None:
+        font = TrueTypeFont(path, pdf_name=pdf_name)
+        _TTF_CACHE[key] = font
+    return font
 
 
 def _scale_font_units(value: int, units_per_em: int) -> int:
@@ -244,8 +320,8 @@ def _scale_font_units(value: int, units_per_em: int) -> int:
     return int(round(value * 1000.0 / float(units_per_em)))
 
 
-def _format_cid_widths(font: TrueTypeFont) -> str:
-    gids = sorted(font.used_gids)
+def _format_cid_widths(font: TrueTypeFont, gids: set[int] | None = None) -> str:
+    gids = sorted(font.used_gids if gids is None else gids)
     if not gids:
         return ""
     parts: list[str] = []
@@ -262,20 +338,63 @@ def _format_cid_widths(font: TrueTypeFont) -> str:
     return " ".join(parts)
 
 
+# Vlastny kluc CIDFont slovnika s odtlackom vlozeneho TTF (citacie programy ho ignoruju)
+FONT_DIGEST_KEY = "WebCalcFontDigest"
+_DIGEST_RE = re.compile(rb"/" + FONT_DIGEST_KEY.encode("ascii") + rb" \(([0-9a-f]+)\)")
+_W_RE = re.compile(rb"/W \[(.*)\]", re.S)
+_W_RUN_RE = re.compile(rb"(\d+)\s*\[([^\]]*)\]")
+
+
+def embedded_font_digest(cid_font_body: bytes) -> str | None:
+    """Odtlacok TTF zapisany v CIDFont objekte (None pre PDF zo starsej verzie)."""
+    match = _DIGEST_RE.search(cid_font_body)
+    return match.group(1).decode("ascii") if match else None
+
+
+def cid_width_gids(cid_font_body: bytes) -> set[int]:
+    """Glyfy s vlastnou sirkou v /W poli CIDFont objektu (format `start [w ...]` z `_format_cid_widths`)."""
+    match = _W_RE.search(cid_font_body)
+    gids: set[int] = set()
+    if match:
+        for start, widths in _W_RUN_RE.findall(match.group(1)):
+            gids.update(range(int(start), int(start) + len(widths.split())))
+    return gids
+
+
+def extend_cid_widths(cid_font_body: bytes, font: TrueTypeFont, gids: set[int]) -> bytes | None:
+    """
+    Nahradne telo CIDFont objektu, ktoreho /W pokryva aj `gids` (napr. glyfy pecatky pri
+    inkrementalnej uprave); None, ak ich povodna tabulka uz obsahuje.
+    """
+    existing = cid_width_gids(cid_font_body)
+    if gids <= existing:
+        return None
+    widths = f"/W [{_format_cid_widths(font, existing | gids)}]".encode("ascii")
+    match = _W_RE.search(cid_font_body)
+    if match:
+        return cid_font_body[: match.start()] + widths + cid_font_body[match.end() :]
+    end = cid_font_body.rindex(b">>")
+    return cid_font_body[:end].rstrip() + b" " + widths + b" >>"
+
+
 def _build_unicode_font_objs(
     regular: TrueTypeFont,
     bold: TrueTypeFont,
-) -> tuple[list[bytes], int, int, int]:
+) -> tuple[list[bytes | tuple[bytes | memoryview, ...]], int, int, int]:
+    """
+    PDF objekty pre dva Type0/CIDFontType2 fonty. FontFile2 je tuple casti (hlavicka, data fontu,
+    koniec streamu), aby writer zapisal namapovany font bez skladania novych bajtov.
+    """
     reg_file_id, reg_desc_id, reg_cid_id, reg_type0_id = 3, 4, 5, 6
     bold_file_id, bold_desc_id, bold_cid_id, bold_type0_id = 7, 8, 9, 10
     next_free = 11
 
-    def fontfile_obj(obj_id: int, font: TrueTypeFont) -> bytes:
+    def fontfile_obj(obj_id: int, font: TrueTypeFont) -> tuple[bytes | memoryview, ...]:
         data = font.data
         return (
-            f"{obj_id} 0 obj << /Length {len(data)} >> stream\n".encode("ascii")
-            + data
-            + b"\nendstream endobj\n"
+            f"{obj_id} 0 obj << /Length {len(data)} >> stream\n".encode("ascii"),
+            data,
+            b"\nendstream endobj\n",
         )
 
     def font_descriptor_obj(obj_id: int, fontfile_id: int, font: TrueTypeFont) -> bytes:
@@ -305,7 +424,8 @@ def _build_unicode_font_objs(
         return (
             f"{obj_id} 0 obj << /Type /Font /Subtype /CIDFontType2 /BaseFont {font.pdf_name} "
             f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
-            f"/FontDescriptor {desc_id} 0 R /CIDToGIDMap /Identity /DW {dw}{w_part} >> endobj\n"
+            f"/FontDescriptor {desc_id} 0 R /CIDToGIDMap /Identity /{FONT_DIGEST_KEY} ({font.digest}) "
+            f"/DW {dw}{w_part} >> endobj\n"
         ).encode("ascii")
 
     def type0_font_obj(obj_id: int, cid_id: int) -> bytes:
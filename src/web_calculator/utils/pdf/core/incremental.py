@@ -0,0 +1,204 @@
+"""
+Inkrementalne aktualizacie PDF (ISO 32000-1, 7.5.6).
+
+Povodne bajty sa nemenia; na koniec suboru sa pripoja nove/nahradne objekty, nova xref
+sekcia a trailer s `/Prev` na predchadzajucu xref. Pouziva sa na pecatky stavu platby a
+drobne opravy bez plneho renderu. Podporuje klasicke xref tabulky (vystup `builder.py`);
+PDF s xref streamom (PDF 1.5, `object_streams=True`) sa odmietne uz v `read_xref`.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Mapping
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)\s+%%EOF\s*$")
+_TRAILER_RE = re.compile(rb"trailer\s*<<(.*?)>>", re.S)
+_CONTENTS_RE = re.compile(rb"/Contents\s+(\[[^\]]*\]|\d+ 0 R)")
+_REF_RE = re.compile(rb"(\d+) 0 R")
+_RESOURCES_RE = re.compile(rb"/Resources\s+(\d+) 0 R")
+_FONT_DICT_RE = re.compile(rb"/Font\s*<<(.*?)>>", re.S)
+_FONT_ENTRY_RE = re.compile(rb"/(\w+)\s+(\d+) 0 R")
+_XREF_STREAM_RE = re.compile(rb"\d+\s+\d+\s+obj\s*<<[^>]*?/Type\s*/XRef")
+_STREAM_RE = re.compile(rb"stream\r?\n(.*)\r?\nendstream", re.S)
+
+
+@dataclass(frozen=True)
+class XrefInfo:
+    startxref: int
+    size: int
+    root: int
+    offsets: dict[int, int]
+
+
+def read_xref(pdf: bytes) -> XrefInfo:
+    """Nacita posledny trailer a spoji vsetky xref sekcie (novsie maju prednost)."""
+    match = _STARTXREF_RE.search(pdf[-64:])
+    if not match:
+        raise ValueError("PDF nema platny startxref")
+    startxref = int(match.group(1))
+    offsets: dict[int, int] = {}
+    size = root = None
+    pos: int | None = startxref
+    seen: set[int] = set()
+    while pos is not None and pos not in seen:
+        seen.add(pos)
+        if pdf[pos : pos + 4] != b"xref":
+            if _XREF_STREAM_RE.match(pdf, pos):
+                raise ValueError(
+                    "PDF pouziva xref stream (PDF 1.5, komprimovane objekty); "
+                    "inkrementalna aktualizacia podporuje len klasicku xref tabulku"
+                )
+            raise ValueError(f"Na offsete {pos} nie je xref tabulka")
+        trailer_at = pdf.index(b"trailer", pos)
+        _parse_xref_table(pdf[pos + 4 : trailer_at], offsets)
+        trailer = _TRAILER_RE.match(pdf, trailer_at)
+        if trailer is None:
+            raise ValueError("Chybny trailer")
+        body = trailer.group(1)
+        if size is None:
+            size = int(re.search(rb"/Size (\d+)", body).group(1))
+            root = int(re.search(rb"/Root (\d+) 0 R", body).group(1))
+        prev = re.search(rb"/Prev (\d+)", body)
+        pos = int(prev.group(1)) if prev else None
+    return XrefInfo(startxref=startxref, size=size, root=root, offsets=offsets)
+
+
+def _parse_xref_table(table: bytes, offsets: dict[int, int]) -> None:
+    lines = table.split(b"\n")
+    i = 0
+    while i < len(lines):
+        header = lines[i].split()
+        i += 1
+        if len(header) != 2:
+            continue
+        first, count = int(header[0]), int(header[1])
+        for obj_id in range(first, first + count):
+            entry = lines[i].split()
+            i += 1
+            if len(entry) == 3 and entry[2] == b"n" and obj_id:
+                offsets.setdefault(obj_id, int(entry[0]))
+
+
+def object_body(pdf: bytes, xref: XrefInfo, obj_id: int) -> bytes:
+    """Telo objektu medzi `N 0 obj` a `endobj` (bez streamov s binarnymi datami)."""
+    start = xref.offsets[obj_id]
+    head = f"{obj_id} 0 obj".encode("ascii")
+    if not pdf.startswith(head, start):
+        raise ValueError(f"Objekt {obj_id} nesedi s xref offsetom")
+    end = pdf.index(b"endobj", start)
+    return pdf[start + len(head) : end].strip()
+
+
+def page_ids(pdf: bytes, xref: XrefInfo | None = None) -> list[int]:
+    xref = xref or read_xref(pdf)
+    catalog = object_body(pdf, xref, xref.root)
+    pages_id = int(re.search(rb"/Pages (\d+) 0 R", catalog).group(1))
+    kids = re.search(rb"/Kids \[([^\]]*)\]", object_body(pdf, xref, pages_id)).group(1)
+    return [int(ref) for ref in _REF_RE.findall(kids)]
+
+
+def append_update(pdf: bytes, objects: Mapping[int, bytes], xref: XrefInfo | None = None) -> bytes:
+    """
+    Pripoji inkrementalnu aktualizaciu s danymi objektmi (`id -> telo bez obj/endobj`).
+    Ide o nove objekty (id >= /Size) aj nahradu existujucich.
+    """
+    xref = xref or read_xref(pdf)
+    base = pdf if pdf.endswith(b"\n") else pdf + b"\n"
+    body = bytearray()
+    new_offsets: dict[int, int] = {}
+    for obj_id in sorted(objects):
+        new_offsets[obj_id] = len(base) + len(body)
+        body += f"{obj_id} 0 obj ".encode("ascii") + objects[obj_id] + b" endobj\n"
+
+    size = max(xref.size, max(new_offsets, default=0) + 1)
+    xref_at = len(base) + len(body)
+    # Podsekcia "0 1" (hlava zoznamu volnych objektov) kvoli citacom, ktore ocakavaju xref od nuly.
+    table = bytearray(b"xref\n0 1\n0000000000 65535 f \n")
+    for first, run in _runs(sorted(new_offsets)):
+        table += f"{first} {len(run)}\n".encode("ascii")
+        table += "".join(f"{new_offsets[obj_id]:010d} 00000 n \n" for obj_id in run).encode("ascii")
+    trailer = f"trailer << /Size {size} /Root {xref.root} 0 R /Prev {xref.startxref} >>\nstartxref\n{xref_at}\n%%EOF\n"
+    return bytes(base + body + table + trailer.encode("ascii"))
+
+
+def page_content(pdf: bytes, page_index: int, xref: XrefInfo | None = None) -> bytes:
+    """Spojene data content streamov strany (nekomprimovane streamy, ako ich pise `builder.py`)."""
+    xref = xref or read_xref(pdf)
+    page = object_body(pdf, xref, page_ids(pdf, xref)[page_index])
+    contents = _CONTENTS_RE.search(page)
+    if contents is None:
+        return b""
+    parts = []
+    for ref in _REF_RE.findall(contents.group(1)):
+        stream = _STREAM_RE.search(object_body(pdf, xref, int(ref)))
+        if stream is not None:
+            parts.append(stream.group(1))
+    return b"\n".join(parts)
+
+
+def page_cid_fonts(pdf: bytes, page_index: int, xref: XrefInfo | None = None) -> dict[str, int]:
+    """Meno fontu v /Resources strany (napr. "/F1") -> cislo CIDFont objektu jeho Type0 fontu."""
+    xref = xref or read_xref(pdf)
+    page = object_body(pdf, xref, page_ids(pdf, xref)[page_index])
+    resources_ref = _RESOURCES_RE.search(page)
+    resources = object_body(pdf, xref, int(resources_ref.group(1))) if resources_ref else page
+    font_dict = _FONT_DICT_RE.search(resources)
+    found: dict[str, int] = {}
+    for name, ref in _FONT_ENTRY_RE.findall(font_dict.group(1) if font_dict else b""):
+        font = object_body(pdf, xref, int(ref))
+        descendants = re.search(rb"/DescendantFonts\s*\[\s*(\d+) 0 R", font)
+        if b"/Subtype /Type0" in font and descendants:
+            found["/" + name.decode("ascii")] = int(descendants.group(1))
+    return found
+
+
+def append_page_content(
+    pdf: bytes,
+    page_index: int,
+    content: bytes | str,
+    replace: bool = False,
+    extra_objects: Mapping[int, bytes] | None = None,
+) -> bytes:
+    """
+    Prida na stranu novy content stream (overlay nad povodnym obsahom), alebo pri
+    `replace=True` nahradi jej obsah. Zapisu sa stream, upravena strana a `extra_objects`
+    (napr. nahradne CIDFont objekty s rozsirenou /W tabulkou) v jednej aktualizacii.
+    """
+    xref = read_xref(pdf)
+    ids = page_ids(pdf, xref)
+    if not 0 <= page_index < len(ids):
+        raise IndexError(f"Strana {page_index} neexistuje (pocet stran {len(ids)})")
+    page_id = ids[page_index]
+    page = object_body(pdf, xref, page_id)
+    contents = _CONTENTS_RE.search(page)
+    if contents is None:
+        raise ValueError(f"Strana {page_id} nema /Contents")
+
+    stream_id = xref.size
+    if replace:
+        new_contents = f"{stream_id} 0 R".encode("ascii")
+    else:
+        old_refs = b" ".join(ref + b" 0 R" for ref in _REF_RE.findall(contents.group(1)))
+        new_contents = b"[" + old_refs + f" {stream_id} 0 R]".encode("ascii")
+    new_page = page[: contents.start(1)] + new_contents + page[contents.end(1) :]
+
+    stream = content.encode("ascii", "ignore") if isinstance(content, str) else content
+    stream_obj = f"<< /Length {len(stream)} >> stream\n".encode("ascii") + stream + b"\nendstream"
+    return append_update(pdf, {**(extra_objects or {}), stream_id: stream_obj, page_id: new_page}, xref)
+
+
+def uses_type1_fonts(pdf: bytes) -> bool:
+    """True, ak dokument pouziva zabudovanu Helveticu (bez Unicode TTF)."""
+    return b"/BaseFont /Helvetica" in pdf
+
+
+def _runs(ids: list[int]) -> list[tuple[int, list[int]]]:
+    runs: list[tuple[int, list[int]]] = []
+    for obj_id in ids:
+        if runs and runs[-1][1][-1] == obj_id - 1:
+            runs[-1][1].append(obj_id)
+        else:
+            runs.append((obj_id, [obj_id]))
+    return runs
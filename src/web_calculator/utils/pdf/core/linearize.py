@@ -0,0 +1,302 @@
+"""
+Linearizovany vystup PDF (ISO 32000-1, Annex F) - "Fast Web View".
+
+Poradie v subore: hlavicka, linearizacny slovnik, xref prvej strany, katalog (+ zalozky),
+primarny hint stream, objekty prvej strany (strana, obsah, zdielane fonty/resources),
+ostatne strany, ostatne objekty a na konci hlavna xref. Prehliadac pri streamovani
+zobrazi prvu stranu hned po nacitani jej sekcie.
+
+Objekty sa precisluju: ostatne strany a strom stran dostanu cisla 1..M, sekcia prvej
+strany M+1.. (jedna podsekcia v xref prvej strany).
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Mapping, Sequence
+
+_OBJ_HEAD_RE = re.compile(rb"(\d+) 0 obj")
+_REF_RE = re.compile(rb"(\d+) 0 R\b")
+_STREAM_MARK = b"stream\n"
+
+
+class _BitWriter:
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self._acc = 0
+        self._nbits = 0
+
+    def write(self, value: int, nbits: int) -> None:
+        for shift in range(nbits - 1, -1, -1):
+            self._acc = (self._acc << 1) | ((value >> shift) & 1)
+            self._nbits += 1
+            if self._nbits == 8:
+                self.data.append(self._acc)
+                self._acc = 0
+                self._nbits = 0
+
+    def flush(self) -> None:
+        if self._nbits:
+            self.data.append(self._acc << (8 - self._nbits))
+            self._acc = 0
+            self._nbits = 0
+
+
+def _nbits(value: int) -> int:
+    return max(0, int(value)).bit_length()
+
+
+def linearize_objects(
+    objects: Mapping[int, bytes],
+    catalog_id: int,
+    pages: Sequence[tuple[int, Sequence[int]]],
+    shared_ids: Sequence[int],
+    doc_level_ids: Sequence[int] = (),
+) -> bytes:
+    """
+    Zostavi linearizovane PDF z hotovych objektov (`id -> b"N 0 obj ... endobj\\n"`).
+
+    `pages` = [(id strany, [sukromne objekty strany])] v poradi stran, `shared_ids` su objekty
+    pouzite viacerymi stranami (resources, fonty) - idu do sekcie prvej strany,
+    `doc_level_ids` su objekty potrebne pri otvoreni (zalozky pri /PageMode /UseOutlines).
+    """
+    if not pages:
+        raise ValueError("Linearizacia potrebuje aspon jednu stranu")
+    first_page = [pages[0][0], *pages[0][1], *shared_ids]
+    first_section = [catalog_id, *doc_level_ids]
+    placed = set(first_page) | set(first_section)
+    other_pages = [[page_id, *private] for page_id, private in pages[1:]]
+    placed.update(obj_id for group in other_pages for obj_id in group)
+    other = [obj_id for obj_id in sorted(objects) if obj_id not in placed]
+
+    # Precislovanie: hlavna cast 1..M, potom lin. slovnik, katalog, ..., hint stream, prva strana.
+    main_order = [obj_id for group in other_pages for obj_id in group] + other
+    mapping: dict[int, int] = {old: new for new, old in enumerate(main_order, start=1)}
+    first_id = len(main_order) + 1
+    lin_id = first_id
+    next_id = first_id + 1
+    for old in first_section:
+        mapping[old] = next_id
+        next_id += 1
+    hint_id = next_id
+    next_id += 1
+    for old in first_page:
+        mapping[old] = next_id
+        next_id += 1
+    total = next_id
+
+    def emit(old: int) -> bytes:
+        return _renumber(objects[old], mapping)
+
+    part4 = [emit(old) for old in first_section]
+    part6 = [emit(old) for old in first_page]
+    part7 = [[emit(old) for old in group] for group in other_pages]
+    part9 = [emit(old) for old in other]
+
+    header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    lin_len = len(_lin_dict(lin_id, 0, 0, 0, mapping[pages[0][0]], 0, len(pages), 0))
+    first_xref_len = len(_first_xref(first_id, [0] * (total - first_id), total, mapping[catalog_id], 0))
+
+    # Offsety bez hint streamu (hint tabulky sa pocitaju "ako keby hint stream nebol v subore").
+    pos = len(header) + lin_len + first_xref_len
+    offsets: dict[int, int] = {}
+    for new_id, obj in zip([mapping[o] for o in first_section], part4):
+        offsets[new_id] = pos
+        pos += len(obj)
+    hint_at = pos
+    first_page_ids = [mapping[o] for o in first_page]
+    for new_id, obj in zip(first_page_ids, part6):
+        offsets[new_id] = pos
+        pos += len(obj)
+    end_first_page_nohint = pos
+    page_spans: list[tuple[int, int]] = [(offsets[first_page_ids[0]], end_first_page_nohint)]
+    for group_old, group in zip(other_pages, part7):
+        start = pos
+        for old, obj in zip(group_old, group):
+            offsets[mapping[old]] = pos
+            pos += len(obj)
+        page_spans.append((start, pos))
+    for old, obj in zip(other, part9):
+        offsets[mapping[old]] = pos
+        pos += len(obj)
+
+    nobjects = [len(first_page)] + [len(group) for group in other_pages]
+    shared_index = list(range(1 + len(pages[0][1]), len(first_page)))
+    hint_data, shared_table_at = _hint_tables(
+        nobjects, page_spans, [len(obj) for obj in part6], [[]] + [shared_index for _ in other_pages]
+    )
+    hint_obj = (
+        f"{hint_id} 0 obj << /Length {len(hint_data)} /S {shared_table_at} >> stream\n".encode("ascii")
+        + hint_data
+        + b"\nendstream endobj\n"
+    )
+    hint_len = len(hint_obj)
+
+    # Skutocne offsety: vsetko od hint streamu dalej sa posunie o jeho dlzku.
+    real = {obj_id: off + hint_len if off >= hint_at else off for obj_id, off in offsets.items()}
+    real[hint_id] = hint_at
+    real[lin_id] = len(header)
+    end_first_page = end_first_page_nohint + hint_len
+    main_xref_at = pos + hint_len
+    main_xref = _main_xref(first_id, real)
+    main_trailer = f"trailer << /Size {total} >>\n".encode("ascii")
+    first_xref_at = len(header) + lin_len
+    tail = main_xref + main_trailer + f"startxref\n{first_xref_at}\n%%EOF\n".encode("ascii")
+    file_len = main_xref_at + len(tail)
+    first_entry_ws = main_xref_at + len(f"xref\n0 {first_id}".encode("ascii"))
+
+    lin = _lin_dict(lin_id, file_len, hint_at, hint_len, mapping[pages[0][0]], end_first_page, len(pages), first_entry_ws)
+    first_xref = _first_xref(
+        first_id, [real[obj_id] for obj_id in range(first_id, total)], total, mapping[catalog_id], main_xref_at
+    )
+    out = bytearray(header)
+    out += lin
+    out += first_xref
+    for obj in part4:
+        out += obj
+    out += hint_obj
+    for obj in part6:
+        out += obj
+    for group in part7:
+        for obj in group:
+            out += obj
+    for obj in part9:
+        out += obj
+    out += tail
+    return bytes(out)
+
+
+def _lin_dict(obj_id: int, length: int, hint_at: int, hint_len: int, first_page: int, end_first: int, npages: int, t: int) -> bytes:
+    # Ciselne hodnoty s pevnou sirkou, aby dlzka slovnika nezavisela od offsetov.
+    return (
+        f"{obj_id} 0 obj << /Linearized 1 /L {length:010d} /H [{hint_at:010d} {hint_len:010d}] "
+        f"/O {first_page} /E {end_first:010d} /N {npages} /T {t:010d} >> endobj\n"
+    ).encode("ascii")
+
+
+def _first_xref(first_id: int, offsets: Sequence[int], size: int, root: int, prev: int) -> bytes:
+    entries = "".join(f"{off:010d} 00000 n \n" for off in offsets)
+    return (
+        f"xref\n{first_id} {len(offsets)}\n{entries}"
+        f"trailer << /Size {size} /Root {root} 0 R /Prev {prev:010d} >>\nstartxref\n0\n%%EOF\n"
+    ).encode("ascii")
+
+
+def _main_xref(first_id: int, offsets: Mapping[int, int]) -> bytes:
+    entries = ["0000000000 65535 f \n"] + [f"{offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, first_id)]
+    return f"xref\n0 {first_id}\n".encode("ascii") + "".join(entries).encode("ascii")
+
+
+def _hint_tables(
+    nobjects: Sequence[int],
+    page_spans: Sequence[tuple[int, int]],
+    shared_lengths: Sequence[int],
+    shared_refs: Sequence[Sequence[int]],
+) -> tuple[bytes, int]:
+    """Page offset hint table (F.4.1) + shared object hint table (F.4.2); vrati data a offset /S."""
+    w = _BitWriter()
+    page_lengths = [end - start for start, end in page_spans]
+    min_nobjects = min(nobjects)
+    min_length = min(page_lengths)
+    nbits_nobjects = _nbits(max(n - min_nobjects for n in nobjects))
+    nbits_length = _nbits(max(n - min_length for n in page_lengths))
+    nbits_nshared = _nbits(max(len(refs) for refs in shared_refs))
+    nbits_shared_id = _nbits(len(shared_lengths) - 1)
+
+    w.write(min_nobjects, 32)
+    w.write(page_spans[0][0], 32)
+    w.write(nbits_nobjects, 16)
+    w.write(min_length, 32)
+    w.write(nbits_length, 16)
+    # Offset/dlzka obsahu strany: prehliadace ich ignoruju; ako qpdf = 0 a dlzka strany.
+    w.write(0, 32)
+    w.write(0, 16)
+    w.write(min_length, 32)
+    w.write(nbits_length, 16)
+    w.write(nbits_nshared, 16)
+    w.write(nbits_shared_id, 16)
+    w.write(0, 16)  # bity citatela zlomku pozicie
+    w.write(1, 16)  # menovatel
+    for n in nobjects:
+        w.write(n - min_nobjects, nbits_nobjects)
+    w.flush()
+    for n in page_lengths:
+        w.write(n - min_length, nbits_length)
+    w.flush()
+    for refs in shared_refs:
+        w.write(len(refs), nbits_nshared)
+    w.flush()
+    for refs in shared_refs:
+        for ref in refs:
+            w.write(ref, nbits_shared_id)
+    w.flush()
+    w.flush()  # citatele zlomkov (0 bitov)
+    w.flush()  # offsety obsahu (0 bitov)
+    for n in page_lengths:
+        w.write(n - min_length, nbits_length)
+    w.flush()
+
+    shared_at = len(w.data)
+    min_group = min(shared_lengths)
+    nbits_group = _nbits(max(n - min_group for n in shared_lengths))
+    w.write(0, 32)  # prvy objekt sekcie zdielanych objektov (ziadna - vsetko je v prvej strane)
+    w.write(0, 32)
+    w.write(len(shared_lengths), 32)
+    w.write(len(shared_lengths), 32)
+    w.write(0, 16)  # kazda skupina = 1 objekt
+    w.write(min_group, 32)
+    w.write(nbits_group, 16)
+    for n in shared_lengths:
+        w.write(n - min_group, nbits_group)
+    w.flush()
+    for _ in shared_lengths:
+        w.write(0, 1)  # bez MD5 podpisu
+    w.flush()
+    return bytes(w.data), shared_at
+
+
+def _renumber(obj: bytes, mapping: Mapping[int, int]) -> bytes:
+    """Precisluje hlavicku objektu a referencie v slovniku; data streamu ostanu nedotknute."""
+    head = _OBJ_HEAD_RE.match(obj)
+    if head is None:
+        raise ValueError("Objekt nezacina 'N 0 obj'")
+    stream_at = obj.find(_STREAM_MARK, head.end())
+    dict_part = obj[head.end() : stream_at] if stream_at >= 0 else obj[head.end() :]
+    rest = obj[stream_at:] if stream_at >= 0 else b""
+    new_head = f"{mapping[int(head.group(1))]} 0 obj".encode("ascii")
+    return new_head + _rewrite_refs(dict_part, mapping) + rest
+
+
+def _rewrite_refs(data: bytes, mapping: Mapping[int, int]) -> bytes:
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n:
+        ch = data[i : i + 1]
+        if ch == b"(":
+            # Literal string (napr. titulok zalozky) sa neprepisuje.
+            depth = 0
+            j = i
+            while j < n:
+                c = data[j : j + 1]
+                if c == b"\\":
+                    j += 2
+                    continue
+                if c == b"(":
+                    depth += 1
+                elif c == b")":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                j += 1
+            out += data[i : j + 1]
+            i = j + 1
+            continue
+        match = _REF_RE.match(data, i)
+        if match and (i == 0 or not data[i - 1 : i].isdigit()):
+            out += f"{mapping[int(match.group(1))]} 0 R".encode("ascii")
+            i = match.end()
+            continue
+        out += ch
+        i += 1
+    return bytes(out)
@@ -0,0 +1,76 @@
+"""
+Output helpers: atomic file writes for exported PDFs.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import stat
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+
+@contextmanager
+def open_atomic(path: Path) -> Iterator[BinaryIO]:
+    """
+    Otvori docasny subor v tom istom priecinku na binarny zapis; po uspesnom bloku ho atomicky
+    premenuje na `path`, pri vynimke ho zmaze. Streamovany zapis (`write_pdf`) tak nepotrebuje
+    cely dokument v pamati a citatel aj tak nikdy nevidi polovicny subor.
+    Vysledny subor ma prava povodneho suboru, novy subor `0o666 & ~umask` (nie 0600 z `mkstemp`).
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent or "."))
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            yield fh
+            fh.flush()
+            _chmod(fh.fileno(), tmp_name, _target_mode(path))
+            os.fsync(fh.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+@lru_cache(maxsize=1)
+def _default_mode() -> int:
+    # umask sa da len nastavit a vratit; zisti sa raz za proces
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _target_mode(path: Path) -> int:
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return _default_mode()
+
+
+def _chmod(fd: int, name: str, mode: int) -> None:
+    if hasattr(os, "fchmod"):
+        os.fchmod(fd, mode)
+    else:  # Windows (pred Python 3.13)
+        os.chmod(name, mode)
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    """
+    Zapise data do docasneho suboru v tom istom priecinku a potom ho atomicky premenuje.
+    Citatel (napr. PDF prehliadac alebo upload) tak nikdy nevidi polovicny subor.
+    """
+    with open_atomic(path) as fh:
+        fh.write(data)
+
+
+def copy_file_atomic(src: Path, path: Path) -> None:
+    """Skopiruje hotovy subor (napr. z cache) po blokoch, bez nacitania do pamati."""
+    with open(src, "rb") as source, open_atomic(path) as fh:
+        shutil.copyfileobj(source, fh)
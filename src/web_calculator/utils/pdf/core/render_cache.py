@@ -0,0 +1,124 @@
+"""
+Content-addressed cache hotovych PDF (opakovany export toho isteho payloadu).
+
+Kluc = SHA-256 z kanonickeho JSON payloadu (vratane override riadkov sekcii),
+identity fontov a verzie renderera. Subory su v `data/pdf_cache/<kluc>.pdf`;
+velkost je obmedzena a pri prekroceni sa mazu najdlhsie nepouzite (LRU podla mtime).
+
+Vypnutie: `WEB_CALCULATOR_PDF_CACHE=0` alebo `render_pdf(..., use_cache=False)`.
+Iny priecinok: `WEB_CALCULATOR_PDF_CACHE_DIR`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Mapping
+
+from web_calculator.utils.pdf.core.output import copy_file_atomic, write_bytes_atomic
+
+# Zvys pri kazdej zmene vystupu renderera (layout, builder, fonty), aby sa stare PDF nepouzili.
+RENDERER_VERSION = "2"
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[3] / "data" / "pdf_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def cache_enabled(use_cache: bool | None = None) -> bool:
+    """Explicitny parameter ma prednost pred premennou prostredia."""
+    if use_cache is not None:
+        return use_cache
+    return os.environ.get("WEB_CALCULATOR_PDF_CACHE", "1").strip().lower() not in {"0", "off", "false", "no"}
+
+
+def cache_key(payload: Mapping, font_identity: str = "") -> str:
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    digest = hashlib.sha256()
+    digest.update(f"v{RENDERER_VERSION}\0{font_identity}\0".encode("utf-8"))
+    digest.update(canonical.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Velkostne obmedzeny diskovy LRU store PDF bajtov."""
+
+    def __init__(self, directory: Path | str | None = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = Path(directory) if directory else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pdf"
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # posledne pouzitie pre LRU
+        except OSError:
+            pass
+        return data
+
+    def get_path(self, key: str) -> Path | None:
+        """Ako `get`, ale vrati cestu k ulozenemu PDF (kopiruje sa po blokoch, nie cez pamat)."""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            write_bytes_atomic(self._path(key), data)
+            self.evict()
+        except OSError:
+            # Cache je len optimalizacia; chyba zapisu nesmie zhodit export.
+            pass
+
+    def put_file(self, key: str, src: Path) -> None:
+        try:
+            if Path(src).stat().st_size > self.max_bytes:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            copy_file_atomic(src, self._path(key))
+            self.evict()
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.pdf"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.pdf"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def default_cache() -> RenderCache:
+    override = os.environ.get("WEB_CALCULATOR_PDF_CACHE_DIR")
+    return RenderCache(Path(override) if override else None)
@@ -0,0 +1,145 @@
+"""
+Telemetria PDF pipeline: casy jednotlivych faz, bajty podla triedy objektov a fallbacky.
+
+Kazdy render (`render_pdf`, `render_pdf_bytes`, `render_bundle`, dokument v `render_many`)
+bezi v `render_scope`; na konci sa `RenderRecord` posle listenerom (`add_listener`) a zaloguje
+ako strukturovany zaznam do loggera `web_calculator.pdf` (`extra={"pdf_render": {...}}`).
+Fallback na legacy sa loguje ako warning aj s vynimkou. Mimo scope su `stage`/`count_bytes` no-op.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterator, List
+
+logger = logging.getLogger("web_calculator.pdf")
+
+# Fazy v poradi pipeline (pre reporty); `legacy` = cas fallback renderu
+STAGES = ("cache", "fonts", "qr", "sections", "table", "build", "write", "legacy")
+
+
+@dataclass
+class RenderRecord:
+    kind: str
+    stages: Dict[str, float] = field(default_factory=dict)  # sekundy
+    object_bytes: Dict[str, int] = field(default_factory=dict)  # napr. content, fontfile, xref
+    total_bytes: int = 0
+    pages: int = 0
+    seconds: float = 0.0
+    cache_hit: bool = False
+    fallback: bool = False
+    error: str = ""
+    exception: BaseException | None = field(default=None, repr=False, compare=False)
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("exception", None)
+        return data
+
+
+Listener = Callable[[RenderRecord], None]
+
+_LISTENERS: List[Listener] = []
+_LOCAL = threading.local()
+_COUNTERS_LOCK = threading.Lock()
+_COUNTERS: Dict[str, int] = {"renders": 0, "fallbacks": 0, "cache_hits": 0}
+
+
+def add_listener(listener: Listener) -> Listener:
+    """Zaregistruje callback volany po kazdom renderi (z vlakna, ktore renderovalo)."""
+    _LISTENERS.append(listener)
+    return listener
+
+
+def remove_listener(listener: Listener) -> None:
+    try:
+        _LISTENERS.remove(listener)
+    except ValueError:
+        pass
+
+
+def counters() -> Dict[str, int]:
+    with _COUNTERS_LOCK:
+        return dict(_COUNTERS)
+
+
+def reset_counters() -> None:
+    with _COUNTERS_LOCK:
+        for key in _COUNTERS:
+            _COUNTERS[key] = 0
+
+
+def current() -> RenderRecord | None:
+    return getattr(_LOCAL, "record", None)
+
+
+@contextmanager
+def render_scope(kind: str) -> Iterator[RenderRecord]:
+    """Otvori zaznam pre jeden render; vnoreny scope (napr. render_pdf -> _write_new) pouzije vonkajsi."""
+    outer = current()
+    if outer is not None:
+        yield outer
+        return
+    record = RenderRecord(kind=kind)
+    _LOCAL.record = record
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - start
+        _LOCAL.record = None
+        _publish(record)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    record = current()
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record.stages[name] = record.stages.get(name, 0.0) + time.perf_counter() - start
+
+
+def count_bytes(object_class: str, size: int) -> None:
+    record = current()
+    if record is not None:
+        record.object_bytes[object_class] = record.object_bytes.get(object_class, 0) + int(size)
+
+
+def mark_fallback(exc: BaseException) -> None:
+    record = current()
+    if record is not None:
+        record.fallback = True
+        record.error = f"{type(exc).__name__}: {exc}"
+        record.exception = exc
+    logger.warning("PDF renderer zlyhal, pouzity legacy fallback", exc_info=exc)
+
+
+def _publish(record: RenderRecord) -> None:
+    with _COUNTERS_LOCK:
+        _COUNTERS["renders"] += 1
+        _COUNTERS["fallbacks"] += int(record.fallback)
+        _COUNTERS["cache_hits"] += int(record.cache_hit)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "pdf render %s: %.1f ms, %d B%s",
+            record.kind,
+            record.seconds * 1000.0,
+            record.total_bytes,
+            " (fallback)" if record.fallback else "",
+            extra={"pdf_render": record.as_dict()},
+        )
+    for listener in list(_LISTENERS):
+        try:
+            listener(record)
+        except Exception:
+            # Telemetria nesmie zhodit export.
+            logger.exception("PDF telemetry listener zlyhal")
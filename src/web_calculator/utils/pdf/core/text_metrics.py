@@ -0,0 +1,170 @@
+"""
+Meranie sirky textu podla metriky fontu (jednotky 1/1000 em).
+
+Pre kazdy font sa raz predpocita tabulka sirok (Type1 Helvetica z AFM, TTF cez `width_1000`
+pre latinku vratane slovenskej diakritiky) a sirky celych retazcov sa memoizuju, takze
+meranie kazdeho riadku aj pri tabulke s 10k polozkami je lacne.
+Nad tym su `fit_text` (skratenie s "...") a `wrap_text` (zalamovanie do stlpca).
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict
+
+from web_calculator.utils.pdf.core import fonts
+from web_calculator.utils.pdf.core.content_stream import _normalize_ascii
+
+ELLIPSIS = "..."  # Type1 fonty nemaju "…" (normalizacia na ASCII by ho zahodila)
+
+# Helvetica / Helvetica-Bold, znaky 32..126 (StandardEncoding, AFM Adobe Core 14)
+_HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 222, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    222, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD = (
+    278, 333, 474, 556, 556, 889, 722, 278, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    278, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+# Latinka + Latin Extended-A/B (slovenska diakritika) sa predpocita pre TTF
+_TTF_TABLE_SIZE = 0x250
+# Strop memoizovanych retazcov na font; pri naplneni sa cache vycisti
+_STRING_CACHE_MAX = 65536
+
+
+class FontMetrics:
+    """Sirky znakov jedneho fontu + memo sirok celych retazcov."""
+
+    __slots__ = ("_table", "_font", "_ascii_only", "_default", "_strings")
+
+    def __init__(self, table: list[int], font: "fonts.TrueTypeFont | None" = None, default: int = 556) -> None:
+        self._table = table
+        self._font = font
+        self._ascii_only = font is None  # Type1: text sa pred zapisom normalizuje na ASCII
+        self._default = default
+        self._strings: Dict[str, int] = {}
+
+    @classmethod
+    def for_type1(cls, bold: bool) -> "FontMetrics":
+        widths = _HELVETICA_BOLD if bold else _HELVETICA
+        return cls([0] * 32 + list(widths), default=556)
+
+    @classmethod
+    def for_ttf(cls, font: "fonts.TrueTypeFont") -> "FontMetrics":
+        table = [font.width_1000(font.glyph_id(cp)) for cp in range(_TTF_TABLE_SIZE)]
+        return cls(table, font=font, default=font.width_1000(0) or 500)
+
+    def prepare(self, text: str) -> str:
+        """Text tak, ako ho zapise `ContentStream.text` (Type1 bez diakritiky)."""
+        return _normalize_ascii(text) if self._ascii_only else str(text)
+
+    def char_width(self, ch: str) -> int:
+        cp = ord(ch)
+        if cp < len(self._table):
+            return self._table[cp]
+        if self._font is not None:
+            return self._font.width_1000(self._font.glyph_id(cp))
+        return self._default
+
+    def width_1000(self, text: str) -> int:
+        cached = self._strings.get(text)
+        if cached is not None:
+            return cached
+        if len(self._strings) >= _STRING_CACHE_MAX:
+            self._strings.clear()
+        table = self._table
+        size = len(table)
+        if self._ascii_only:
+            prepared = _normalize_ascii(text)
+            total = sum(table[ord(ch)] if ord(ch) < size else self._default for ch in prepared)
+        else:
+            total = sum(table[ord(ch)] if ord(ch) < size else self.char_width(ch) for ch in text)
+        self._strings[text] = total
+        return total
+
+
+_TYPE1 = {"/F1": FontMetrics.for_type1(bold=False), "/F2": FontMetrics.for_type1(bold=True)}
+# Metriky TTF podla (cesta, pdf meno), ako `fonts._TTF_CACHE`
+_TTF_METRICS: Dict[tuple[str, str], FontMetrics] = {}
+
+
+def metrics_for(font: str) -> FontMetrics:
+    """Metriky fontu z aktualnej font mapy (`/F1`, `/F2`); bez TTF plati Helvetica."""
+    font_obj = fonts.get_font_map().get(font)
+    if font_obj is None:
+        return _TYPE1.get(font, _TYPE1["/F1"])
+    key = (str(font_obj.path), font_obj.pdf_name)
+    metrics = _TTF_METRICS.get(key)
+    if metrics is None:
+        metrics = FontMetrics.for_ttf(font_obj)
+        _TTF_METRICS[key] = metrics
+    return metrics
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    return metrics_for(font).width_1000(str(text)) * size / 1000.0
+
+
+def fit_text(text: str, font: str, size: float, max_width: float, ellipsis: str = ELLIPSIS) -> str:
+    """Vrati text, alebo jeho najdlhsi prefix + `ellipsis`, ktory sa zmesti do `max_width`."""
+    metrics = metrics_for(font)
+    text = metrics.prepare(text)
+    limit = max_width * 1000.0 / size if size else 0.0
+    if metrics.width_1000(text) <= limit:
+        return text
+    budget = limit - metrics.width_1000(ellipsis)
+    if budget <= 0:
+        return ""
+    # prefixove sucty sirok -> binarne vyhladanie dlzky prefixu
+    prefix = list(accumulate(metrics.char_width(ch) for ch in text))
+    cut = bisect_right(prefix, budget)
+    return text[:cut].rstrip() + ellipsis
+
+
+def wrap_text(text: str, font: str, size: float, max_width: float, max_lines: int | None = None) -> list[str]:
+    """
+    Zalomi text po slovach do `max_width`; slovo sirsie ako stlpec sa rozdeli po znakoch.
+    Pri `max_lines` sa posledny riadok skrati s "..." (zvysok textu sa nezobrazi).
+    """
+    metrics = metrics_for(font)
+    words = metrics.prepare(text).split()
+    if not words:
+        return [""]
+    limit = max_width * 1000.0 / size if size else 0.0
+    space = metrics.char_width(" ")
+    lines: list[str] = []
+    current = ""
+    current_w = 0
+    for word in words:
+        word_w = metrics.width_1000(word)
+        if current and current_w + space + word_w <= limit:
+            current += " " + word
+            current_w += space + word_w
+            continue
+        if current:
+            lines.append(current)
+        while word_w > limit and len(word) > 1:
+            prefix = list(accumulate(metrics.char_width(ch) for ch in word))
+            cut = max(1, bisect_right(prefix, limit))
+            lines.append(word[:cut])
+            word = word[cut:]
+            word_w = metrics.width_1000(word)
+        current, current_w = word, word_w
+    lines.append(current)
+    if max_lines is not None and len(lines) > max_lines:
+        rest = " ".join(lines[max_lines - 1 :])
+        lines = lines[: max_lines - 1] + [fit_text(rest, font, size, max_width)]
+    return lines
+
+
+def fit_lines(lines, font: str, size: float, max_width: float) -> list[str]:
+    return [fit_text(str(line), font, size, max_width) for line in lines]
@@ -1,6 +1,7 @@
 """
 Helpers to derive totals/original sums and prepared display items (balik + sluzby).
 Mirrors legacy computations to keep PDF numbers consistent.
+Sumy sa parsuju raz na centy (`web_calculator.utils.money`) a scitavaju presne.
 """
 
 from __future__ import annotations
@@ -8,48 +9,36 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Mapping, Sequence
 
+from web_calculator.utils.money import apply_rate, format_cents, from_cents, rate_units, to_cents
+
 
 def format_currency(value: float) -> str:
-    try:
-        numeric = float(value)
-    except (TypeError, ValueError):
-        numeric = 0.0
-    return f"{numeric:,.2f} EUR"
+    return format_cents(_safe_cents(value, 0))
 
 
 def recompute_original_extras(items: Sequence[Mapping]) -> float:
-    total = 0.0
+    total = 0
     for it in items:
         try:
             qty = float(it.get("qty", 1) or 1)
         except (TypeError, ValueError):
             qty = 1.0
-        try:
-            unit_price = float(it.get("unit_price", 0.0) or 0.0)
-        except (TypeError, ValueError):
-            unit_price = 0.0
-        orig_total_val = it.get("original_total")
         orig_unit_val = it.get("original_unit_price")
-        orig_total: float | None = None
+        orig_total_val = it.get("original_total")
+        orig_total: int | None = None
         if orig_unit_val is not None:
             try:
-                orig_unit = float(orig_unit_val)
-                orig_total = orig_unit * qty
+                orig_total = to_cents(float(orig_unit_val) * qty)
             except (TypeError, ValueError):
                 orig_total = None
         if orig_total is None and orig_total_val is not None:
-            try:
-                orig_total = float(orig_total_val)
-            except (TypeError, ValueError):
-                orig_total = None
+            orig_total = _safe_cents(orig_total_val, None)
         if orig_total is None:
-            try:
-                current_total = float(it.get("total", unit_price * qty) or (unit_price * qty))
-            except (TypeError, ValueError):
-                current_total = unit_price * qty
-            orig_total = current_total
-        total += float(orig_total)
-    return total
+            unit_price = _safe_cents(it.get("unit_price", 0.0) or 0.0, 0)
+            fallback = to_cents(from_cents(unit_price) * qty)
+            orig_total = _safe_cents(it.get("total", fallback) or fallback, fallback)
+        total += orig_total
+    return from_cents(total)
 
 
 def prepare_display_items(payload: Mapping) -> tuple[list[Mapping], float]:
@@ -92,6 +81,13 @@ def _safe_float(value, default: float) -> float:
         return float(default)
 
 
+def _safe_cents(value, default: int | None) -> int | None:
+    try:
+        return to_cents(value)
+    except (TypeError, ValueError, ArithmeticError):
+        return default
+
+
 @dataclass(frozen=True)
 class TotalsContext:
     vat_rate: float
@@ -104,15 +100,19 @@ class TotalsContext:
 def derive_totals(totals: Mapping, recomputed_original_extras: float) -> TotalsContext:
     totals = totals or {}
     vat_rate = _safe_float(totals.get("vat_rate", 0.23), 0.0)
-    vat_value = _safe_float(totals.get("vat", 0.0), 0.0)
-    total_no_vat = _safe_float(totals.get("total_no_vat", 0.0), 0.0)
-    total_with_vat_default = total_no_vat * (1 + vat_rate)
-    total_with_vat = _safe_float(totals.get("total_with_vat", total_with_vat_default), total_with_vat_default)
-    original_services_total = _safe_float(totals.get("original_services_total", recomputed_original_extras), recomputed_original_extras)
+    vat_value = _safe_cents(totals.get("vat", 0.0), 0)
+    total_no_vat = _safe_cents(totals.get("total_no_vat", 0.0), 0)
+    try:
+        default_vat = apply_rate(total_no_vat, rate_units(vat_rate))
+    except (TypeError, ValueError, ArithmeticError):
+        default_vat = 0
+    total_with_vat = _safe_cents(totals.get("total_with_vat", None), total_no_vat + default_vat)
+    original_default = _safe_cents(recomputed_original_extras, 0)
+    original_services_total = _safe_cents(totals.get("original_services_total", recomputed_original_extras), original_default)
     return TotalsContext(
         vat_rate=vat_rate,
-        vat_value=vat_value,
-        total_no_vat=total_no_vat,
-        total_with_vat=total_with_vat,
-        original_services_total=original_services_total,
+        vat_value=from_cents(vat_value),
+        total_no_vat=from_cents(total_no_vat),
+        total_with_vat=from_cents(total_with_vat),
+        original_services_total=from_cents(original_services_total),
     )
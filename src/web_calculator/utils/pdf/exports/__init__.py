@@ -1,3 +1,6 @@
+from web_calculator.utils.pdf.exports.bundle import export_bundle_pdf, export_bundle_pdfs  # noqa: F401
+from web_calculator.utils.pdf.exports.catalog import export_catalog_pdf  # noqa: F401
 from web_calculator.utils.pdf.exports.invoice import export_invoice_pdf  # noqa: F401
 from web_calculator.utils.pdf.exports.proforma import export_proforma_pdf  # noqa: F401
 from web_calculator.utils.pdf.exports.quote import export_quote_pdf  # noqa: F401
+from web_calculator.utils.pdf.exports.status import export_payment_status  # noqa: F401
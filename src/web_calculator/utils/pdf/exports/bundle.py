@@ -0,0 +1,27 @@
+from pathlib import Path
+from typing import Iterable, Mapping, Sequence
+
+from web_calculator.utils.pdf.renderers.pdf_renderer import render_bundle, render_many
+
+
+def export_bundle_pdf(
+    path: Path,
+    payloads: Sequence[Mapping],
+    titles: Sequence[str] | None = None,
+    linearize: bool = False,
+    object_streams: bool = False,
+) -> None:
+    """
+    Export viacerych dokumentov (napr. ponuka + predfaktura + faktura) do jedneho PDF
+    so spolocnymi fontami a zalozkami na kazdy dokument.
+    `linearize=True` pre subory stahovane z portalu (prva strana sa zobrazi hned),
+    `object_streams=True` pre mensi subor (PDF 1.5).
+    """
+    render_bundle(path, payloads, titles, linearize=linearize, object_streams=object_streams)
+
+
+def export_bundle_pdfs(jobs: Iterable[tuple[Path, Mapping]]) -> None:
+    """
+    Export sady samostatnych PDF (napr. mesacne faktury) s jednym nacitanim fontov.
+    """
+    render_many(jobs)
@@ -0,0 +1,12 @@
+from pathlib import Path
+from typing import Any
+
+from web_calculator.utils.pdf.renderers.catalog_renderer import render_catalog
+
+
+def export_catalog_pdf(path: Path, catalog: Any, title: str = "Cennik sluzieb", subtitle: str = "") -> int:
+    """
+    Export celeho cennika (`catalog.packages` + `catalog.services`) pre klienta.
+    Strany sa streamuju na disk, pamat nerastie s poctom sluzieb; vrati pocet stran.
+    """
+    return render_catalog(path, catalog.packages, catalog.services, title=title, subtitle=subtitle)
@@ -0,0 +1,13 @@
+from pathlib import Path
+
+from web_calculator.utils.pdf.core.output import write_bytes_atomic
+from web_calculator.utils.pdf.renderers.pdf_renderer import stamp_payment_status
+
+
+def export_payment_status(path: Path, status: str = "Zaplatene", page_index: int = 0) -> None:
+    """
+    Zmena stavu platby v existujucom PDF (napr. faktura zaplatena) bez noveho renderu.
+    K suboru sa pripoji inkrementalna aktualizacia; povodny obsah ostava v subore.
+    """
+    path = Path(path)
+    write_bytes_atomic(path, stamp_payment_status(path.read_bytes(), status, page_index))
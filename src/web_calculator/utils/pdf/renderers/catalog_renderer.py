@@ -0,0 +1,100 @@
+"""
+Cennik (vsetky baliky a sluzby) ako PDF so stovkami stran.
+
+Strany sa skladaju po jednej a hned zapisuju cez `PdfPageWriter`, takze pamat nezavisi
+od poctu poloziek (drzi sa len aktualna strana a offsety objektov).
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Iterable
+
+from web_calculator.utils.pdf.core import fonts, telemetry
+from web_calculator.utils.pdf.core.builder import PdfPageWriter
+from web_calculator.utils.pdf.core.content_stream import ContentStream
+from web_calculator.utils.pdf.core.layout_common import CARD_W, COLORS, PAGE_H, PAGE_W
+from web_calculator.utils.pdf.core.output import open_atomic
+from web_calculator.utils.pdf.renderers.pdf_renderer import _RENDER_LOCK
+from web_calculator.utils.pdf.sections.catalog_table import (
+    CATALOG_HEADER_HEIGHT,
+    CATALOG_ROW_HEIGHT,
+    GROUP_HEADER_HEIGHT,
+    iter_catalog_groups,
+    layout_catalog_row,
+    render_catalog_group,
+    render_catalog_header,
+    render_catalog_row,
+)
+
+TABLE_X = 48
+TABLE_W = CARD_W - 32
+TABLE_TOP = PAGE_H - 64
+TABLE_BOTTOM = 48
+
+
+def render_catalog(
+    path: Path,
+    packages: Iterable[Any],
+    services: Iterable[Any],
+    title: str = "Cennik sluzieb",
+    subtitle: str = "",
+) -> int:
+    """
+    Vyrenderuje cennik: baliky, potom sluzby zoskupene podla `source` (zalozka na kazdu skupinu).
+    Vysledok sa zapisuje atomicky; vrati pocet stran.
+    """
+    with telemetry.render_scope("render_catalog"), _RENDER_LOCK:
+        with telemetry.stage("fonts"):
+            fonts.load_font_map()
+        try:
+            with open_atomic(path) as fh:
+                writer = PdfPageWriter(fh, page_size=(PAGE_W, PAGE_H))
+                with telemetry.stage("table"):
+                    _write_catalog_pages(writer, packages, services, title, subtitle)
+                with telemetry.stage("write"):
+                    writer.close()
+                return writer.page_count
+        finally:
+            fonts.clear_font_map()
+
+
+def _write_catalog_pages(
+    writer: PdfPageWriter, packages: Iterable[Any], services: Iterable[Any], title: str, subtitle: str
+) -> None:
+    dark = COLORS["dark"]
+    light = COLORS["light"]
+    row_alt = COLORS["row_alt"]
+    page: ContentStream | None = None
+    top = 0.0
+
+    def start_page() -> ContentStream:
+        nonlocal top
+        if page is not None:
+            writer.add_page(page.getvalue())
+        out = ContentStream()
+        out.text(title, TABLE_X, PAGE_H - 40, "/F2", 14)
+        if subtitle:
+            out.text(subtitle, TABLE_X + 300, PAGE_H - 40, "/F1", 9)
+        out.text(f"Strana {writer.page_count + 1}", TABLE_X + TABLE_W - 50, 28, "/F1", 8)
+        top = TABLE_TOP
+        return out
+
+    for group_title, rows in iter_catalog_groups(packages, services):
+        # skupina zacina na novej strane, ak sa pod jej hlavicku nezmesti aspon jeden riadok
+        if page is None or top - GROUP_HEADER_HEIGHT - CATALOG_HEADER_HEIGHT - CATALOG_ROW_HEIGHT < TABLE_BOTTOM:
+            page = start_page()
+        writer.add_outline(group_title)
+        top = render_catalog_group(page, group_title, TABLE_X, top, TABLE_W, light)
+        top = render_catalog_header(page, TABLE_X, top, TABLE_W, dark)
+        for idx, cells in enumerate(rows):
+            lines, height = layout_catalog_row(cells)
+            if top - height < TABLE_BOTTOM:
+                page = start_page()
+                top = render_catalog_header(page, TABLE_X, top, TABLE_W, dark)
+            top = render_catalog_row(page, lines, TABLE_X, top, TABLE_W, height, row_alt if idx % 2 == 0 else None)
+
+    if page is None:
+        page = start_page()
+        page.text("Cennik je prazdny.", TABLE_X, TABLE_TOP - 20, "/F1", 10)
+    writer.add_page(page.getvalue())
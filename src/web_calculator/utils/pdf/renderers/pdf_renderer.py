@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import io
+import tempfile
+import threading
 from pathlib import Path
-from typing import Mapping
+from typing import BinaryIO, Iterable, Mapping, Sequence
 
-from web_calculator.utils.pdf.core import fonts, legacy
-from web_calculator.utils.pdf.core.builder import build_pdf_bytes
-from web_calculator.utils.pdf.core.drawing import _draw_rect, _draw_text
+from web_calculator.utils.pdf.core import fonts, incremental, legacy, render_cache, telemetry
+from web_calculator.utils.pdf.core.builder import write_pdf
+from web_calculator.utils.pdf.core.content_stream import ContentStream
 from web_calculator.utils.pdf.core.layout_common import (
     CARD_H,
     CARD_TOP,
@@ -22,32 +25,288 @@ from web_calculator.utils.pdf.core.layout_common import (
     SECTION_HEADER_SIZE,
     SECTION_HEIGHT,
     TABLE_HEADER_HEIGHT,
-    TABLE_ROW_HEIGHT,
 )
+from web_calculator.utils.pdf.core.output import copy_file_atomic, open_atomic, write_bytes_atomic
 from web_calculator.utils.pdf.core.totals import derive_totals, prepare_display_items
 from web_calculator.utils.pdf.sections.supplier import render_supplier, build_supplier_lines
 from web_calculator.utils.pdf.sections.client import render_client, build_client_lines
-from web_calculator.utils.pdf.sections.payment import render_payment, build_payment_lines
+from web_calculator.utils.pdf.sections.payment import (
+    STATUS_PREFIX,
+    build_payment_lines,
+    read_status_line_index,
+    render_payment,
+    render_payment_status,
+)
 from web_calculator.utils.pdf.sections.summary import render_summary, build_summary_lines
 from web_calculator.utils.pdf.sections.items_table import render_items_table
 from web_calculator.utils.qr import make_qr_matrix
 
+# Fonty su globalny stav modulu `fonts`; render z viacerych vlakien (export na pozadi) sa serializuje.
+_RENDER_LOCK = threading.RLock()
+
 
-def render_pdf(path: Path, payload: Mapping) -> None:
+def render_pdf(
+    path: Path,
+    payload: Mapping,
+    use_cache: bool | None = None,
+    linearize: bool = False,
+    object_streams: bool = False,
+) -> None:
     """
     High-level renderer. Preferuje novy modul; pri chybe fallback na legacy.
+    Vysledok sa streamuje priamo do docasneho suboru a atomicky premenuje (fonty sa
+    zapisuju z mmap bez kopie); cache hit sa kopiruje po blokoch.
+    """
+    with telemetry.render_scope("render_pdf") as record:
+        with telemetry.stage("cache"):
+            cache, key = _cache_for(payload, use_cache, linearize, object_streams)
+            cached = cache.get_path(key) if cache is not None else None
+            if cached is not None:
+                try:
+                    copy_file_atomic(cached, path)
+                except OSError:
+                    pass  # subor medzitym vyradil `evict` (iny export/proces) -> normalny render
+                else:
+                    record.cache_hit = True
+                    record.total_bytes = Path(path).stat().st_size
+                    return
+        with _RENDER_LOCK:
+            try:
+                with open_atomic(path) as fh:
+                    _write_new(fh, payload, linearize=linearize, object_streams=object_streams)
+            except Exception as exc:
+                # Bezpecny fallback na legacy export (necachuje sa)
+                data = _fallback_legacy(payload, exc)
+                write_bytes_atomic(path, data)
+                return
+        if cache is not None:
+            with telemetry.stage("cache"):
+                cache.put_file(key, path)
+
+
+def render_pdf_bytes(
+    payload: Mapping, use_cache: bool | None = None, linearize: bool = False, object_streams: bool = False
+) -> bytes:
+    """
+    Render payload to PDF bytes without touching the target file.
+    Identicky payload (a fonty) sa servuje z `render_cache`; `use_cache=False` ho obide.
+    `linearize=True` = linearizovane PDF pre web portal (prva strana sa zobrazi pocas stahovania),
+    `object_streams=True` = kompaktnejsie PDF 1.5 (object streams + xref stream).
+    """
+    with telemetry.render_scope("render_pdf_bytes") as record:
+        with telemetry.stage("cache"):
+            cache, key = _cache_for(payload, use_cache, linearize, object_streams)
+            cached = cache.get(key) if cache is not None else None
+            if cached is not None:
+                record.cache_hit = True
+                record.total_bytes = len(cached)
+                return cached
+        with _RENDER_LOCK:
+            try:
+                data = _render_new(payload, linearize=linearize, object_streams=object_streams)
+            except Exception as exc:
+                # Bezpecny fallback na legacy export (necachuje sa)
+                return _fallback_legacy(payload, exc)
+        if cache is not None:
+            with telemetry.stage("cache"):
+                cache.put(key, data)
+        return data
+
+
+def _cache_for(
+    payload: Mapping, use_cache: bool | None, linearize: bool, object_streams: bool
+) -> tuple[render_cache.RenderCache | None, str]:
+    if not render_cache.cache_enabled(use_cache):
+        return None, ""
+    mode = (":linearized" if linearize else "") + (":objstm" if object_streams else "")
+    return render_cache.default_cache(), render_cache.cache_key(payload, fonts.font_fingerprint() + mode)
+
+
+def _fallback_legacy(payload: Mapping, exc: Exception) -> bytes:
+    """Legacy render po chybe noveho renderera; chyba a cas idu do telemetrie (nie je ticha)."""
+    telemetry.mark_fallback(exc)
+    with telemetry.stage("legacy"):
+        data = _render_legacy(payload)
+    record = telemetry.current()
+    if record is not None:
+        record.total_bytes = len(data)
+    return data
+
+
+def _render_legacy(payload: Mapping) -> bytes:
+    with tempfile.TemporaryDirectory(prefix="web_calculator_pdf_") as tmp_dir:
+        tmp_path = Path(tmp_dir) / "legacy.pdf"
+        legacy.export_simple_pdf(tmp_path, payload)
+        return tmp_path.read_bytes()
+
+
+def render_bundle(
+    path: Path,
+    payloads: Sequence[Mapping],
+    titles: Sequence[str] | None = None,
+    linearize: bool = False,
+    object_streams: bool = False,
+) -> None:
+    """
+    Vyrenderuje viac dokumentov do jedneho PDF.
+
+    Fonty sa nacitaju a vlozia iba raz (spolocny /Resources objekt pre vsetky strany),
+    strany dokumentov nasleduju za sebou a pre kazdy dokument sa vytvori zalozka.
     """
+    payloads = list(payloads)
+    if not payloads:
+        raise ValueError("Bundle needs at least one payload")
+    with telemetry.render_scope("render_bundle"), _RENDER_LOCK, open_atomic(path) as fh:
+        _write_bundle(fh, payloads, titles, linearize, object_streams)
+
+
+def _render_bundle_bytes(
+    payloads: Sequence[Mapping], titles: Sequence[str] | None, linearize: bool = False, object_streams: bool = False
+) -> bytes:
+    buf = io.BytesIO()
+    _write_bundle(buf, payloads, titles, linearize, object_streams)
+    return buf.getvalue()
+
+
+def _write_bundle(
+    fh: BinaryIO,
+    payloads: Sequence[Mapping],
+    titles: Sequence[str] | None,
+    linearize: bool = False,
+    object_streams: bool = False,
+) -> None:
+    with telemetry.stage("fonts"):
+        fonts.load_font_map()
     try:
-        _render_new(path, payload)
-    except Exception:
-        # Bezpecny fallback na legacy export
-        legacy.export_simple_pdf(path, payload)
+        content_streams: list[bytes] = []
+        outlines: list[tuple[str, int]] = []
+        for idx, payload in enumerate(payloads):
+            title = titles[idx] if titles and idx < len(titles) else _default_outline_title(payload)
+            outlines.append((title, len(content_streams)))
+            content_streams.extend(_build_content_streams(payload))
+        write_pdf(
+            fh,
+            content_streams,
+            page_size=(PAGE_W, PAGE_H),
+            outlines=outlines,
+            linearize=linearize,
+            object_streams=object_streams,
+        )
+    finally:
+        fonts.clear_font_map()
+
+
+def render_many(jobs: Iterable[tuple[Path, Mapping]]) -> None:
+    """
+    Vyrenderuje sadu samostatnych PDF s jednym nacitanim fontov.
+    Pri chybe noveho renderera sa pre dany dokument pouzije legacy fallback.
+    """
+    with _RENDER_LOCK:
+        fonts.load_font_map()
+        try:
+            for path, payload in jobs:
+                fonts.reset_font_usage()
+                with telemetry.render_scope("render_many"):
+                    try:
+                        content_streams = _build_content_streams(payload)
+                        with open_atomic(path) as fh:
+                            write_pdf(fh, content_streams, page_size=(PAGE_W, PAGE_H))
+                    except Exception as exc:
+                        write_bytes_atomic(path, _fallback_legacy(payload, exc))
+        finally:
+            fonts.clear_font_map()
+
 
+def _default_outline_title(payload: Mapping) -> str:
+    title = str(payload.get("doc_title", "Cenova ponuka") or "Dokument")
+    invoice_no = str(payload.get("invoice_no", "") or "")
+    return f"{title} c. {invoice_no}" if invoice_no else title
 
-def _render_new(path: Path, invoice_payload: Mapping) -> None:
+
+def _render_new(invoice_payload: Mapping, linearize: bool = False, object_streams: bool = False) -> bytes:
+    buf = io.BytesIO()
+    _write_new(buf, invoice_payload, linearize=linearize, object_streams=object_streams)
+    return buf.getvalue()
+
+
+def _write_new(fh: BinaryIO, invoice_payload: Mapping, linearize: bool = False, object_streams: bool = False) -> None:
     # fonty
-    fonts.load_font_map()
+    with telemetry.stage("fonts"):
+        fonts.load_font_map()
+    try:
+        content_streams = _build_content_streams(invoice_payload)
+        write_pdf(fh, content_streams, page_size=(PAGE_W, PAGE_H), linearize=linearize, object_streams=object_streams)
+    finally:
+        fonts.clear_font_map()
+
+
+def _payment_origin() -> tuple[int, int]:
+    """Lavy dolny roh sekcie platby na prvej strane (pravy stlpec vedla dodavatela)."""
+    header_y = CARD_TOP - 18
+    return CARD_X + 16 + COL_WIDTH + COL_GAP, header_y - 30 - SECTION_HEIGHT
+
+
+def stamp_payment_status(pdf_bytes: bytes, status: str, page_index: int = 0) -> bytes:
+    """
+    Zmeni stav platby v uz vygenerovanom PDF inkrementalnou aktualizaciou.
+    Povodne bajty zostanu nezmenene (audit); pripoji sa overlay stream, upravena strana
+    a pri Unicode fontoch nahradne CIDFont objekty, ktorych /W pokryva aj glyfy pecatky.
+    """
+    # xref stream a chybajuci riadok stavu sa odmietnu skor, nez sa riesia fonty
+    xref = incremental.read_xref(pdf_bytes)
+    line_index = read_status_line_index(incremental.page_content(pdf_bytes, page_index, xref))
+    if line_index is None:
+        raise ValueError("PDF nema oznaceny riadok stavu platby; pecatku nie je mozne pridat")
+    x, y = _payment_origin()
+    type1 = incremental.uses_type1_fonts(pdf_bytes)
+    with _RENDER_LOCK:
+        if type1:
+            fonts.set_font_map({})
+        else:
+            fonts.load_font_map()
+            if not fonts.get_font_map():
+                raise ValueError("PDF pouziva Unicode fonty, ktore nie su v tomto systeme dostupne")
+        overlay = ContentStream()
+        try:
+            render_payment_status(
+                overlay,
+                f"{STATUS_PREFIX}{status}",
+                x,
+                y,
+                COL_WIDTH,
+                SECTION_HEIGHT,
+                SECTION_BODY_SIZE,
+                COLORS["light"],
+                line_index,
+            )
+            font_updates = {} if type1 else _stamp_font_updates(pdf_bytes, page_index, xref)
+        finally:
+            fonts.clear_font_map()
+    return incremental.append_page_content(pdf_bytes, page_index, overlay.getvalue(), extra_objects=font_updates)
+
+
+def _stamp_font_updates(pdf_bytes: bytes, page_index: int, xref: incremental.XrefInfo) -> dict[int, bytes]:
+    """
+    Nahradne CIDFont objekty pre glyfy pecatky, ktore povodna /W tabulka nema (inak by mali
+    sirku /DW). Font suboru musi byt ten isty ako nacitany, inak by sirky aj glyfy nesedeli.
+    """
+    cid_fonts = incremental.page_cid_fonts(pdf_bytes, page_index, xref)
+    updates: dict[int, bytes] = {}
+    for name, font in fonts.get_font_map().items():
+        cid_id = cid_fonts.get(name)
+        if cid_id is None:
+            raise ValueError(f"PDF nema Unicode font {name}; pecatku nie je mozne pridat")
+        body = incremental.object_body(pdf_bytes, xref, cid_id)
+        if fonts.embedded_font_digest(body) != font.digest:
+            raise ValueError("PDF bol vytvoreny s inym fontom, nez je dostupny teraz; pecatku nie je mozne pridat")
+        replacement = fonts.extend_cid_widths(body, font, font.used_gids)
+        if replacement is not None:
+            updates[cid_id] = replacement
+    return updates
 
+
+def _build_content_streams(invoice_payload: Mapping) -> list[bytes]:
+    """Build page content streams for one document; fonts must already be loaded."""
     # farby
     dark = COLORS["dark"]
     light = COLORS["light"]
@@ -61,89 +320,81 @@ def _render_new(path: Path, invoice_payload: Mapping) -> None:
     client = invoice_payload.get("client", {})
     totals = invoice_payload.get("totals", {})
     qr_data = invoice_payload.get("qr_data") or invoice_no
-    qr_matrix = make_qr_matrix(qr_data) if qr_data else None
+    with telemetry.stage("qr"):
+        qr_matrix = make_qr_matrix(qr_data) if qr_data else None
 
-    display_items, recomputed_original_extras = prepare_display_items(invoice_payload)
+    with telemetry.stage("sections"):
+        display_items, recomputed_original_extras = prepare_display_items(invoice_payload)
 
-    totals_ctx = derive_totals(totals, recomputed_original_extras)
+        totals_ctx = derive_totals(totals, recomputed_original_extras)
 
-    supplier_lines = invoice_payload.get("supplier_lines_override") or build_supplier_lines(supplier)
-    client_lines = invoice_payload.get("client_lines_override") or build_client_lines(client)
-    payment_lines = invoice_payload.get("payment_lines_override") or build_payment_lines(invoice_payload, invoice_no, issue_date)
-    summary_lines = invoice_payload.get("summary_lines_override") or build_summary_lines(totals_ctx)
-    vat_rate = totals_ctx.vat_rate
+        supplier_lines = invoice_payload.get("supplier_lines_override") or build_supplier_lines(supplier)
+        client_lines = invoice_payload.get("client_lines_override") or build_client_lines(client)
+        payment_lines = invoice_payload.get("payment_lines_override") or build_payment_lines(invoice_payload, invoice_no, issue_date)
+        summary_lines = invoice_payload.get("summary_lines_override") or build_summary_lines(totals_ctx)
+        vat_rate = totals_ctx.vat_rate
 
-    content_parts: list[str] = []
+        out = ContentStream()
 
-    # Background card
-    content_parts.append(f"{light} rg {border} RG ")
-    content_parts.append(_draw_rect(CARD_X, CARD_Y, CARD_W, CARD_H, stroke=True, fill=True))
-    content_parts.append("0 0 0 rg 0 0 0 RG ")
+        # Background card
+        out.colors(light, border)
+        out.rect(CARD_X, CARD_Y, CARD_W, CARD_H, stroke=True, fill=True)
+        out.reset_colors()
 
-    # Header
-    header_y = CARD_TOP - 18
-    content_parts.append(_draw_text([f"{title} c. {invoice_no}"], CARD_X + 16, header_y, "/F2", 18))
-    content_parts.append(_draw_text([f"Dátum vystavenia: {issue_date}"], CARD_X + 16, header_y - 20, "/F1", 11))
-
-    # Geometry
-    left_x = CARD_X + 16
-    right_x = left_x + COL_WIDTH + COL_GAP
-
-    # Supplier
-    supplier_y = header_y - 30 - SECTION_HEIGHT
-    content_parts.append(render_supplier(supplier_lines, left_x, supplier_y, COL_WIDTH, SECTION_HEIGHT, SECTION_HEADER_SIZE, SECTION_BODY_SIZE))
-
-    # Client
-    client_y = supplier_y - SECTION_GAP - SECTION_HEIGHT
-    content_parts.append(render_client(client_lines, left_x, client_y, COL_WIDTH, SECTION_HEIGHT, SECTION_HEADER_SIZE, SECTION_BODY_SIZE))
-
-    # Payment
-    payment_y = supplier_y
-    content_parts.append(render_payment(payment_lines, right_x, payment_y, COL_WIDTH, SECTION_HEIGHT, SECTION_HEADER_SIZE, SECTION_BODY_SIZE, qr_matrix, qr_data))
-
-    # Summary
-    summary_y = client_y
-    content_parts.append(render_summary(summary_lines, right_x, summary_y, COL_WIDTH, SECTION_HEIGHT, SECTION_HEADER_SIZE, SECTION_BODY_SIZE))
-
-    # Table
-    table_header_y = client_y - 40
-    table_x = left_x
-    table_w = CARD_W - 32
-    content_parts.append(f"{dark} rg {dark} RG ")
-    content_parts.append(_draw_rect(table_x, table_header_y, table_w, TABLE_HEADER_HEIGHT, stroke=True, fill=True))
-    content_parts.append("1 1 1 rg 1 1 1 RG ")
-    col_x = [table_x + 10, table_x + 220, table_x + 320, table_x + 420]
-    headers = ["Názov", "Množstvo", "bez DPH", "s DPH"]
-    for hx, text in zip(col_x, headers):
-        content_parts.append(_draw_text([text], hx, table_header_y + 20, "/F2", 10))
-
-    row_y = table_header_y - 26
-    min_y = CARD_Y + 36
-    table_content, overflow = render_items_table(display_items, table_x, table_header_y, table_w, dark, row_alt, vat_rate, min_y)
-    content_parts.extend(table_content)
-
-    # Extra pages for overflow
-    content_streams = ["".join(content_parts)]
-    while overflow:
-        extra = overflow
-        overflow = []
-        row_y = PAGE_H - 80
-        available_rows_page = max(1, int((row_y - 60) / TABLE_ROW_HEIGHT))
-        if len(extra) > available_rows_page:
-            overflow = extra[available_rows_page - 1 :]
-            extra = extra[: available_rows_page - 1]
-        content_page: list[str] = []
-        content_page.append(_draw_text(["Dalsie polozky"], left_x + 16, PAGE_H - 36, "/F2", 12))
-        content_page.append(f"{dark} rg {dark} RG ")
-        content_page.append(_draw_rect(table_x, row_y, table_w, TABLE_HEADER_HEIGHT, stroke=True, fill=True))
-        content_page.append("1 1 1 rg 1 1 1 RG ")
+        # Header
+        header_y = CARD_TOP - 18
+        out.text(f"{title} c. {invoice_no}", CARD_X + 16, header_y, "/F2", 18)
+        out.text(f"Dátum vystavenia: {issue_date}", CARD_X + 16, header_y - 20, "/F1", 11)
+
+        # Geometry
+        left_x = CARD_X + 16
+        right_x = left_x + COL_WIDTH + COL_GAP
+
+        # Supplier
+        supplier_y = header_y - 30 - SECTION_HEIGHT
+        render_supplier(out, supplier_lines, left_x, supplier_y, COL_WIDTH, SECTION_HEIGHT, SECTION_HEADER_SIZE, SECTION_BODY_SIZE)
+
+        # Client
+        client_y = supplier_y - SECTION_GAP - SECTION_HEIGHT
+        render_client(out, client_lines, left_x, client_y, COL_WIDTH, SECTION_HEIGHT, SECTION_HEADER_SIZE, SECTION_BODY_SIZE)
+
+        # Payment
+        payment_x, payment_y = _payment_origin()
+        render_payment(out, payment_lines, payment_x, payment_y, COL_WIDTH, SECTION_HEIGHT, SECTION_HEADER_SIZE, SECTION_BODY_SIZE, qr_matrix, qr_data)
+
+        # Summary
+        summary_y = client_y
+        render_summary(out, summary_lines, right_x, summary_y, COL_WIDTH, SECTION_HEIGHT, SECTION_HEADER_SIZE, SECTION_BODY_SIZE)
+
+    with telemetry.stage("table"):
+        # Table
+        table_header_y = client_y - 40
+        table_x = left_x
+        table_w = CARD_W - 32
+        out.colors(dark)
+        out.rect(table_x, table_header_y, table_w, TABLE_HEADER_HEIGHT, stroke=True, fill=True)
+        out.colors("1 1 1")
+        col_x = [table_x + 10, table_x + 220, table_x + 320, table_x + 420]
+        headers = ["Názov", "Množstvo", "bez DPH", "s DPH"]
         for hx, text in zip(col_x, headers):
-            content_page.append(_draw_text([text], hx, row_y + 20, "/F2", 10))
-        row_y -= 26
-        extra_content, overflow = render_items_table(extra, table_x, row_y + 26, table_w, dark, row_alt, vat_rate, min_y=60)
-        content_page.extend(extra_content)
-        content_streams.append("".join(content_page))
-
-    pdf_bytes = build_pdf_bytes(content_streams, page_size=(PAGE_W, PAGE_H))
-    path.write_bytes(pdf_bytes)
-    fonts.clear_font_map()
+            out.text(text, hx, table_header_y + 20, "/F2", 10)
+
+        min_y = CARD_Y + 36
+        overflow = render_items_table(out, display_items, table_x, table_header_y, table_w, dark, row_alt, vat_rate, min_y)
+
+        # Extra pages for overflow
+        content_streams = [out.getvalue()]
+        # Strankovanie podla skutocnej vysky riadkov (zalomene nazvy) robi render_items_table
+        while overflow:
+            row_y = PAGE_H - 80
+            page = ContentStream()
+            page.text("Dalsie polozky", left_x + 16, PAGE_H - 36, "/F2", 12)
+            page.colors(dark)
+            page.rect(table_x, row_y, table_w, TABLE_HEADER_HEIGHT, stroke=True, fill=True)
+            page.colors("1 1 1")
+            for hx, text in zip(col_x, headers):
+                page.text(text, hx, row_y + 20, "/F2", 10)
+            overflow = render_items_table(page, overflow, table_x, row_y, table_w, dark, row_alt, vat_rate, min_y=60)
+            content_streams.append(page.getvalue())
+
+    return content_streams
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator, Sequence
+
+from web_calculator.utils.pdf.core.content_stream import ContentStream
+from web_calculator.utils.pdf.core.text_metrics import fit_text, wrap_text
+from web_calculator.utils.pdf.core.totals import format_currency
+
+CATALOG_HEADERS = ("Kod", "Nazov", "Cena", "Cena 2", "Tag", "Info")
+# (offset od laveho okraja tabulky, sirka) pre kazdy stlpec
+CATALOG_COLUMNS = ((6, 64), (74, 170), (248, 56), (308, 56), (368, 44), (416, 80))
+# Stlpce, ktore sa zalamuju (nazov, info); ostatne sa skracuju s "..."
+WRAPPED_COLUMNS = (1, 5)
+CATALOG_FONT_SIZE = 8
+CATALOG_ROW_HEIGHT = 16
+CATALOG_LEADING = 9
+CATALOG_MAX_LINES = 2
+CATALOG_HEADER_HEIGHT = 18
+GROUP_HEADER_HEIGHT = 22
+
+
+def _price(value: Any) -> str:
+    try:
+        number = float(value or 0.0)
+    except (TypeError, ValueError):
+        return "-"
+    return format_currency(number) if number else "-"
+
+
+def package_row(package: Any) -> tuple[str, ...]:
+    return (
+        str(package.code),
+        str(package.name),
+        _price(package.base_price),
+        _price(package.promo_price),
+        "Balik",
+        str(package.description or package.note or ""),
+    )
+
+
+def service_row(service: Any) -> tuple[str, ...]:
+    return (
+        str(service.code),
+        str(service.label),
+        _price(service.price),
+        _price(service.price2),
+        str(service.tag or ""),
+        str(service.info or ""),
+    )
+
+
+def iter_catalog_groups(packages: Iterable[Any], services: Iterable[Any]) -> Iterator[tuple[str, Iterator[tuple[str, ...]]]]:
+    """Skupiny (titulok, riadky): najprv baliky, potom sluzby podla `source` v poradi prveho vyskytu."""
+    packages = list(packages)
+    if packages:
+        yield "Baliky", (package_row(p) for p in packages)
+    by_source: dict[str, list[Any]] = {}
+    for service in services:
+        by_source.setdefault(str(service.source or "Ostatne"), []).append(service)
+    for source, grouped in by_source.items():
+        yield f"Sluzby - {source}", (service_row(s) for s in grouped)
+
+
+def layout_catalog_row(cells: Sequence[str]) -> tuple[list[list[str]], int]:
+    """Riadky textu pre kazdu bunku a vyska riadku tabulky (podla najvyssej bunky)."""
+    lines: list[list[str]] = []
+    for idx, (cell, (_, width)) in enumerate(zip(cells, CATALOG_COLUMNS)):
+        if idx in WRAPPED_COLUMNS:
+            lines.append(wrap_text(cell, "/F1", CATALOG_FONT_SIZE, width - 4, CATALOG_MAX_LINES))
+        else:
+            lines.append([fit_text(cell, "/F1", CATALOG_FONT_SIZE, width - 4)])
+    tallest = max(len(cell_lines) for cell_lines in lines)
+    return lines, CATALOG_ROW_HEIGHT + (tallest - 1) * CATALOG_LEADING
+
+
+def render_catalog_group(out: ContentStream, title: str, x: int, top: float, w: int, background: str) -> float:
+    out.colors(background)
+    out.rect(x, top - GROUP_HEADER_HEIGHT, w, GROUP_HEADER_HEIGHT, stroke=False, fill=True)
+    out.reset_colors()
+    out.text(title, x + 6, top - GROUP_HEADER_HEIGHT + 7, "/F2", 11)
+    return top - GROUP_HEADER_HEIGHT
+
+
+def render_catalog_header(out: ContentStream, x: int, top: float, w: int, header_bg: str) -> float:
+    out.colors(header_bg)
+    out.rect(x, top - CATALOG_HEADER_HEIGHT, w, CATALOG_HEADER_HEIGHT, stroke=True, fill=True)
+    out.colors("1 1 1")
+    for (offset, _), text in zip(CATALOG_COLUMNS, CATALOG_HEADERS):
+        out.text(text, x + offset, top - CATALOG_HEADER_HEIGHT + 6, "/F2", CATALOG_FONT_SIZE)
+    out.reset_colors()
+    return top - CATALOG_HEADER_HEIGHT
+
+
+def render_catalog_row(
+    out: ContentStream, lines: Sequence[Sequence[str]], x: int, top: float, w: int, h: int, row_bg: str | None = None
+) -> float:
+    bottom = top - h
+    if row_bg:
+        out.fill_color(row_bg)
+        out.rect(x, bottom, w, h, stroke=False, fill=True)
+        out.reset_colors()
+    first_baseline = top - CATALOG_ROW_HEIGHT + 5
+    for (offset, _), cell_lines in zip(CATALOG_COLUMNS, lines):
+        out.text_lines(cell_lines, x + offset, first_baseline, "/F1", CATALOG_FONT_SIZE, leading=CATALOG_LEADING)
+    return bottom
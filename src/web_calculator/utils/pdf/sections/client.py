@@ -3,15 +3,18 @@ from __future__ import annotations
 from textwrap import wrap
 from typing import Iterable
 
-from web_calculator.utils.pdf.core.drawing import _draw_rect, _draw_text
+from web_calculator.utils.pdf.core.content_stream import ContentStream
+from web_calculator.utils.pdf.core.text_metrics import wrap_text
 
 
-def render_client(client_lines: Iterable[str], x: int, y: int, w: int, h: int, header_size: int, body_size: int) -> str:
-    parts: list[str] = []
-    parts.append(_draw_rect(x, y, w, h, stroke=True, fill=False))
-    parts.append(_draw_text(["Odberatel"], x + 12, y + h - 16, "/F2", header_size, leading=header_size + 1))
-    parts.append(_draw_text(client_lines, x + 12, y + h - 32, "/F1", body_size, leading=body_size + 2))
-    return "".join(parts)
+def render_client(
+    out: ContentStream, client_lines: Iterable[str], x: int, y: int, w: int, h: int, header_size: int, body_size: int
+) -> None:
+    out.rect(x, y, w, h, stroke=True, fill=False)
+    out.text("Odberatel", x + 12, y + h - 16, "/F2", header_size)
+    # riadky su predzalomene po znakoch (build_client_lines); tu sa dorovnaju podla sirky fontu
+    lines = [part for line in client_lines for part in wrap_text(str(line), "/F1", body_size, w - 24)]
+    out.text_lines(lines, x + 12, y + h - 32, "/F1", body_size, leading=body_size + 2)
 
 
 def build_client_lines(client: dict, wrap_width: int = 42) -> list[str]:
@@ -2,11 +2,25 @@ from __future__ import annotations
 
 from typing import Iterable, Mapping
 
-from web_calculator.utils.pdf.core.drawing import _draw_rect, _draw_text, _draw_price_cell
+from web_calculator.utils.pdf.core.content_stream import ContentStream
+from web_calculator.utils.pdf.core.drawing import draw_price_cell
 from web_calculator.utils.pdf.core.layout_common import TABLE_ROW_HEIGHT, TABLE_HEADER_HEIGHT
+from web_calculator.utils.pdf.core.text_metrics import wrap_text
+
+# Nazov polozky: sirka stlpca po stlpec "Mnozstvo", max pocet riadkov a ich rozostup
+NAME_COL_W = 200
+NAME_MAX_LINES = 3
+NAME_LEADING = 12
+
+
+def measure_item_row(item: Mapping) -> tuple[list[str], int]:
+    """Zalomeny nazov polozky a vyska riadku (kazdy dalsi riadok nazvu pridava `NAME_LEADING`)."""
+    name_lines = wrap_text(str(item.get("name", "")), "/F1", 10, NAME_COL_W, NAME_MAX_LINES)
+    return name_lines, TABLE_ROW_HEIGHT + (len(name_lines) - 1) * NAME_LEADING
 
 
 def render_items_table(
+    out: ContentStream,
     items: Iterable[Mapping],
     x: int,
     start_y: int,
@@ -15,27 +29,25 @@ def render_items_table(
     row_alt: str,
     vat_rate: float,
     min_y: int = 36,
-) -> tuple[list[str], list[Mapping]]:
+) -> list[Mapping]:
     """
-    Render items table (header + rows). Returns (content_parts, overflow_items).
+    Render items table (header + rows) into `out`. Returns overflow_items.
+    Riadky maju premenlivu vysku (zalomeny nazov); na stranu ide tolko riadkov, kolko sa zmesti
+    nad `min_y`, pri preteceni s rezervou jedneho zakladneho riadku. Aspon jeden riadok sa vzdy vykresli.
     """
-    content: list[str] = []
     col_x = [x + 10, x + 220, x + 320, x + 420]
     headers = ["Názov", "Množstvo", "bez DPH", "s DPH"]
 
-    content.append(f"{header_bg} rg {header_bg} RG ")
-    content.append(_draw_rect(x, start_y, table_w, TABLE_HEADER_HEIGHT, stroke=True, fill=True))
-    content.append("1 1 1 rg 1 1 1 RG ")
+    out.colors(header_bg)
+    out.rect(x, start_y, table_w, TABLE_HEADER_HEIGHT, stroke=True, fill=True)
+    out.colors("1 1 1")
     for hx, text in zip(col_x, headers):
-        content.append(_draw_text([text], hx, start_y + 20, "/F2", 10))
+        out.text(text, hx, start_y + 20, "/F2", 10)
 
     row_y = start_y - 26
-    available_rows = max(1, int((row_y - min_y) / TABLE_ROW_HEIGHT))
-    items_list = list(items)
-    overflow: list[Mapping] = []
-    if len(items_list) > available_rows:
-        overflow = items_list[available_rows - 1 :]
-        items_list = items_list[: available_rows - 1]
+    items_list = items if isinstance(items, list) else list(items)
+    rows = _paginate(items_list, row_y - min_y)
+    overflow: list[Mapping] = items_list[len(rows) :]
 
     def _line_totals(item: Mapping) -> tuple[float, float, float | None, float | None]:
         qty = float(item.get("qty", 1) or 1)
@@ -73,21 +85,40 @@ def render_items_table(
 
         return total_no_vat, total_with_vat, orig_no_vat, orig_with_vat
 
-    for idx, item in enumerate(items_list):
+    row_top = row_y + TABLE_ROW_HEIGHT  # vyssi riadok rastie smerom dole, horna hrana ostava
+    for idx, (item, name_lines, rh) in enumerate(rows):
         total_no_vat, total_with_vat, orig_no_vat, orig_with_vat = _line_totals(item)
-        rh = TABLE_ROW_HEIGHT
+        row_y = row_top - rh
         if idx % 2 == 0:
-            content.append(f"{row_alt} rg ")
-            content.append(_draw_rect(x, row_y, table_w, rh, stroke=False, fill=True))
-        content.append("0 0 0 rg 0 0 0 RG ")
-        content.append(_draw_rect(x, row_y, table_w, rh, stroke=True, fill=False))
-        name = item.get("name", "")
+            out.fill_color(row_alt)
+            out.rect(x, row_y, table_w, rh, stroke=False, fill=True)
+        out.reset_colors()
+        out.rect(x, row_y, table_w, rh, stroke=True, fill=False)
         qty = item.get("qty", "-")
-        content.append(_draw_text([name], col_x[0], row_y + rh - 26, "/F1", 10))
-        content.append(_draw_text([f"x{qty}"], col_x[1], row_y + rh - 26, "/F1", 10))
-        content.append(_draw_price_cell(total_no_vat, orig_no_vat, col_x[2], row_y + rh - 26, "/F1", 10))
-        content.append(_draw_price_cell(total_with_vat, orig_with_vat, col_x[3], row_y + rh - 26, "/F1", 10))
-        row_y -= rh
+        out.text_lines(name_lines, col_x[0], row_y + rh - 26, "/F1", 10, leading=NAME_LEADING)
+        out.text(f"x{qty}", col_x[1], row_y + rh - 26, "/F1", 10)
+        draw_price_cell(out, total_no_vat, orig_no_vat, col_x[2], row_y + rh - 26, "/F1", 10)
+        draw_price_cell(out, total_with_vat, orig_with_vat, col_x[3], row_y + rh - 26, "/F1", 10)
+        row_top = row_y
+
+    return overflow
 
-    return content, overflow
 
+def _paginate(items: list[Mapping], available_h: float) -> list[tuple[Mapping, list[str], int]]:
+    """Zmerane riadky, ktore sa zmestia do `available_h`; meria sa len po prvy nezmesteny."""
+    rows: list[tuple[Mapping, list[str], int]] = []
+    used = 0
+    for item in items:
+        name_lines, rh = measure_item_row(item)
+        if used + rh > available_h:
+            break
+        rows.append((item, name_lines, rh))
+        used += rh
+    if len(rows) < len(items):
+        # rezerva jedneho riadku ako doteraz (available_rows - 1)
+        while rows and used > available_h - TABLE_ROW_HEIGHT:
+            used -= rows.pop()[2]
+        if not rows and items:
+            name_lines, rh = measure_item_row(items[0])
+            rows.append((items[0], name_lines, rh))
+    return rows
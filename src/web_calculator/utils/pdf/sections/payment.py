@@ -1,26 +1,90 @@
 from __future__ import annotations
 
+import re
 from typing import Iterable, Mapping
 
-from web_calculator.utils.pdf.core.drawing import _draw_rect, _draw_text, _draw_qr
+from web_calculator.utils.pdf.core.content_stream import ContentStream
+from web_calculator.utils.pdf.core.drawing import draw_qr
+from web_calculator.utils.pdf.core.text_metrics import fit_lines
 
+QR_SIDE = 90
+STATUS_PREFIX = "Stav: "
+# Bod oznaceneho obsahu (`DP`) s poradim riadku stavu; podla neho pecatka najde riadok v hotovom PDF
+STATUS_MARK = "WebCalcPaymentStatus"
+_STATUS_MARK_RE = re.compile(rb"/" + STATUS_MARK.encode("ascii") + rb"\s*<<\s*/Line\s+(\d+)\s*>>\s*DP")
 
-def render_payment(pay_lines: Iterable[str], x: int, y: int, w: int, h: int, header_size: int, body_size: int, qr_matrix, qr_data: str | None) -> str:
-    parts: list[str] = []
-    parts.append(_draw_rect(x, y, w, h, stroke=True, fill=False))
-    parts.append(_draw_text(["Prehlad platby"], x + 12, y + h - 16, "/F2", header_size, leading=header_size + 1))
-    parts.append(_draw_text(pay_lines, x + 12, y + h - 32, "/F1", body_size, leading=body_size + 2))
+
+def render_payment(
+    out: ContentStream,
+    pay_lines: Iterable[str],
+    x: int,
+    y: int,
+    w: int,
+    h: int,
+    header_size: int,
+    body_size: int,
+    qr_matrix,
+    qr_data: str | None,
+) -> None:
+    pay_lines = list(pay_lines)
+    out.rect(x, y, w, h, stroke=True, fill=False)
+    out.text("Prehlad platby", x + 12, y + h - 16, "/F2", header_size)
+    line_index = status_line_index(pay_lines)
+    if line_index is not None:
+        out.raw(f"/{STATUS_MARK} << /Line {line_index} >> DP\n")
+    out.text_lines(fit_lines(pay_lines, "/F1", body_size, w - 24), x + 12, y + h - 32, "/F1", body_size, leading=body_size + 2)
 
     # QR vpravo hore
-    qr_side = 90
-    qr_draw = ""
+    qr_side = QR_SIDE
     if qr_matrix:
         qr_scale = max(2, qr_side // max(len(qr_matrix), len(qr_matrix[0])))
-        qr_draw = _draw_qr(qr_matrix, x + w - qr_scale * len(qr_matrix) - 12, y + h - 12, qr_scale)
+        draw_qr(out, qr_matrix, x + w - qr_scale * len(qr_matrix) - 12, y + h - 12, qr_scale)
     elif qr_data:
-        qr_draw = _draw_rect(x + w - qr_side - 12, y + h - qr_side - 12, qr_side, qr_side, stroke=True, fill=False) + _draw_text(["QR"], x + w - qr_side // 2 - 8, y + h - qr_side // 2 - 12, "/F2", 12)
-    parts.append(qr_draw)
-    return "".join(parts)
+        out.rect(x + w - qr_side - 12, y + h - qr_side - 12, qr_side, qr_side, stroke=True, fill=False)
+        out.text("QR", x + w - qr_side // 2 - 8, y + h - qr_side // 2 - 12, "/F2", 12)
+
+
+def render_payment_status(
+    out: ContentStream,
+    status_line: str,
+    x: int,
+    y: int,
+    w: int,
+    h: int,
+    body_size: int,
+    background: str,
+    line_index: int,
+) -> None:
+    """
+    Overlay pre inkrementalnu aktualizaciu: prekryje riadok stavu pozadim karty a vypise novy text
+    na rovnake miesto ako `render_payment` (riadok `line_index` z `read_status_line_index`,
+    vlavo od QR kodu).
+    """
+    leading = body_size + 2
+    line_y = y + h - 32 - line_index * leading
+    cover_w = w - QR_SIDE - 36
+    out.fill_color(background)
+    out.rect(x + 10, line_y - 4, cover_w, leading + 2, stroke=False, fill=True)
+    out.reset_colors()
+    out.text(status_line, x + 12, line_y, "/F1", body_size)
+
+
+def payment_status_line(invoice_payload: Mapping) -> str:
+    return f"{STATUS_PREFIX}{invoice_payload.get('payment_status') or 'Nezaplateny'}"
+
+
+def status_line_index(pay_lines: Iterable[str]) -> int | None:
+    """Poradie riadku stavu (`Stav: ...`) vo vykreslenych riadkoch; plati aj pre `payment_lines_override`."""
+    for idx, line in enumerate(pay_lines):
+        if str(line).startswith(STATUS_PREFIX):
+            return idx
+    return None
+
+
+def read_status_line_index(content: bytes) -> int | None:
+    """Poradie riadku stavu zapisane `render_payment` do content streamu strany (None, ak chyba)."""
+    match = _STATUS_MARK_RE.search(content)
+    return int(match.group(1)) if match else None
 
 
 def build_payment_lines(invoice_payload: Mapping, invoice_no: str, issue_date: str) -> list[str]:
@@ -28,5 +92,5 @@ def build_payment_lines(invoice_payload: Mapping, invoice_no: str, issue_date: s
         f"Variabilny symbol: {invoice_no}",
         f"Datum vystavenia: {issue_date}",
         f"Balik: {invoice_payload.get('package', '-') or '-'}",
-        "Stav: Nezaplateny",
+        payment_status_line(invoice_payload),
     ]
@@ -2,26 +2,24 @@ from __future__ import annotations
 
 from typing import Iterable
 
-from web_calculator.utils.pdf.core.drawing import _draw_rect, _draw_summary_lines, _draw_text
+from web_calculator.utils.pdf.core.content_stream import ContentStream
+from web_calculator.utils.pdf.core.drawing import draw_summary_lines
 from web_calculator.utils.pdf.core.totals import TotalsContext, format_currency
 
 
-def render_summary(lines: Iterable[str], x: int, y: int, w: int, h: int, header_size: int, body_size: int) -> str:
-    parts: list[str] = []
-    parts.append(_draw_rect(x, y, w, h, stroke=True, fill=False))
-    parts.append(_draw_text(["Suvaha"], x + 12, y + h - 16, "/F2", header_size, leading=header_size + 1))
-    parts.append(
-        _draw_summary_lines(
-            list(lines),
-            x + 12,
-            y + h - 32,
-            "/F2",
-            header_size,
-            "/F1",
-            body_size,
-        )
+def render_summary(out: ContentStream, lines: Iterable[str], x: int, y: int, w: int, h: int, header_size: int, body_size: int) -> None:
+    out.rect(x, y, w, h, stroke=True, fill=False)
+    out.text("Suvaha", x + 12, y + h - 16, "/F2", header_size)
+    draw_summary_lines(
+        out,
+        list(lines),
+        x + 12,
+        y + h - 32,
+        "/F2",
+        header_size,
+        "/F1",
+        body_size,
     )
-    return "".join(parts)
 
 
 def build_summary_lines(totals: TotalsContext) -> list[str]:
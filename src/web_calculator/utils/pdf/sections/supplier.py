@@ -2,15 +2,16 @@ from __future__ import annotations
 
 from typing import Iterable, Mapping
 
-from web_calculator.utils.pdf.core.drawing import _draw_rect, _draw_text
+from web_calculator.utils.pdf.core.content_stream import ContentStream
+from web_calculator.utils.pdf.core.text_metrics import fit_lines
 
 
-def render_supplier(supplier_lines: Iterable[str], x: int, y: int, w: int, h: int, header_size: int, body_size: int) -> str:
-    parts: list[str] = []
-    parts.append(_draw_rect(x, y, w, h, stroke=True, fill=False))
-    parts.append(_draw_text(["Dodavatel"], x + 12, y + h - 16, "/F2", header_size, leading=header_size + 1))
-    parts.append(_draw_text(supplier_lines, x + 12, y + h - 32, "/F1", body_size, leading=body_size + 2))
-    return "".join(parts)
+def render_supplier(
+    out: ContentStream, supplier_lines: Iterable[str], x: int, y: int, w: int, h: int, header_size: int, body_size: int
+) -> None:
+    out.rect(x, y, w, h, stroke=True, fill=False)
+    out.text("Dodavatel", x + 12, y + h - 16, "/F2", header_size)
+    out.text_lines(fit_lines(supplier_lines, "/F1", body_size, w - 24), x + 12, y + h - 32, "/F1", body_size, leading=body_size + 2)
 
 
 def build_supplier_lines(supplier: Mapping) -> list[str]:
@@ -2,14 +2,28 @@
 Sanity skript pre PDF renderer:
 - generuje viac scenarov (overflow tabulky, rozne DPH rezimy, overrides)
 - zapisuje PDF do dist/ a report do vyvojarske_doplnky/pdf_renderer_report.json
+
+Benchmark (`--bench`): scenare 10 / 1k / 20k poloziek x Unicode/Type1 fonty x s/bez QR;
+pre kazdy meria cas (najlepsi z `--repeat` behov), peak pamate (tracemalloc) a velkost PDF,
+porovna ich s ulozenou baseline a pri regresii nad toleranciu skonci s kodom 1.
+Baseline sa zapise cez `--update-baseline` (je specificka pre stroj, preto nie je v repozitari).
 """
 
 from __future__ import annotations
 
+import argparse
 import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
 from copy import deepcopy
 from pathlib import Path
+from typing import Iterator, Sequence
 
+from web_calculator.utils.pdf.core import fonts, telemetry
 from web_calculator.utils.pdf.core.totals import format_currency
 from web_calculator.utils.pdf.renderers.pdf_renderer import render_pdf
 
@@ -17,6 +31,14 @@ from web_calculator.utils.pdf.renderers.pdf_renderer import render_pdf
 ROOT = Path(__file__).resolve().parents[1]  # .../WEB_calculator
 DIST = ROOT / "dist"
 REPORT_PATH = ROOT.parent / "vyvojarske_doplnky" / "pdf_renderer_report.json"
+BENCH_REPORT_PATH = ROOT.parent / "vyvojarske_doplnky" / "pdf_benchmark_report.json"
+BENCH_BASELINE_PATH = ROOT.parent / "vyvojarske_doplnky" / "pdf_benchmark_baseline.json"
+
+BENCH_SIZES = (10, 1000, 20000)
+BENCH_FONTS = ("unicode", "type1")
+# Povolene zhorsenie oproti baseline (relativne); casy pod MIN_TIME_DELTA sa ignoruju (sum)
+DEFAULT_TOLERANCES = {"seconds": 0.25, "peak_kib": 0.20, "size": 0.05}
+MIN_TIME_DELTA = 0.005
 
 
 def _compute_totals(items, base: float, vat_rate: float) -> dict:
@@ -142,6 +164,168 @@ SCENARIOS = {
 }
 
 
+def _bench_payload(items: int, qr: bool) -> dict:
+    payload = deepcopy(_base_payload())
+    payload["items"] = [
+        {
+            "name": f"Sluzba {idx:05d} - konzultacia a implementacia",
+            "qty": 1 + (idx % 3),
+            "unit_price": 10.0 + idx % 50,
+            **({"original_unit_price": 12.0 + idx % 50} if idx % 4 == 0 else {}),
+        }
+        for idx in range(items)
+    ]
+    payload["totals"] = _compute_totals(payload["items"], base=50.0, vat_rate=0.2)
+    if not qr:
+        # bez cisla dokladu a qr_data sa QR nevykresli
+        payload["invoice_no"] = ""
+        payload["qr_data"] = ""
+    return payload
+
+
+@contextmanager
+def _font_mode(mode: str, font_dir: str | None = None) -> Iterator[bool]:
+    """Nastavi `WEB_CALCULATOR_PDF_FONT` pre scenar; vrati, ci su fonty daneho typu dostupne."""
+    previous = os.environ.get("WEB_CALCULATOR_PDF_FONT")
+    if mode == "type1":
+        os.environ["WEB_CALCULATOR_PDF_FONT"] = "type1"
+    elif font_dir:
+        os.environ["WEB_CALCULATOR_PDF_FONT"] = font_dir
+    else:
+        os.environ.pop("WEB_CALCULATOR_PDF_FONT", None)
+    try:
+        yield mode == "type1" or fonts.warm_font_cache()
+    finally:
+        if previous is None:
+            os.environ.pop("WEB_CALCULATOR_PDF_FONT", None)
+        else:
+            os.environ["WEB_CALCULATOR_PDF_FONT"] = previous
+
+
+def run_benchmarks(
+    sizes: Sequence[int] = BENCH_SIZES,
+    font_modes: Sequence[str] = BENCH_FONTS,
+    repeat: int = 3,
+    font_dir: str | None = None,
+) -> dict[str, dict]:
+    """Vrati {scenar: {seconds, peak_kib, size, pages, stages}} alebo {"status": "skipped"}."""
+    results: dict[str, dict] = {}
+    records: list[telemetry.RenderRecord] = []
+    listener = telemetry.add_listener(records.append)
+    try:
+        with tempfile.TemporaryDirectory(prefix="web_calculator_bench_") as tmp_dir:
+            for items in sizes:
+                for font_mode in font_modes:
+                    for qr in (True, False):
+                        name = f"items{items}_{font_mode}_{'qr' if qr else 'noqr'}"
+                        with _font_mode(font_mode, font_dir) as available:
+                            if not available:
+                                results[name] = {"status": "skipped", "reason": "Unicode fonty nenajdene"}
+                                continue
+                            payload = _bench_payload(items, qr)
+                            out_path = Path(tmp_dir) / f"{name}.pdf"
+                            best = float("inf")
+                            for _ in range(max(1, repeat)):
+                                records.clear()
+                                start = time.perf_counter()
+                                render_pdf(out_path, payload, use_cache=False)
+                                best = min(best, time.perf_counter() - start)
+                            record = records[-1] if records else None
+                            tracemalloc.start()
+                            try:
+                                render_pdf(out_path, payload, use_cache=False)
+                                _, peak = tracemalloc.get_traced_memory()
+                            finally:
+                                tracemalloc.stop()
+                            results[name] = {
+                                "status": "ok" if record is None or not record.fallback else "fallback",
+                                "seconds": round(best, 4),
+                                "peak_kib": round(peak / 1024.0, 1),
+                                "size": out_path.stat().st_size,
+                                "pages": record.pages if record else 0,
+                                "stages": {k: round(v, 4) for k, v in (record.stages if record else {}).items()},
+                            }
+    finally:
+        telemetry.remove_listener(listener)
+    return results
+
+
+def compare_to_baseline(results: dict[str, dict], baseline: dict[str, dict], tolerances: dict[str, float] | None = None) -> list[str]:
+    """Zoznam regresii (scenar, metrika, baseline -> aktualne); scenare mimo baseline sa preskocia."""
+    limits = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    regressions: list[str] = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if current.get("status") == "fallback":
+            regressions.append(f"{name}: novy renderer zlyhal (legacy fallback)")
+        if not base or current.get("status") == "skipped" or base.get("status") == "skipped":
+            continue
+        for metric, tolerance in limits.items():
+            old, new = base.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            if metric == "seconds" and new - old < MIN_TIME_DELTA:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {old} -> {new} (+{(new / old - 1) * 100:.0f}%, limit {tolerance * 100:.0f}%)")
+    return regressions
+
+
+def bench_main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="PDF renderer benchmark s kontrolou regresii voci baseline.")
+    parser.add_argument("--bench", action="store_true", help="Spustit benchmark (inak sanity scenare).")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in BENCH_SIZES), help="Pocty poloziek, oddelene ciarkou.")
+    parser.add_argument("--fonts", default=",".join(BENCH_FONTS), help="unicode,type1")
+    parser.add_argument("--repeat", type=int, default=3, help="Pocet behov na meranie casu (berie sa najlepsi).")
+    parser.add_argument("--font-dir", help="Priecinok s regular.ttf/bold.ttf pre Unicode scenare.")
+    parser.add_argument("--baseline", default=str(BENCH_BASELINE_PATH))
+    parser.add_argument("--report", default=str(BENCH_REPORT_PATH))
+    parser.add_argument("--update-baseline", action="store_true", help="Zapisat vysledky ako novu baseline.")
+    parser.add_argument("--max-time-regression", type=float, default=DEFAULT_TOLERANCES["seconds"])
+    parser.add_argument("--max-memory-regression", type=float, default=DEFAULT_TOLERANCES["peak_kib"])
+    parser.add_argument("--max-size-regression", type=float, default=DEFAULT_TOLERANCES["size"])
+    args = parser.parse_args(argv)
+
+    if not args.bench:
+        main()
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    font_modes = [f.strip() for f in args.fonts.split(",") if f.strip()]
+    results = run_benchmarks(sizes, font_modes, repeat=args.repeat, font_dir=args.font_dir)
+    for name, row in results.items():
+        if row.get("status") == "skipped":
+            print(f"{name:<28} skipped ({row.get('reason', '')})")
+        else:
+            print(f"{name:<28} {row['seconds'] * 1000:9.1f} ms {row['peak_kib']:10.1f} KiB {row['size']:10d} B {row['pages']:5d} str.")
+
+    baseline_path = Path(args.baseline)
+    regressions: list[str] = []
+    if baseline_path.exists() and not args.update_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8")).get("scenarios", {})
+        tolerances = {
+            "seconds": args.max_time_regression,
+            "peak_kib": args.max_memory_regression,
+            "size": args.max_size_regression,
+        }
+        regressions = compare_to_baseline(results, baseline, tolerances)
+
+    report = {"scenarios": results, "regressions": regressions}
+    report_path = Path(args.report)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({"scenarios": results}, indent=2), encoding="utf-8")
+        print(f"Baseline ulozena: {baseline_path}")
+    elif not baseline_path.exists():
+        print(f"Baseline {baseline_path} neexistuje; vytvor ju cez --update-baseline.")
+
+    for line in regressions:
+        print(f"REGRESIA {line}")
+    return 1 if regressions else 0
+
+
 def main() -> None:
     DIST.mkdir(parents=True, exist_ok=True)
     REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -159,4 +343,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(bench_main())
@@ -91,3 +91,298 @@ def test_build_invoice_payload_with_discount(monkeypatch, sample_package, sample
     assert totals["discount_amount"] == pytest.approx(discount_amount)
     assert totals["total_no_vat"] == pytest.approx(total_before - discount_amount)
     assert totals["total_with_vat"] == pytest.approx(totals["total_no_vat"] * 1.23)
+
+
+def test_build_payload_from_profile_uses_package_prices(sample_service):
+    from web_calculator.core.models.package import Package
+    from web_calculator.core.services.profile import build_payload_from_profile
+
+    package = Package(
+        code="WEB-START",
+        name="Starter",
+        description="Test",
+        base_price=120.0,
+        promo_price=99.0,
+        included_services=[sample_service.code],
+        included_quantities={sample_service.code: 1},
+    )
+    sample_service.price2 = 0.0
+    cat = catalog.Catalog(packages=[package], services=[sample_service])
+    profile = {
+        "package": "WEB-START",
+        "services": [sample_service.code],
+        "quantities": {sample_service.code: 3},
+        "client": {"name": "Alice"},
+        "price_mode": "promo",
+        "vat_rate": 0.2,
+        "vat_mode": "add",
+    }
+
+    payload = build_payload_from_profile(profile, cat, supplier={"name": "Supp"}, doc_type="invoice")
+
+    # 1 ks zadarmo v baliku, 2 ks za zakladnu cenu
+    assert payload["totals"]["base"] == 99.0
+    assert payload["totals"]["extras"] == pytest.approx(2 * sample_service.price)
+    assert payload["doc_title"] == "Faktura"
+    assert payload["qr_data"].startswith("Faktura:")
+
+
+def test_promotions_resolve_by_issue_date_and_reprice_profiles(tmp_path, sample_service):
+    import random
+    from datetime import date, timedelta
+
+    from web_calculator.core.calculations.promotions import PromotionIndex
+    from web_calculator.core.models.package import Package
+    from web_calculator.core.models.promotion import Promotion
+    from web_calculator.core.services.profile import build_payload_from_profile
+
+    rng = random.Random(11)
+    day0 = date(2026, 1, 1)
+    promos = []
+    for _ in range(300):
+        start = day0 + timedelta(days=rng.randint(0, 360))
+        end = start + timedelta(days=rng.randint(0, 60))
+        promos.append(
+            Promotion(
+                code=rng.choice(["A", "B", "C"]),
+                price=round(rng.uniform(1, 100), 2),
+                valid_from=start.isoformat() if rng.random() < 0.95 else "",
+                valid_to=end.isoformat() if rng.random() < 0.9 else "",
+            )
+        )
+    index = PromotionIndex(promos)
+    for offset in range(-5, 430, 3):
+        on = day0 + timedelta(days=offset)
+        for code in ("A", "B", "C", "D"):
+            active = [
+                p
+                for p in promos
+                if p.code == code
+                and (not p.valid_from or date.fromisoformat(p.valid_from) <= on)
+                and (not p.valid_to or on <= date.fromisoformat(p.valid_to))
+            ]
+            expected = min((p.price for p in active), default=None)
+            assert index.package_price(code, on) == expected
+
+    package = Package(code="WEB-START", name="Starter", description="Test", base_price=120.0)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    catalog.save_catalog(
+        catalog.Catalog(
+            packages=[package],
+            services=[sample_service],
+            promotions=[
+                Promotion(code="WEB-START", price=90.0, valid_from="2026-11-01", valid_to="2026-11-30"),
+                Promotion(code="WEB-BLOG", price=40.0, valid_from="2026-11-15", target="service"),
+            ],
+        ),
+        data_dir,
+    )
+    cat = catalog.load_catalog(tmp_path)
+    profile = {"package": "WEB-START", "services": ["WEB-BLOG"], "quantities": {"WEB-BLOG": 2}}
+
+    def totals(on):
+        payload = build_payload_from_profile(profile, cat, supplier={"name": "Supp"}, issued=on)
+        return payload["issue_date"], payload["totals"]["base"], payload["totals"]["extras"]
+
+    assert totals(date(2026, 10, 31)) == ("31/10/2026", 120.0, 100.0)
+    assert totals(date(2026, 11, 10)) == ("10/11/2026", 90.0, 100.0)
+    assert totals(date(2026, 12, 24)) == ("24/12/2026", 120.0, 80.0)
+
+
+def test_invalid_promotions_are_skipped_without_dropping_catalog(tmp_path, sample_service, capsys):
+    from datetime import date
+
+    from web_calculator.core.models.package import Package
+    from web_calculator.core.models.promotion import Promotion
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    promotions = [
+        Promotion(code="WEB-START", price=90.0, valid_from="2026-11-01", valid_to="2026-11-30"),
+        Promotion(code="WEB-START", price=10.0, valid_from="2026-13-01"),
+        Promotion(code="WEB-BLOG", price=5.0, valid_from="2026-12-31", valid_to="2026-12-01", target="service"),
+    ]
+    package = Package(code="WEB-START", name="Starter", description="Test", base_price=120.0)
+    catalog.save_catalog(catalog.Catalog(packages=[package], services=[sample_service], promotions=promotions), data_dir)
+
+    loaded = catalog.load_catalog(tmp_path)
+    assert [p.code for p in loaded.packages] == ["WEB-START"] and [s.code for s in loaded.services] == ["WEB-BLOG"]
+    assert loaded.promotions == promotions  # v katalogu ostanu (ulozenie ich nezmaze), len sa neindexuju
+    assert loaded.promotion_index.package_price("WEB-START", date(2026, 11, 15)) == 90.0
+    assert loaded.promotion_index.package_price("WEB-START", date(2027, 1, 15)) is None
+    assert loaded.promotion_index.service_price("WEB-BLOG", date(2026, 12, 15)) is None
+    warnings = capsys.readouterr().out
+    assert "month must be in 1..12" in warnings and "je po valid_to" in warnings
+
+
+def test_price_history_appends_and_reprices_as_of_date(tmp_path, sample_service):
+    import random
+    from datetime import date, datetime, timedelta
+
+    from web_calculator.core.calculations.price_history import PriceHistory, price_change
+    from web_calculator.core.models.package import Package
+    from web_calculator.core.services.profile import build_payload_from_profile
+
+    rng = random.Random(5)
+    start = datetime(2026, 1, 1, 9, 0)
+    log = []
+    price = 10.0
+    for hour in rng.sample(range(5000), 200):
+        new_price = round(rng.uniform(1, 100), 2)
+        log.append(price_change("service", "S", {"price": price}, {"price": new_price}, start + timedelta(hours=hour)))
+        price = new_price
+    history = PriceHistory(reversed(log))  # poradie v subore nezalezi
+    ordered = sorted(log, key=lambda ch: ch.changed_at)
+    for hours in range(-30, 5100, 17):
+        moment = start + timedelta(hours=hours)
+        before = [ch for ch in ordered if datetime.fromisoformat(ch.changed_at) <= moment]
+        expected = before[-1].prices if before else ordered[0].previous
+        assert history.prices_as_of("service", "S", moment) == expected
+    assert history.prices_as_of("service", "X", start) is None
+    assert price_change("service", "S", {"price": 1.0}, {"price": 1.0}) is None
+
+    package = Package(code="WEB-START", name="Starter", description="Test", base_price=120.0)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    cat = catalog.Catalog(packages=[package], services=[sample_service])
+    catalog.save_catalog(cat, data_dir)
+    history_path = data_dir / "price_history.jsonl"
+    catalog.record_price_change(
+        cat, "package", "WEB-START", {"base_price": 100.0}, {"base_price": 120.0}, history_path, datetime(2026, 3, 1, 12)
+    )
+    catalog.record_price_change(cat, "service", "WEB-BLOG", {"price": 45.0}, {"price": 50.0}, history_path, datetime(2026, 6, 1))
+    assert catalog.record_price_change(cat, "service", "WEB-BLOG", {"price": 50.0}, {"price": 50.0}, history_path) is None
+    assert len(history_path.read_text(encoding="utf-8").splitlines()) == 2
+
+    loaded = catalog.load_catalog(tmp_path)
+    profile = {"package": "WEB-START", "services": ["WEB-BLOG"], "quantities": {"WEB-BLOG": 2}}
+
+    def totals(**kwargs):
+        payload = build_payload_from_profile(profile, loaded, supplier={"name": "Supp"}, **kwargs)
+        return payload["issue_date"], payload["totals"]["base"], payload["totals"]["extras"]
+
+    assert totals(as_of=date(2026, 2, 1)) == ("01/02/2026", 100.0, 90.0)
+    assert totals(as_of=date(2026, 3, 1)) == ("01/03/2026", 120.0, 90.0)  # zmena v ten den sa zapocita
+    assert totals(as_of=date(2026, 7, 1), issued=date(2026, 10, 1)) == ("01/10/2026", 120.0, 100.0)
+
+    # bez `path` sa pise k nacitanemu katalogu, nie do data/ balika
+    assert loaded.history_path == history_path
+    catalog.record_price_change(loaded, "service", "WEB-BLOG", {"price": 50.0}, {"price": 55.0}, when=datetime(2026, 8, 1))
+    assert len(history_path.read_text(encoding="utf-8").splitlines()) == 3
+    assert catalog.load_catalog(tmp_path).price_history.prices_as_of("service", "WEB-BLOG", date(2026, 9, 1)) == {"price": 55.0}
+
+
+def test_price_history_skips_lines_with_bad_dates(tmp_path, sample_service):
+    import json
+    from datetime import date
+
+    from web_calculator.core.models.package import Package
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    package = Package(code="WEB-START", name="Starter", description="Test", base_price=120.0)
+    catalog.save_catalog(catalog.Catalog(packages=[package], services=[sample_service]), data_dir)
+    good = {"code": "WEB-BLOG", "target": "service", "previous": {"price": 45.0}, "prices": {"price": 50.0}}
+    lines = [
+        json.dumps({**good, "changed_at": "2026-06-01T00:00:00"}),
+        json.dumps({**good, "changed_at": "garbage", "prices": {"price": 99.0}}),
+        '{"code": "WEB-BLOG", "changed_at": "2026-07-',
+    ]
+    (data_dir / "price_history.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    loaded = catalog.load_catalog(tmp_path)
+    assert [s.code for s in loaded.services] == ["WEB-BLOG"] and [p.code for p in loaded.packages] == ["WEB-START"]
+    assert loaded.price_history.changes("service", "WEB-BLOG")[0].prices == {"price": 50.0}
+    assert len(loaded.price_history.changes("service", "WEB-BLOG")) == 1
+    assert loaded.price_history.prices_as_of("service", "WEB-BLOG", date(2026, 1, 1)) == {"price": 45.0}
+
+
+def test_compact_service_store_behaves_like_service_list(tmp_path, sample_service):
+    from dataclasses import asdict, replace
+
+    from web_calculator.core.models.package import Package
+    from web_calculator.core.models.service import Service
+    from web_calculator.core.models.service_store import ServiceStore
+    from web_calculator.core.services.profile import build_payload_from_profile
+
+    services = [
+        sample_service,
+        Service(code="ESH-1", label="Košík", source="ESHOP", price=19.9, price2=9.9, bundle="ESHOP", tiers=[[1, 19.9], [5, 15]]),
+        Service(code="PRI-1", label="Hosting", source="PRIMARY", price=5.0, info="rocne"),
+    ]
+    package = Package(code="ESHOP-Z", name="E-shop", description="", base_price=300.0, included_services=["PRI-1"])
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    catalog.save_catalog(catalog.Catalog(packages=[package], services=services), data_dir)
+
+    plain = catalog.load_catalog(tmp_path, compact=False)
+    compact = catalog.load_catalog(tmp_path, compact=True)
+    store = compact.services
+    assert isinstance(store, ServiceStore) and len(store) == 3
+    assert [asdict(s) for s in store] == [asdict(s) for s in plain.services]
+    codes = [s.code for s in store]
+    assert codes == ["WEB-BLOG", "PRI-1", "ESH-1"]  # poradie suborov services_web/primary/eshop
+    assert store[2].price_tiers == plain.services[2].price_tiers
+
+    view = next(s for s in store if s.code == "ESH-1")
+    assert store[2] is view and view == plain.services[2]
+    copy = replace(view, price=1.0)
+    assert type(copy) is Service and copy.price == 1.0 and view.price == 19.9
+    view.label = "Kosik"
+    view.tag = "CART"
+    assert store[2].label == "Kosik" and store[2].tag == "CART"
+
+    profile = {"package": "ESHOP-Z", "services": ["WEB-BLOG", "ESH-1", "PRI-1"], "quantities": {"ESH-1": 7}}
+    expected = build_payload_from_profile(profile, plain, supplier={"name": "Supp"})["totals"]
+    assert build_payload_from_profile(profile, compact, supplier={"name": "Supp"})["totals"] == expected
+
+    del store[0]
+    assert view.code == "ESH-1" and store[1] is view
+    store.append(Service(code="NEW", label="Nova"))
+    assert [s.code for s in store] == ["PRI-1", "ESH-1", "NEW"]
+    catalog.save_catalog(compact, data_dir)
+    reloaded = catalog.load_catalog(tmp_path, compact=False).services
+    assert [(s.code, s.label, s.tiers) for s in reloaded] == [
+        ("PRI-1", "Hosting", []),
+        ("ESH-1", "Kosik", [[1, 19.9], [5, 15]]),
+        ("NEW", "Nova", []),
+    ]
+
+
+def test_services_are_interned_and_normalized_at_load(tmp_path):
+    from web_calculator.core.calculations.pricing_engine import effective_service_price
+    from web_calculator.core.models.package import Package
+    from web_calculator.core.models.service import normalize_service
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "packages.json").write_text(json.dumps({"packages": []}), encoding="utf-8")
+    raw = [
+        {"code": "E1", "label": "E1", "source": "eshop_extra", "unit": "ks", "bundle": "eshop_z", "tag": "shop", "price": 10, "price2": 4},
+        {"code": "E2", "label": "E2", "source": "ESHOP", "unit": "ks", "bundle": "none", "tag": "shop", "price": 20},
+        {"code": "W1", "label": "W1", "source": " web ", "price": 5},
+    ]
+    (data_dir / "services_extra.json").write_text(json.dumps({"services": raw}), encoding="utf-8")
+
+    for compact in (False, True):
+        e1, e2, w1 = catalog.load_catalog(tmp_path, compact=compact).services
+        assert (e1.source, e1.section, e1.bundle, e1.bundle_key) == ("ESHOP_EXTRA", "eshop", "ESHOP_Z", "ESHOP_Z")
+        assert (e2.bundle, e2.bundle_key, w1.source, w1.section) == ("NONE", "", "WEB", "backend")
+        assert e1.unit is e2.unit and e1.tag is e2.tag and e2.source is catalog.load_catalog(tmp_path).services[1].source
+
+    package = Package(code="eshop_z-pro", name="E", description="", base_price=1.0)
+    assert effective_service_price(e1, package, 1, 10.0, 4.0) == 4.0  # bundle prefix bez ohladu na velkost pismen
+
+    # uprava v UI -> prepocitanie predpocitanych poli
+    w1.source, w1.bundle = "primary", "eshop_z"
+    normalize_service(w1)
+    assert (w1.section, w1.bundle_key) == ("primary", "ESHOP_Z")
+
+    # ukladanie podla zdroja; predpocitane polia sa do JSON nedostanu
+    loaded = catalog.load_catalog(tmp_path, compact=False)
+    catalog.save_catalog(loaded, data_dir)
+    eshop = json.loads((data_dir / "services_eshop.json").read_text(encoding="utf-8"))["services"]
+    web = json.loads((data_dir / "services_web.json").read_text(encoding="utf-8"))["services"]
+    assert [s["code"] for s in eshop] == ["E1", "E2"] and [s["code"] for s in web] == ["W1"]
+    assert "section" not in eshop[0] and "bundle_key" not in eshop[0] and eshop[0]["source"] == "ESHOP_EXTRA"
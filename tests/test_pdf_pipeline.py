@@ -0,0 +1,561 @@
+import os
+import re
+import stat
+
+import pytest
+
+from web_calculator.utils.pdf import exports
+
+
+def _payload(invoice_no: str = "INV-1", items: int = 2, title: str = "Cenova ponuka") -> dict:
+    return {
+        "invoice_no": invoice_no,
+        "issue_date": "2024-01-01",
+        "doc_title": title,
+        "package": "-",
+        "supplier": {"name": "Supp", "address": "Addr", "ico": "1"},
+        "client": {"name": "Client", "address": "Addr"},
+        "totals": {"total_no_vat": 10.0 * items, "vat": 2.3 * items, "total_with_vat": 12.3 * items, "vat_rate": 0.23},
+        "items": [{"name": f"Item {i}", "qty": 1, "unit_price": 10.0, "total": 10.0} for i in range(items)],
+        "qr_data": None,
+    }
+
+
+@pytest.fixture(autouse=True)
+def _type1_fonts(monkeypatch, tmp_path):
+    # Deterministicke testy: bez Unicode TTF, builder pouzije Helvetica; cache PDF mimo data/.
+    from web_calculator.utils.pdf.core import fonts
+
+    monkeypatch.setattr(fonts, "_try_load_unicode_fonts", lambda: {})
+    monkeypatch.setenv("WEB_CALCULATOR_PDF_CACHE_DIR", str(tmp_path / "pdf_cache"))
+
+
+def _page_count(data: bytes) -> int:
+    return int(re.search(rb"/Type /Pages /Count (\d+)", data).group(1))
+
+
+def test_bundle_pdf_shares_fonts_and_adds_outlines(tmp_path):
+    out_path = tmp_path / "bundle.pdf"
+    payloads = [_payload("Q-1"), _payload("P-1", title="Predfaktura"), _payload("F-1", items=30, title="Faktura")]
+
+    exports.export_bundle_pdf(out_path, payloads)
+
+    data = out_path.read_bytes()
+    assert data.startswith(b"%PDF")
+    assert data.count(b"/BaseFont /Helvetica ") == 1
+    assert _page_count(data) >= 4  # faktura s 30 polozkami pretecie na dalsiu stranu
+    assert b"/Type /Outlines" in data
+    assert b"(Predfaktura c. P-1)" in data
+    startxref = int(data.split(b"startxref\n")[1].split(b"\n")[0])
+    assert data[startxref : startxref + 4] == b"xref"
+
+
+def test_linearized_bundle_puts_first_page_and_hints_up_front(tmp_path):
+    out_path = tmp_path / "web.pdf"
+    exports.export_bundle_pdf(out_path, [_payload("L-1", items=30), _payload("L-2")], linearize=True)
+
+    data = out_path.read_bytes()
+    lin = re.search(rb"/Linearized 1 /L (\d+) /H \[(\d+) (\d+)\] /O (\d+) /E (\d+) /N (\d+) /T (\d+)", data[:200])
+    length, hint_at, hint_len, first_page, end_first, npages, t = map(int, lin.groups())
+    assert length == len(data) and npages == _page_count(data) >= 3
+    assert re.match(rb"\d+ 0 obj << /Length \d+ /S \d+ >> stream\n", data[hint_at:])
+    assert data[hint_at + hint_len - 7 : hint_at + hint_len] == b"endobj\n"
+    assert data.index(f"{first_page} 0 obj << /Type /Page ".encode()) < end_first < data.rindex(b"/Type /Pages")
+    assert data[t : t + 21] == b"\n0000000000 65535 f \n"
+    # vsetky xref sekcie (prva strana aj hlavna) ukazuju na spravne objekty
+    for table in re.finditer(rb"xref\n(\d+) (\d+)\n", data):
+        first, count = int(table.group(1)), int(table.group(2))
+        for k in range(count):
+            entry = data[table.end() + 20 * k : table.end() + 20 * k + 20]
+            if entry[17:18] == b"n":
+                assert data[int(entry[:10]) :].startswith(b"%d 0 obj" % (first + k))
+
+
+def test_object_streams_pack_small_objects_and_use_xref_stream():
+    import zlib
+
+    from web_calculator.utils.pdf.core import fonts
+    from web_calculator.utils.pdf.core.builder import build_pdf_bytes
+    from web_calculator.utils.pdf.renderers.pdf_renderer import _build_content_streams
+
+    fonts.load_font_map()
+    try:
+        streams = _build_content_streams(_payload("O-1", items=40)) + _build_content_streams(_payload("O-2"))
+        classic = build_pdf_bytes(streams, outlines=[("A", 0), ("B", len(streams) - 1)])
+        compact = build_pdf_bytes(streams, outlines=[("A", 0), ("B", len(streams) - 1)], object_streams=True)
+    finally:
+        fonts.clear_font_map()
+
+    assert compact.startswith(b"%PDF-1.5") and len(compact) < len(classic)
+    assert b"/Type /Page " not in compact and b"\nxref\n" not in compact
+    startxref = int(compact.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+    xref = re.match(rb"(\d+) 0 obj << /Type /XRef /Size (\d+) /Root 1 0 R /W \[1 (\d) 2\] /Filter /FlateDecode /Length (\d+) >> stream\n", compact[startxref:])
+    size, width, length = int(xref.group(2)), int(xref.group(3)), int(xref.group(4))
+    rows = zlib.decompress(compact[startxref + xref.end() : startxref + xref.end() + length])
+    assert len(rows) == size * (3 + width)
+    kinds = [rows[i * (3 + width)] for i in range(size)]
+    assert kinds[0] == 0 and 2 in kinds
+    for obj_id, kind in enumerate(kinds):
+        if kind == 1:
+            offset = int.from_bytes(rows[obj_id * (3 + width) + 1 : obj_id * (3 + width) + 1 + width], "big")
+            assert compact[offset:].startswith(b"%d 0 obj" % obj_id)
+
+
+def test_streamed_write_matches_bytes_and_writes_parts_without_join(tmp_path):
+    import io
+    import mmap
+
+    from web_calculator.utils.pdf.core import builder, fonts
+    from web_calculator.utils.pdf.renderers import pdf_renderer
+
+    out_path = tmp_path / "stream.pdf"
+    pdf_renderer.render_pdf(out_path, _payload("S-1"), use_cache=False)
+    assert out_path.read_bytes() == pdf_renderer.render_pdf_bytes(_payload("S-1"), use_cache=False)
+
+    font_file = tmp_path / "font.bin"
+    font_file.write_bytes(b"TTF" * 100)
+    data = fonts._map_font_file(font_file)
+    assert isinstance(data, memoryview) and isinstance(data.obj, mmap.mmap)
+    objs = [b"1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n", (b"2 0 obj << /Length 300 >> stream\n", data, b"\nendstream endobj\n")]
+    buf = io.BytesIO()
+    written = builder._write_objects(buf, objs)
+    pdf = buf.getvalue()
+    assert written == len(pdf)
+    offset = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    second = int(re.findall(rb"(\d{10}) 00000 n", pdf[offset:])[-1])
+    assert pdf[second:].startswith(b"2 0 obj") and b"TTF" * 100 in pdf
+
+
+def test_long_item_names_wrap_and_every_item_is_paginated():
+    from web_calculator.utils.pdf.core import text_metrics
+    from web_calculator.utils.pdf.core.content_stream import ContentStream
+    from web_calculator.utils.pdf.renderers import pdf_renderer
+    from web_calculator.utils.pdf.sections import items_table
+
+    assert text_metrics.text_width("Hello", "/F1", 10) == pytest.approx(22.78)
+    fitted = text_metrics.fit_text("Velmi dlhy nazov sluzby", "/F1", 10, 60)
+    assert fitted.endswith("...") and text_metrics.text_width(fitted, "/F1", 10) <= 60
+    lines = text_metrics.wrap_text("Sluzba " * 30, "/F1", 10, 200, max_lines=3)
+    assert len(lines) == 3 and lines[-1].endswith("...")
+    assert all(text_metrics.text_width(line, "/F1", 10) <= 200 for line in lines)
+
+    long_row = {"name": "Konzultacia a analyza " * 4, "qty": 1, "unit_price": 10.0, "total": 10.0}
+    name_lines, height = items_table.measure_item_row(long_row)
+    assert len(name_lines) > 1 and height == items_table.TABLE_ROW_HEIGHT + (len(name_lines) - 1) * items_table.NAME_LEADING
+
+    payload = _payload("W-1", items=60)
+    payload["items"][3] = long_row
+    streams = pdf_renderer._build_content_streams(payload)
+    text = b"".join(streams)
+    assert all(f"(Item {i})".encode() in text for i in range(60) if i != 3)
+    assert all(f"({line})".encode() in text for line in name_lines) and len(streams) >= 3
+
+    out = ContentStream()
+    assert items_table.render_items_table(out, [long_row] * 5, 48, 100, 499, "0 0 0", "1 1 1", 0.2, min_y=60) == [long_row] * 4
+
+
+def test_render_telemetry_reports_stages_bytes_and_fallbacks(monkeypatch, caplog):
+    from web_calculator.utils.pdf.core import telemetry
+    from web_calculator.utils.pdf.renderers import pdf_renderer
+
+    records = []
+    listener = telemetry.add_listener(records.append)
+    telemetry.reset_counters()
+    try:
+        data = pdf_renderer.render_pdf_bytes(_payload("T-1", items=40), use_cache=False)
+        pdf_renderer.render_pdf_bytes(_payload("T-1", items=40))
+        pdf_renderer.render_pdf_bytes(_payload("T-1", items=40))
+
+        def boom(payload):
+            raise RuntimeError("zly layout")
+
+        monkeypatch.setattr(pdf_renderer, "_build_content_streams", boom)
+        with caplog.at_level("WARNING", logger="web_calculator.pdf"):
+            pdf_renderer.render_pdf_bytes(_payload("T-2"), use_cache=False)
+    finally:
+        telemetry.remove_listener(listener)
+
+    first, _, hit, failed = records
+    assert {"fonts", "qr", "sections", "table", "build", "write"} <= set(first.stages)
+    assert first.total_bytes == len(data) and first.pages >= 2 and not first.fallback
+    assert first.object_bytes["content"] > 0 and sum(first.object_bytes.values()) == len(data) - len(b"%PDF-1.4\n")
+    assert hit.cache_hit and hit.total_bytes == len(data)
+    assert failed.fallback and "zly layout" in failed.error and isinstance(failed.exception, RuntimeError)
+    assert "legacy" in failed.stages and "fallback" in caplog.text
+    assert telemetry.counters() == {"renders": 4, "fallbacks": 1, "cache_hits": 1}
+
+
+def test_benchmark_records_metrics_and_flags_regressions():
+    import pdf_renderer_check as bench
+
+    results = bench.run_benchmarks(sizes=(10,), font_modes=("type1", "unicode"), repeat=1)
+    row = results["items10_type1_qr"]
+    assert row["status"] == "ok" and row["seconds"] > 0 and row["peak_kib"] > 0 and row["size"] > 0
+    assert results["items10_type1_qr"]["size"] > results["items10_type1_noqr"]["size"]
+    assert results["items10_unicode_qr"]["status"] == "skipped"
+
+    baseline = {name: dict(values) for name, values in results.items()}
+    assert bench.compare_to_baseline(results, baseline) == []
+    baseline["items10_type1_qr"]["size"] = row["size"] // 2
+    baseline["items10_type1_noqr"]["seconds"] = results["items10_type1_noqr"]["seconds"] / 10  # pod MIN_TIME_DELTA
+    regressions = bench.compare_to_baseline(results, baseline)
+    assert len(regressions) == 1 and regressions[0].startswith("items10_type1_qr: size")
+
+
+def test_catalog_export_streams_grouped_pages_with_outlines(tmp_path):
+    from web_calculator.core.models.package import Package
+    from web_calculator.core.models.service import Service
+    from web_calculator.core.services.catalog import Catalog
+    from web_calculator.utils.pdf.core import incremental
+
+    services = [
+        Service(code=f"S{i:04d}", label=f"Sluzba {i} s dlhym nazvom, ktory sa zalomi do dvoch riadkov", source=("WEB", "ESHOP")[i % 2], price=10.0 + i, tag="T", info="Info" * (i % 3))
+        for i in range(400)
+    ]
+    catalog = Catalog(packages=[Package(code="P1", name="Start", description="Zakladny balik", base_price=99.0)], services=services)
+    out_path = tmp_path / "cennik.pdf"
+
+    pages = exports.export_catalog_pdf(out_path, catalog, subtitle="Platny od 1.1.2025")
+
+    pdf = out_path.read_bytes()
+    assert pages > 5 and pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    assert len(incremental.page_ids(pdf)) == pages
+    xref = incremental.read_xref(pdf)
+    assert all(pdf[offset:].startswith(f"{obj_id} 0 obj".encode()) for obj_id, offset in xref.offsets.items())
+    assert all(f"({s.code})".encode() in pdf for s in services) and b"(P1)" in pdf
+    assert b"/Title (Baliky)" in pdf and b"/Title (Sluzby - WEB)" in pdf and b"/Title (Sluzby - ESHOP)" in pdf
+
+
+def test_content_stream_matches_legacy_operator_format():
+    from web_calculator.utils.pdf.core.content_stream import ContentStream
+
+    out = ContentStream()
+    out.colors("0.9 0.9 0.9", "0.5 0.5 0.5").rect(10, 20.5, 30, 40, stroke=True, fill=True).reset_colors()
+    out.text_lines(["Dátum (x)", "B"], 5, 100, "/F1", 10, leading=12)
+    out.strike("0.55 0.55 0.55", 0.6, 5, 103.0, 20.8)
+
+    assert out.getvalue() == (
+        b"0.9 0.9 0.9 rg 0.5 0.5 0.5 RG 10 20.5 30 40 re B\n0 0 0 rg 0 0 0 RG "
+        b"BT /F1 10 Tf 5 100 Td (Datum \\(x\\)) Tj ET\nBT /F1 10 Tf 5 88 Td (B) Tj ET\n"
+        b"0.55 0.55 0.55 RG 0.60 w 5 103.00 m 25.80 103.00 l S\n"
+    )
+
+
+def test_bundle_pdfs_writes_separate_files(tmp_path):
+    jobs = [(tmp_path / f"doc{i}.pdf", _payload(f"INV-{i}")) for i in range(3)]
+
+    exports.export_bundle_pdfs(jobs)
+
+    for path, payload in jobs:
+        data = path.read_bytes()
+        assert data.startswith(b"%PDF")
+        assert payload["invoice_no"].encode() in data
+
+
+def test_export_batch_reports_timing_and_failures(tmp_path):
+    from web_calculator.core.services.batch_export import BatchJob, export_batch
+
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("x")
+    jobs = [BatchJob(tmp_path / f"out{i}.pdf", _payload(f"B-{i}")) for i in range(3)]
+    jobs.append(BatchJob(blocker / "fail.pdf", _payload("B-X")))
+
+    results = export_batch(jobs, max_workers=2)
+
+    assert [r.output for r in results] == [j.output for j in jobs]
+    assert all(r.ok and r.size > 0 and r.seconds >= 0 for r in results[:3])
+    assert not results[3].ok and results[3].error
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_batch_jobs_apply_saved_pdf_content_like_ui_export(tmp_path):
+    import json
+
+    from web_calculator.core.services import catalog
+    from web_calculator.core.services.batch_export import jobs_from_profiles
+    from web_calculator.core.services.pdf_content import merge_section_content
+
+    profile = tmp_path / "klient.json"
+    profile.write_text(json.dumps({"client": {"name": "Klient"}, "services": []}), encoding="utf-8")
+    content = {
+        "invoice": {"supplier_lines": ["Firma s.r.o.", "IBAN SK00"], "client_lines": ["Stary klient"]},
+        "quote": {"supplier_lines": ["Len ponuka"]},
+    }
+    cat = catalog.Catalog(packages=[], services=[])
+    (job,) = jobs_from_profiles([profile], tmp_path / "out", cat, supplier={}, doc_type="invoice", pdf_content=content)
+
+    # rovnake pravidla ako v UI: ulozeny dodavatel plati, klient/VS/sumy su vzdy cerstve
+    assert job.payload["supplier_lines_override"] == ["Firma s.r.o.", "IBAN SK00"]
+    assert "client_lines_override" not in job.payload
+    defaults = {"supplier_lines": ["x"], "client_lines": ["Klient"], "payment_lines": ["VS"]}
+    assert merge_section_content(defaults, content["invoice"]) == {
+        "supplier_lines": ["Firma s.r.o.", "IBAN SK00"],
+        "client_lines": ["Klient"],
+        "payment_lines": ["VS"],
+    }
+    (plain,) = jobs_from_profiles([profile], tmp_path / "out", cat, supplier={}, doc_type="proforma", pdf_content=content)
+    assert "supplier_lines_override" not in plain.payload
+
+
+def test_render_cache_serves_identical_bytes_and_evicts(tmp_path, monkeypatch):
+    from web_calculator.utils.pdf.core import render_cache
+    from web_calculator.utils.pdf.renderers import pdf_renderer
+
+    calls = []
+    real_render = pdf_renderer._render_new
+    monkeypatch.setattr(pdf_renderer, "_render_new", lambda p, **kw: calls.append(1) or real_render(p, **kw))
+
+    first = pdf_renderer.render_pdf_bytes(_payload("C-1"))
+    again = pdf_renderer.render_pdf_bytes(_payload("C-1"))
+    assert first == again and len(calls) == 1
+
+    changed = _payload("C-1")
+    changed["payment_lines_override"] = ["Iny text"]
+    pdf_renderer.render_pdf_bytes(changed)
+    pdf_renderer.render_pdf_bytes(_payload("C-1"), use_cache=False)
+    monkeypatch.setenv("WEB_CALCULATOR_PDF_CACHE", "0")
+    pdf_renderer.render_pdf_bytes(_payload("C-1"))
+    assert len(calls) == 4
+
+    cache = render_cache.RenderCache(tmp_path / "lru", max_bytes=2 * len(first) + 10)
+    for idx in range(3):
+        cache.put(f"k{idx}", first)
+    assert cache.get("k0") is None and cache.get("k2") == first
+
+
+def test_render_pdf_rerenders_when_cached_file_is_evicted_before_copy(tmp_path, monkeypatch):
+    from web_calculator.utils.pdf.core import render_cache
+    from web_calculator.utils.pdf.renderers import pdf_renderer
+
+    first = tmp_path / "prvy.pdf"
+    pdf_renderer.render_pdf(first, _payload("E-1"))
+    real_get_path = render_cache.RenderCache.get_path
+
+    def evicted_get_path(self, key):
+        # `evict` z ineho zapisu zmaze subor medzi `get_path` a kopiou
+        found = real_get_path(self, key)
+        if found is not None:
+            found.unlink()
+        return found
+
+    monkeypatch.setattr(render_cache.RenderCache, "get_path", evicted_get_path)
+    second = tmp_path / "druhy.pdf"
+    pdf_renderer.render_pdf(second, _payload("E-1"))
+    assert second.read_bytes() == first.read_bytes()
+
+
+def test_payment_status_stamp_appends_incremental_update(tmp_path):
+    from web_calculator.utils.pdf.core import incremental
+
+    out_path = tmp_path / "faktura.pdf"
+    exports.export_invoice_pdf(out_path, _payload("F-9", title="Faktura"))
+    original = out_path.read_bytes()
+    assert b"(Stav: Nezaplateny)" in original
+
+    exports.export_payment_status(out_path, "Zaplatene")
+
+    data = out_path.read_bytes()
+    assert data.startswith(original)
+    assert len(data) - len(original) < 1024
+    assert b"(Stav: Zaplatene)" in data[len(original):]
+    xref = incremental.read_xref(data)
+    assert xref.startxref > len(original) and f"/Prev {incremental.read_xref(original).startxref}".encode() in data
+    page = incremental.object_body(data, xref, incremental.page_ids(data, xref)[0])
+    assert re.search(rb"/Contents \[\d+ 0 R \d+ 0 R\]", page)
+
+
+def test_payment_status_stamp_follows_rendered_status_line_and_rejects_xref_streams(tmp_path):
+    from web_calculator.utils.pdf.core import incremental
+    from web_calculator.utils.pdf.core.builder import build_pdf_bytes
+    from web_calculator.utils.pdf.renderers.pdf_renderer import stamp_payment_status
+    from web_calculator.utils.pdf.sections.payment import read_status_line_index
+
+    out_path = tmp_path / "faktura.pdf"
+    payload = _payload("F-11", title="Faktura")
+    payload["payment_lines_override"] = ["Variabilny symbol: F-11", "Stav: Nezaplateny", "Splatnost: 14 dni"]
+    exports.export_invoice_pdf(out_path, payload)
+    original = out_path.read_bytes()
+    assert read_status_line_index(incremental.page_content(original, 0)) == 1
+
+    exports.export_payment_status(out_path, "Zaplatene")
+    overlay = out_path.read_bytes()[len(original):]
+    # pecatka ide na miesto vykresleneho riadku stavu (druhy riadok), nie na pevne stvrty
+    before = re.search(rb"([\d.]+ [\d.]+) Td \(Stav: Nezaplateny\)", original).group(1)
+    assert re.search(rb"([\d.]+ [\d.]+) Td \(Stav: Zaplatene\)", overlay).group(1) == before
+
+    payload["payment_lines_override"] = ["Variabilny symbol: F-11"]
+    exports.export_invoice_pdf(out_path, payload)
+    with pytest.raises(ValueError, match="riadok stavu"):
+        exports.export_payment_status(out_path, "Zaplatene")
+
+    compact = build_pdf_bytes([b"BT ET"], object_streams=True)
+    with pytest.raises(ValueError, match="xref stream"):
+        stamp_payment_status(compact, "Zaplatene")
+
+
+class _FakeTtf:
+    """Minimalny Unicode font pre testy (gid = kod znaku, sirka 400 + gid)."""
+
+    def __new__(cls, name: str, path, data: bytes):
+        from web_calculator.utils.pdf.core import fonts
+
+        path.write_bytes(data)
+        font = object.__new__(fonts.TrueTypeFont)
+        font.path, font.pdf_name, font.data, font.units_per_em = path, name, data, 1000
+        font.bbox, font.ascent, font.descent, font.num_glyphs = (0, -200, 1000, 800), 800, -200, 256
+        font._advance_widths = [400 + gid for gid in range(256)]
+        font._cmap_lookup = lambda cp: cp if cp < 256 else None
+        font._glyph_hex, font.used_gids, font._digest = {}, set(), None
+        return font
+
+
+def test_payment_status_stamp_extends_cid_widths_and_checks_font(tmp_path, monkeypatch):
+    from web_calculator.utils.pdf.core import fonts, incremental
+
+    font_map = {
+        "/F1": _FakeTtf("/UnicodeRegular", tmp_path / "regular.ttf", b"regular"),
+        "/F2": _FakeTtf("/UnicodeBold", tmp_path / "bold.ttf", b"bold"),
+    }
+    monkeypatch.setattr(fonts, "_try_load_unicode_fonts", lambda: dict(font_map))
+    out_path = tmp_path / "faktura.pdf"
+    exports.export_invoice_pdf(out_path, _payload("F-10", title="Faktura"))
+    original = out_path.read_bytes()
+    xref = incremental.read_xref(original)
+    cid_id = incremental.page_cid_fonts(original, 0, xref)["/F1"]
+    before = fonts.cid_width_gids(incremental.object_body(original, xref, cid_id))
+    assert ord("Q") not in before
+
+    exports.export_payment_status(out_path, "QQ")
+    data = out_path.read_bytes()
+    xref = incremental.read_xref(data)
+    assert xref.offsets[cid_id] >= len(original)  # nahradny CIDFont v tej istej aktualizacii
+    body = incremental.object_body(data, xref, cid_id)
+    assert fonts.cid_width_gids(body) == before | {ord("Q")}
+    runs = {int(start): widths.split() for start, widths in re.findall(rb"(\d+) \[([^\]]*)\]", body)}
+    widths = {start + offset: int(w) for start, ws in runs.items() for offset, w in enumerate(ws)}
+    assert widths[ord("Q")] == 400 + ord("Q") and fonts.embedded_font_digest(body) == font_map["/F1"].digest
+
+    # uz pokryte glyfy -> CIDFont sa znova nepripaja
+    exports.export_payment_status(out_path, "Q")
+    again = out_path.read_bytes()
+    assert incremental.read_xref(again).offsets[cid_id] == xref.offsets[cid_id]
+
+    font_map["/F1"] = _FakeTtf("/UnicodeRegular", tmp_path / "other.ttf", b"iny font")
+    with pytest.raises(ValueError, match="inym fontom"):
+        exports.export_payment_status(out_path, "Zaplatene")
+    assert out_path.read_bytes() == again
+
+
+class _ManualRoot:
+    """Nahrada Tk rootu: `after` callbacky sa spustaju rucne cez `run_pending`."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, _ms, callback):
+        self.pending.append(callback)
+        return callback
+
+    def after_cancel(self, after_id):
+        if after_id in self.pending:
+            self.pending.remove(after_id)
+
+    def run_pending(self):
+        callbacks, self.pending = self.pending, []
+        for callback in callbacks:
+            callback()
+
+
+def test_export_worker_writes_in_background_and_honours_cancel(tmp_path):
+    import threading
+    import time
+
+    from web_calculator.ui.controllers.export_worker import ExportWorker
+    from web_calculator.utils.pdf.renderers.pdf_renderer import render_pdf_bytes
+
+    root = _ManualRoot()
+    gate = threading.Event()
+    done, errors, changes = [], [], []
+    worker = ExportWorker(root, on_change=lambda cur, queued: changes.append((cur.label if cur else None, queued)))
+
+    def slow_render():
+        gate.wait(5)
+        return render_pdf_bytes(_payload("W-1"))
+
+    worker.submit("first", tmp_path / "a.pdf", slow_render, done.append, errors.append)
+    second = worker.submit("second", tmp_path / "b.pdf", lambda: b"%PDF-x", done.append, errors.append)
+    worker.cancel(second)
+    gate.set()
+
+    deadline = time.monotonic() + 10
+    while worker.is_busy() and time.monotonic() < deadline:
+        root.run_pending()
+        time.sleep(0.01)
+    worker.shutdown()
+
+    assert done == [tmp_path / "a.pdf"] and not errors
+    assert (tmp_path / "a.pdf").read_bytes().startswith(b"%PDF")
+    assert not (tmp_path / "b.pdf").exists()
+    assert changes[-1] == (None, 0)
+
+
+def test_prerenderer_debounces_and_serves_matching_payload():
+    import time
+
+    from web_calculator.ui.controllers.prerender import PdfPrerenderer
+
+    root = _ManualRoot()
+    state = {"invoice_no": "P-1"}
+    builds, renders = [], []
+
+    def build():
+        builds.append(state["invoice_no"])
+        return {"quote": _payload(state["invoice_no"]), "invoice": _payload(state["invoice_no"], title="Faktura")}
+
+    pre = PdfPrerenderer(root, build, lambda p: renders.append(p["invoice_no"]) or p["invoice_no"].encode())
+    pre.schedule()
+    state["invoice_no"] = "P-2"
+    pre.schedule()
+    assert len(root.pending) == 1  # debounce: iba posledna zmena
+    root.run_pending()
+
+    deadline = time.monotonic() + 5
+    while pre.take("invoice", _payload("P-2", title="Faktura")) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert builds == ["P-2"]
+    assert pre.take("quote", _payload("P-2")) == b"P-2"
+    assert pre.take("quote", _payload("P-3")) is None
+
+    # export ma prednost: naplanovane predrenderovanie sa zahodi a odlozi az do konca exportu
+    state["invoice_no"] = "P-3"
+    pre.schedule()
+    pre.hold()
+    assert not root.pending
+    pre.schedule()
+    assert not root.pending and builds == ["P-2"]
+    pre.release()
+    assert len(root.pending) == 1
+    root.run_pending()
+    deadline = time.monotonic() + 5
+    while pre.take("quote", _payload("P-3")) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert builds == ["P-2", "P-3"] and pre.take("quote", _payload("P-3")) == b"P-3"
+    pre.release()  # bez hold nic nenaplanuje
+    assert not root.pending
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX prava suborov")
+def test_atomic_write_keeps_target_mode_and_honours_umask(tmp_path):
+    from web_calculator.utils.pdf.core.output import copy_file_atomic, write_bytes_atomic
+
+    umask = os.umask(0o027)
+    os.umask(umask)
+    fresh = tmp_path / "novy.pdf"
+    write_bytes_atomic(fresh, b"%PDF")
+    assert stat.S_IMODE(fresh.stat().st_mode) == 0o666 & ~umask
+
+    existing = tmp_path / "existujuci.pdf"
+    existing.write_bytes(b"old")
+    existing.chmod(0o640)
+    copy_file_atomic(fresh, existing)
+    assert existing.read_bytes() == b"%PDF" and stat.S_IMODE(existing.stat().st_mode) == 0o640
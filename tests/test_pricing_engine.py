@@ -1,3 +1,5 @@
+from dataclasses import replace
+
 from web_calculator.core.calculations.pricing_engine import PricingEngine
 from web_calculator.core.models.service import Service
 
@@ -17,3 +19,319 @@ def test_format_currency_uses_eur_suffix():
     formatted = PricingEngine.format_currency(1234.5)
     assert formatted.endswith("EUR")
     assert "1,234.50" in formatted
+
+
+def test_totals_snapshot_matches_payload_and_is_cached_per_revision(sample_package, sample_service):
+    from web_calculator.core.calculations.totals import TotalsCache, split_vat
+    from web_calculator.core.services.invoice import build_invoice_payload, build_payload_from_totals
+
+    engine = PricingEngine(sample_package)
+    selections = [(sample_service, 2, 60.0), (Service(code="GEN-SEO", label="SEO", price=30.0), 1)]
+
+    for vat_mode in ("add", "included"):
+        totals = engine.totals(selections, discount_pct=10.0, vat_rate=0.2, vat_mode=vat_mode, original_package_price=150.0)
+        payload = build_invoice_payload(
+            sample_package, selections, {}, engine, vat_rate=0.2, vat_mode=vat_mode, discount_pct=10.0, original_package_price=150.0
+        )
+        assert payload["totals"] == totals.as_totals()
+        assert payload["items"] == totals.items()
+        assert float(totals.total_before_discount) == 120.0 + 2 * 50.0 + 30.0
+        assert tuple(map(float, (totals.total_no_vat, totals.vat, totals.total_with_vat))) == split_vat(
+            float(totals.total_before_discount - totals.discount_amount), 0.2, vat_mode
+        )
+    assert split_vat(120.0, 0.2, "included") == (100.0, 20.0, 120.0)
+    assert split_vat(-5.0, 0.2, "add") == (0.0, 0.0, 0.0)
+
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return engine.totals(selections)
+
+    cache = TotalsCache()
+    first = cache.get(1, compute)
+    assert cache.get(1, compute) is first
+    assert len(calls) == 1
+    assert cache.get(2, compute) is not first
+    assert len(calls) == 2
+    other = build_payload_from_totals(first, sample_package, {"name": "Alice"})
+    assert other["totals"] == first.as_totals()
+    assert other["client"]["name"] == "Alice"
+
+
+def test_money_cents_are_exact_and_round_half_up_or_even():
+    from decimal import ROUND_HALF_EVEN, ROUND_HALF_UP, Decimal
+
+    from web_calculator.core.calculations.totals import compute_totals
+    from web_calculator.utils.money import HALF_EVEN, Money, cents_array, dot, split_vat_cents, to_cents
+
+    assert to_cents(2.675) == 268  # binarne 2.67499..., zapis 2.675
+    assert to_cents(2.665, HALF_EVEN) == 266
+    assert to_cents("1 234,565") == 123457
+    assert to_cents(-0.005) == -1
+    assert to_cents(1e-7) == 0
+    for raw in ("0.125", "19.995", "7.005", "0.015", "123456.785"):
+        for mode, dec_mode in (("half_up", ROUND_HALF_UP), (HALF_EVEN, ROUND_HALF_EVEN)):
+            expected = int(Decimal(raw).quantize(Decimal("0.01"), rounding=dec_mode) * 100)
+            assert to_cents(float(raw), mode) == expected
+
+    # DPH v cene: zaklad + DPH vzdy presne da sumu s DPH
+    assert split_vat_cents(1000, 2300, "included") == (813, 187, 1000)
+    assert split_vat_cents(813, 2300, "add") == (813, 187, 1000)
+    assert str(Money(-123456)) == "-1,234.56 EUR"
+    assert f"{Money(1005):.2f}" == "10.05"
+    assert PricingEngine.format_currency(0.125) == "0.13 EUR"
+
+    prices = cents_array([0.1] * 1000)
+    assert dot(prices, [3] * 1000) == 30000
+
+    # 3 ks po 33.33... (zmiesana cena z kvoty) = presne 100.00, bez driftu cez tisic riadkov
+    svc = Service(code="X", label="X", price=100.0 / 3)
+    totals = compute_totals([(svc, 3)] * 1000, vat_rate=0.23, vat_mode="included")
+    assert totals.extras == Money(100000 * 100)
+    assert totals.total_no_vat + totals.vat == totals.total_with_vat
+    assert all(line.total == Money(10000) for line in totals.lines)
+
+
+def test_recommend_packages_matches_per_package_quotes():
+    import random
+
+    from web_calculator.core.calculations.pricing_engine import effective_service_price, package_with_price
+    from web_calculator.core.calculations.recommender import recommend_packages
+    from web_calculator.core.calculations.totals import compute_totals
+    from web_calculator.core.models.package import Package
+
+    rng = random.Random(7)
+    bundles = ["NONE", "START", "ESHOP", "PRO"]
+    services = [
+        Service(
+            code=f"S{i}",
+            label=f"S{i}",
+            price=round(rng.uniform(5, 200), 2),
+            price2=round(rng.uniform(0, 50), 2),
+            bundle=rng.choice(bundles),
+        )
+        for i in range(40)
+    ]
+    packages = []
+    for i in range(200):
+        included = rng.sample([s.code for s in services], rng.randint(0, 5))
+        packages.append(
+            Package(
+                code=f"{rng.choice(['START', 'ESHOP_Z', 'PRO_CMS', 'MINI'])}-{i}",
+                name="P",
+                description="",
+                base_price=round(rng.uniform(100, 900), 2),
+                promo_price=round(rng.uniform(50, 800), 2) if rng.random() < 0.5 else None,
+                intra_price=round(rng.uniform(50, 800), 2) if rng.random() < 0.3 else None,
+                included_services=included,
+                included_quantities={code: rng.randint(0, 4) for code in included if rng.random() < 0.6},
+            )
+        )
+    selected = {s.code for s in rng.sample(services, 12)}
+    quantities = {s.code: rng.randint(1, 6) for s in services}
+
+    ranked = recommend_packages(packages, services, quantities, selected, discount_pct=5.0, vat_rate=0.23)
+    assert len(ranked) == 1 + sum(1 + (p.promo_price is not None) + (p.intra_price is not None) for p in packages)
+    assert [q.total for q in ranked] == sorted(q.total for q in ranked)
+
+    # referencia: to iste, co spravi hlavne okno po vybere balika (apply_included_services + effective price)
+    for quote in ranked[:25] + ranked[-25:]:
+        package = package_with_price(quote.package, quote.price_mode)
+        codes = set(selected)
+        qty = dict(quantities)
+        if package:
+            for code in package.included_services:
+                codes.add(code)
+                qty[code] = max(qty.get(code, 0), package.included_quantities.get(code, 1))
+        selections = [
+            (replace(s, price=effective_service_price(s, package, qty[s.code])), qty[s.code])
+            for s in services
+            if s.code in codes
+        ]
+        expected = compute_totals(selections, base_price=package.base_price if package else 0.0, discount_pct=5.0, vat_rate=0.23)
+        assert quote.total == expected.total_before_discount
+        assert quote.total_with_vat == expected.total_with_vat
+
+
+def test_scenario_sweep_matches_totals_kernel(sample_package, sample_service):
+    from web_calculator.core.calculations.pricing_engine import package_with_price
+    from web_calculator.core.calculations.scenarios import scenario_grid
+    from web_calculator.core.calculations.totals import compute_totals
+
+    sample_package.promo_price = 99.99
+    selections = [(sample_service, 3), (Service(code="GEN-SEO", label="SEO", price=33.33), 7)]
+    grid = scenario_grid(
+        discounts=(0, 7.5, 12.345, 100), vat_rates=(0.2, 0.23), price_modes=("base", "promo", "intra")
+    )
+    assert len(grid) == 3 * 2 * 2 * 4
+
+    results = PricingEngine(sample_package).scenarios(selections, grid)
+    assert [r.scenario for r in results] == grid
+    for result in results:
+        sc = result.scenario
+        package = package_with_price(sample_package, sc.price_mode)
+        expected = compute_totals(
+            selections, base_price=package.base_price, discount_pct=sc.discount_pct, vat_rate=sc.vat_rate, vat_mode=sc.vat_mode
+        )
+        assert result.total_before_discount == expected.total_before_discount
+        assert result.discount_amount == expected.discount_amount
+        assert (result.total_no_vat, result.vat, result.total_with_vat) == (
+            expected.total_no_vat,
+            expected.vat,
+            expected.total_with_vat,
+        )
+    assert results[-1].total_with_vat.cents == 0  # 100 % zlava
+
+
+def test_tier_tables_price_by_bisect_and_round_trip_json(tmp_path):
+    import json
+    import random
+
+    import pytest
+
+    from web_calculator.core.calculations.pricing_engine import effective_service_price
+    from web_calculator.core.calculations.recommender import recommend_packages
+    from web_calculator.core.calculations.tiers import TierTable, compile_tiers
+    from web_calculator.core.models.package import Package
+    from web_calculator.core.services import catalog
+
+    bands = [{"from": 1, "price": 10}, {"from": 6, "price": 8.5}, {"from": 21, "price": 6}]
+    table = compile_tiers(bands)
+    unit = [0] + [1000] * 5 + [850] * 15 + [600] * 80
+    for qty in range(0, 101):
+        assert table.cost(qty) == sum(unit[1 : qty + 1])
+    assert compile_tiers([[5, 3]]).cost(7) == 2100  # pred prvym pasmom plati jeho cena
+    assert TierTable.flat(1999).cost(3) == 5997
+
+    # kvota balika bez pasiem = povodne spravanie, s pasmami pokracuje v pasmach za kvotou
+    flat = Service(code="S", label="S", price=40.0, price2=5.0)
+    tiered = Service(code="T", label="T", price=10.0, price2=1.0, tiers=bands)
+    package = Package(
+        code="PRO-1",
+        name="P",
+        description="",
+        base_price=100.0,
+        included_services=["S", "T"],
+        included_quantities={"S": 3, "T": 4},
+    )
+    for qty in range(1, 30):
+        expected = (min(qty, 3) * 5.0 + max(0, qty - 3) * 40.0) / qty
+        assert effective_service_price(flat, package, qty) == pytest.approx(expected)
+        paid = sum(unit[5 : qty + 1])
+        assert round(effective_service_price(tiered, package, qty) * qty, 2) == (min(qty, 4) * 100 + paid) / 100
+        assert round(effective_service_price(tiered, None, qty) * qty, 2) == table.cost(qty) / 100
+    assert effective_service_price(tiered, None, 30, base_price=9.0) == 9.0  # rucna cena vypne pasma
+
+    # historicka cennikova cena pasma nevypne, rucna cena odlisna od nej ano
+    from datetime import date, datetime
+
+    from web_calculator.core.calculations.price_history import PriceHistory, price_change
+
+    history = PriceHistory([price_change("service", "T", {"price": 9.0}, {"price": 10.0}, datetime(2026, 6, 1))])
+    as_of = date(2026, 1, 1)
+    assert effective_service_price(tiered, None, 30, history=history, as_of=as_of) == table.unit_price(30)
+    assert effective_service_price(tiered, None, 30, base_price=9.0, history=history, as_of=as_of) == table.unit_price(30)
+    assert effective_service_price(tiered, None, 30, base_price=10.0, history=history, as_of=as_of) == 10.0
+
+    # pasma balika maju prednost; odporucanie sedi s cenou riadkov
+    package.service_tiers = {"S": [{"from": 1, "price": 2}, {"from": 10, "price": 1}]}
+    assert effective_service_price(flat, package, 12) == pytest.approx((9 * 2 + 3 * 1) / 12)
+    rng = random.Random(3)
+    quantities = {"S": rng.randint(1, 15), "T": rng.randint(1, 40)}
+    (quote,) = recommend_packages([package], [flat, tiered], quantities, {"S", "T"}, include_no_package=False)
+    qty = {code: max(q, package.included_quantities[code]) for code, q in quantities.items()}
+    expected_services = sum(round(effective_service_price(s, package, qty[s.code]) * qty[s.code], 2) for s in (flat, tiered))
+    assert float(quote.services_total) == pytest.approx(expected_services)
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    catalog.save_catalog(catalog.Catalog(packages=[package], services=[flat, tiered]), data_dir)
+    saved = json.loads((data_dir / "services_extra.json").read_text(encoding="utf-8"))["services"]
+    assert "price_tiers" not in saved[1] and "tiers" not in saved[0]
+    assert "compiled_tiers" not in (data_dir / "packages.json").read_text(encoding="utf-8")
+    loaded = catalog.load_catalog(tmp_path)
+    assert loaded.services[1].price_tiers == table
+    assert loaded.packages[0].compiled_tiers["S"].cost(12) == 21 * 100
+
+
+def test_selection_state_stores_only_deviations_from_catalog(sample_service):
+    from web_calculator.core.calculations.recommender import recommend_packages
+    from web_calculator.core.models.selection_state import SelectionState
+
+    state = SelectionState.restore(["WEB-BLOG", "GEN-SEO"], {"WEB-BLOG": 1, "GEN-SEO": 4})
+    assert state.quantities == {"GEN-SEO": 4}  # predvolene mnozstvo sa neuklada
+    assert state.qty("WEB-BLOG") == 1 and state.qty("UNKNOWN") == 1
+    assert state.prices(sample_service) == (50.0, 0.0)
+
+    state.override_price("WEB-BLOG", 45, 10)
+    snapshot = state.snapshot()
+    state.set_qty("GEN-SEO", 1)
+    state.rename("WEB-BLOG", "WEB-BLOG2")
+    assert snapshot.qty("GEN-SEO") == 4 and "WEB-BLOG" in snapshot.selected  # snapshot je nezavisly
+    assert state.quantities == {} and state.selected == {"WEB-BLOG2", "GEN-SEO"}
+    assert state.price_overrides == {"WEB-BLOG2": (45.0, 10.0)}
+
+    # riedke mnozstva a prepisane ceny sa daju priamo pouzit ako mapy s predvolbou
+    quotes = recommend_packages([], [sample_service], state.quantities, {"WEB-BLOG"}, prices=snapshot.price_overrides)
+    assert float(quotes[0].services_total) == 45.0
+
+    state.remove("WEB-BLOG2")
+    state.clear()
+    assert not state.selected and not state.quantities and not state.price_overrides
+
+
+def test_bitmask_selection_uses_stable_ids_and_section_masks():
+    from web_calculator.core.models.selection_state import SelectionState
+    from web_calculator.core.models.service_index import ServiceIndex
+
+    services = [
+        Service(code="P1", label="P1", price=10.0, source="PRIMARY", tag="seo"),
+        Service(code="W1", label="W1", price=20.0, source="WEB"),
+        Service(code="P2", label="P2", price=30.0, source="PRIMARY"),
+        Service(code="E1", label="E1", price=40.0, source="ESHOP_EXTRA"),
+    ]
+    index = ServiceIndex(services)
+    state = SelectionState(index)
+    state.select_all(["E1", "P1"])
+    assert [s.code for s in state.selected_services()] == ["P1", "E1"]  # poradie katalogu
+    assert "P1" in state.selected and "P2" not in state.selected and len(state.selected) == 2
+
+    # cela sekcia: zvoli vsetky, druhy klik ich zrusi
+    primary = index.section_mask("primary")
+    assert state.toggle_mask(primary) is True and {"P1", "P2"} <= state.selected
+    assert state.toggle_mask(primary) is False and state.selected == {"E1"}
+    assert state.selected - {"E1"} == set()
+
+    # premenovanie a zmazanie nemenia id ostatnych sluzieb
+    state.select("W1")
+    services[1].code = "W2"  # UI najprv zmeni kod sluzby, potom premenuje vyber
+    state.rename("W1", "W2")
+    state.remove("P1")  # pred zmazanim riadku z katalogu
+    del services[0]
+    assert index.id("W2") == 1 and index.id("E1") == 3 and index.id("P1") is None
+    assert state.selected == {"W2", "E1"}
+    assert index.tag_mask(["seo"]) == bytes(4)  # zmazana sluzba vypadla z masiek
+
+    # nova sluzba na konci katalogu dostane dalsie id; kody mimo katalogu su bokom masky
+    restored = SelectionState.restore(["GHOST", "P4"], index=index)
+    services.append(Service(code="P3", label="P3", price=5.0, source="PRIMARY"))
+    state.register(services[-1])
+    restored.select("P3")
+    assert index.id("P3") == 4 and index.service(4) is services[-1] and index.service(3).code == "E1"
+    assert restored.selected == {"GHOST", "P4", "P3"} and [s.code for s in restored.selected_services()] == ["P3"]
+    services.append(Service(code="P4", label="P4", price=6.0, source="PRIMARY"))
+    restored.register(services[-1])
+    assert [s.code for s in restored.selected_services()] == ["P3", "P4"] and restored.selected.extra == {"GHOST"}
+    assert index.section_mask("primary") == bytes([0, 0, 1, 0, 1, 1])
+
+    # stlpcovy katalog: index ani masky nevytvaraju pohlady na riadky
+    from web_calculator.core.models.service_store import ServiceStore
+
+    store = ServiceStore(services)
+    store_index = ServiceIndex(store)
+    assert store_index.section_mask("backend") == bytes([1, 0, 0, 0, 0]) and store_index.tag_mask(["seo"]) == bytes(5)
+    assert store_index.id("E1") == 2 and len(store._views) == 0
+    assert store_index.service(2).code == "E1"
+    state.deselect_all(["E1", "W2"])
+    assert not state.selected